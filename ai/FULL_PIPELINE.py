@@ -12,7 +12,7 @@ print("=" * 60)
 
 model = ClaritasModel()
 
-result = model.predict(audio_path=AUDIO_FILE_PATH, text=TEXT_TRANSCRIPT_PATH)
+result = model.predict(audio_path=AUDIO_FILE_PATH, text=TEXT_TRANSCRIPT_PATH, explain=True)
 
 # Format for API response
 api_response = {
@@ -48,6 +48,8 @@ api_response = {
                 "repetition_ratio": result["fitur_leksikal"]["total_repetitions"],
             },
         },
+        # Per-patient contributions + CNN attention, from the same inference
+        "explanation": result["explanation"],
     },
 }
 
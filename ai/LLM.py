@@ -6,6 +6,8 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 from google.api_core import exceptions
 
+from .telemetry import telemetry
+
 # 1. Load API Key
 load_dotenv()
 api_key = os.getenv("GEMINI_API_KEY")
@@ -44,6 +46,11 @@ def clean_and_parse_json(text_res):
 def generate_clinical_report(
     api_response, transcript, image_ground_truth=COOKIE_THEFT_DESC
 ):
+    with telemetry.span("llm_report"):
+        return _generate_clinical_report(api_response, transcript, image_ground_truth)
+
+
+def _generate_clinical_report(api_response, transcript, image_ground_truth):
 
     # --- Extract Data ---
     data = api_response["data"]
@@ -111,18 +118,22 @@ def generate_clinical_report(
             parsed_json = clean_and_parse_json(response.text)
 
             if parsed_json:
+                telemetry.increment("llm_report_attempts", {"model": model_name, "outcome": "ok"})
                 return parsed_json
             else:
                 # If JSON parsing failed, just continue to next model/retry logic
                 print(f"⚠️ Failed to parse JSON from {model_name}")
+                telemetry.increment("llm_report_attempts", {"model": model_name, "outcome": "bad_json"})
 
         except exceptions.ResourceExhausted:
             print(f"⚠️ Quota exceeded for {model_name}. Trying next model...")
+            telemetry.increment("llm_report_attempts", {"model": model_name, "outcome": "quota"})
             time.sleep(1)  # Short pause before switching
             continue
 
         except Exception as e:
             print(f"⚠️ Error with {model_name}: {e}")
+            telemetry.increment("llm_report_attempts", {"model": model_name, "outcome": "error"})
             # If it's a 404 (Not Found), we simply continue to the next model
             continue
 
@@ -1,6 +1,20 @@
-from .model import ClaritasModel
-from .config import ModelConfig
-from .LLM import generate_clinical_report
+import importlib
 
 __version__ = "1.0.0"
-__all__ = ["ClaritasModel", "ModelConfig","generate_clinical_report"]
\ No newline at end of file
+__all__ = ["ClaritasModel", "ModelConfig","generate_clinical_report"]
+
+# Heavy submodules (torch, Gemini client) load on first attribute access, so
+# lightweight helpers such as ``ai.telemetry`` can be imported on their own
+_LAZY = {
+    "ClaritasModel": ".model",
+    "ModelConfig": ".config",
+    "generate_clinical_report": ".LLM",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
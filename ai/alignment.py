@@ -0,0 +1,127 @@
+"""
+Alignment of word timestamps with VAD speech activity
+
+Splits a timed transcript into utterances and relates inter-word gaps to
+the VAD speech mask, giving per-utterance speech rate, within- vs
+between-utterance pauses, filled pauses and hesitations before nouns.
+Everything is vectorized over sorted word spans (O(n log n) in the number
+of words) and a prefix sum of the VAD mask (O(1) lookup per gap), so
+hour-long sessions stay cheap.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import ModelConfig
+from .features import LexicalFeatureExtractor
+
+
+class PauseAligner:
+    """Combine ASR word timings with VAD frames into temporal fluency features"""
+
+    def __init__(self, frame_duration_ms: int = 30, min_pause: float = 0.25,
+                 utterance_gap: float = 1.0,
+                 lexical_extractor: Optional[LexicalFeatureExtractor] = None):
+        self.frame_duration_s = frame_duration_ms / 1000.0
+        self.min_pause = min_pause
+        self.utterance_gap = utterance_gap
+        self.lexical_extractor = lexical_extractor or LexicalFeatureExtractor()
+
+    def align(self, words: List[Dict], speech_mask: np.ndarray) -> Dict:
+        """
+        Args:
+            words: [{'word': str, 'start': float, 'end': float}, ...] in seconds
+            speech_mask: per-frame VAD decisions (1 = speech)
+
+        Returns:
+            {'features': {ModelConfig.ALIGNMENT_FEATURES...}, 'segments': [per-utterance dicts]}
+        """
+        words = [w for w in words if w.get('end', 0) >= w.get('start', 0)]
+        if not words:
+            return {'features': self._get_default_features(), 'segments': []}
+
+        # 1. Sort word spans and merge overlaps: covered[i] = end of speech so far
+        starts = np.array([w['start'] for w in words], dtype=np.float64)
+        ends = np.array([w['end'] for w in words], dtype=np.float64)
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+        texts = [words[i]['word'] for i in order]
+        covered = np.maximum.accumulate(ends)
+
+        # 2. Gap before word i+1 and the VAD speech time inside it
+        gap_start = covered[:-1]
+        gap_end = starts[1:]
+        gaps = np.maximum(gap_end - gap_start, 0.0)
+        clock = self._speech_time(speech_mask, np.concatenate((gap_start, gap_end)))
+        voiced = np.clip(clock[len(gaps):] - clock[:len(gaps)], 0.0, gaps)
+
+        is_pause = gaps >= self.min_pause
+        is_between = gaps >= self.utterance_gap
+        is_within = is_pause & ~is_between
+        is_filled = is_pause & (voiced >= 0.5 * gaps)
+
+        # 3. Utterances: split at between-utterance gaps
+        syllables, is_noun = self.lexical_extractor.tag_words(texts)
+        syllables = np.asarray(syllables, dtype=np.float64)
+        is_noun = np.asarray(is_noun, dtype=bool)
+
+        seg_first = np.concatenate(([0], np.flatnonzero(is_between) + 1))
+        seg_last = np.concatenate((seg_first[1:] - 1, [len(texts) - 1]))
+        seg_syllables = np.add.reduceat(syllables, seg_first)
+        seg_duration = covered[seg_last] - starts[seg_first]
+        seg_rate = np.divide(
+            seg_syllables * 60, seg_duration,
+            out=np.zeros_like(seg_syllables), where=seg_duration > 0
+        )
+
+        # 4. Hesitation before nouns (first word has no preceding gap)
+        noun_after_gap = is_noun[1:]
+        pre_noun = noun_after_gap & is_pause
+        noun_count = int(is_noun.sum())
+
+        features = {
+            'num_utterances': len(seg_first),
+            'mean_segment_rate': float(np.mean(seg_rate)),
+            'std_segment_rate': float(np.std(seg_rate)),
+            'min_segment_rate': float(np.min(seg_rate)),
+            'max_segment_rate': float(np.max(seg_rate)),
+            'within_utterance_pauses': int(is_within.sum()),
+            'mean_within_pause': self._mean(gaps[is_within]),
+            'between_utterance_pauses': int(is_between.sum()),
+            'mean_between_pause': self._mean(gaps[is_between]),
+            'filled_pause_count': int(is_filled.sum()),
+            'noun_count': noun_count,
+            'pre_noun_pause_count': int(pre_noun.sum()),
+            'pre_noun_pause_ratio': float(pre_noun.sum() / noun_count) if noun_count else 0.0,
+            'mean_pre_noun_pause': self._mean(gaps[pre_noun])
+        }
+
+        segments = [
+            {
+                'start': float(starts[first]),
+                'end': float(covered[last]),
+                'text': ' '.join(texts[first:last + 1]),
+                'num_words': int(last - first + 1),
+                'syllables': int(seg_syllables[k]),
+                'speech_rate': float(seg_rate[k])
+            }
+            for k, (first, last) in enumerate(zip(seg_first, seg_last))
+        ]
+
+        return {'features': features, 'segments': segments}
+
+    def _speech_time(self, speech_mask: np.ndarray, times: np.ndarray) -> np.ndarray:
+        """Seconds of VAD speech in [0, t] for each t, via a prefix sum over frames"""
+        mask = np.asarray(speech_mask, dtype=np.float64)
+        edges = np.arange(len(mask) + 1) * self.frame_duration_s
+        cumulative = np.concatenate(([0.0], np.cumsum(mask))) * self.frame_duration_s
+        return np.interp(times, edges, cumulative)
+
+    @staticmethod
+    def _mean(values: np.ndarray) -> float:
+        return float(np.mean(values)) if len(values) > 0 else 0.0
+
+    def _get_default_features(self) -> Dict[str, float]:
+        """Return default features (every ModelConfig.ALIGNMENT_FEATURES at 0) when no word timings are available"""
+        return dict.fromkeys(ModelConfig.ALIGNMENT_FEATURES, 0.0)
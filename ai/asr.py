@@ -0,0 +1,104 @@
+"""
+On-device speech-to-text for transcripts and word timestamps
+
+Runs a quantized Whisper model through faster-whisper (CTranslate2, int8 on
+CPU) so lexical features can be computed without a supplied transcript.
+faster-whisper is an optional dependency: install it with
+``pip install faster-whisper`` and enable ``ModelConfig.ASR_ENABLED``.
+"""
+
+import importlib.util
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from .telemetry import telemetry
+
+
+class SpeechRecognizer:
+    """Quantized Whisper transcription running in a small worker pool"""
+
+    def __init__(self, model_size: str = "small", compute_type: str = "int8",
+                 num_workers: int = 1, cpu_threads: int = 0,
+                 language: Optional[str] = None, beam_size: int = 1):
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = cpu_threads
+        self.language = language
+        self.beam_size = beam_size
+
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix="claritas-asr"
+        )
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether the optional faster-whisper backend is installed"""
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def _get_model(self):
+        """Load the Whisper model on first use (shared by all workers)"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+                    self._model = WhisperModel(
+                        self.model_size,
+                        device="cpu",
+                        compute_type=self.compute_type,
+                        cpu_threads=self.cpu_threads,
+                        num_workers=self.num_workers
+                    )
+        return self._model
+
+    def transcribe(self, audio: np.ndarray) -> Dict:
+        """
+        Transcribe 16 kHz mono float audio.
+
+        Returns:
+            {'text': str, 'language': str, 'source': 'asr',
+             'words': [{'word': str, 'start': float, 'end': float}, ...]}
+        """
+        with telemetry.span('asr'):
+            return self._transcribe(audio)
+
+    def _transcribe(self, audio: np.ndarray) -> Dict:
+        model = self._get_model()
+        segments, info = model.transcribe(
+            np.ascontiguousarray(audio, dtype=np.float32),
+            language=self.language,
+            beam_size=self.beam_size,
+            word_timestamps=True,
+            condition_on_previous_text=False
+        )
+
+        texts = []
+        words = []
+        for segment in segments:
+            texts.append(segment.text.strip())
+            for word in segment.words or []:
+                words.append({
+                    'word': word.word.strip(),
+                    'start': float(word.start),
+                    'end': float(word.end)
+                })
+
+        return {
+            'text': ' '.join(t for t in texts if t),
+            'language': info.language,
+            'source': 'asr',
+            'words': words
+        }
+
+    def submit(self, audio: np.ndarray) -> Future:
+        """Transcribe in the worker pool; the caller collects ``future.result()``"""
+        return self._executor.submit(self.transcribe, audio)
+
+    def close(self):
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1 @@
+"""Benchmarks for the Claritas AI pipeline (run as ``python -m ai.benchmarks.<name>``)"""
@@ -0,0 +1,120 @@
+"""
+Microbenchmark: fused lexical kernel vs the original multi-pass extractor
+
+Usage (from the repository root):
+    python -m ai.benchmarks.bench_lexical [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+from ai.features import LexicalFeatureExtractor
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TOKEN_COUNTS = [1_000, 10_000, 100_000]
+
+
+class LegacyLexicalExtractor(LexicalFeatureExtractor):
+    """Reference copy of the original per-feature passes (list lookups, joined bigrams)"""
+
+    def extract(self, text, speech_duration, total_duration):
+        text = self._preprocess_text(text)
+        tokens = self._tokenize(text)
+        lang = self._detect_language(text)
+
+        content_list = self.CONTENT_WORDS.get(lang, self.CONTENT_WORDS['english'])
+        function_list = self.FUNCTION_WORDS.get(lang, self.FUNCTION_WORDS['english'])
+        deictic_list = self.DEICTIC_WORDS.get(lang, self.DEICTIC_WORDS['english'])
+
+        unique_tokens = len(set(tokens))
+        content_count = sum(1 for token in tokens if token in content_list)
+        function_count = sum(1 for token in tokens if token in function_list)
+        deictic_count = sum(1 for token in tokens if token in deictic_list)
+
+        word_reps = 0
+        for i in range(len(tokens) - 1):
+            if tokens[i] == tokens[i + 1]:
+                word_reps += 1
+        bigrams = [' '.join(tokens[i:i+2]) for i in range(len(tokens) - 1)]
+        phrase_reps = sum(count - 1 for count in Counter(bigrams).values() if count > 1)
+
+        syllables = 0
+        previous_was_vowel = False
+        for char in text:
+            is_vowel = char in "aeiouy"
+            if is_vowel and not previous_was_vowel:
+                syllables += 1
+            previous_was_vowel = is_vowel
+        if text.endswith('e'):
+            syllables -= 1
+        syllables = max(syllables, 1)
+
+        n = len(tokens)
+        return {
+            'has_text': 1,
+            'total_tokens': n,
+            'unique_tokens': unique_tokens,
+            'ttr': unique_tokens / n,
+            'content_word_count': content_count,
+            'function_word_count': function_count,
+            'lexical_density': content_count / n,
+            'deictic_count': deictic_count,
+            'deictic_ratio': deictic_count / n,
+            'word_repetitions': word_reps,
+            'phrase_repetitions': phrase_reps,
+            'total_repetitions': word_reps + phrase_reps,
+            'repetition_ratio': (word_reps + phrase_reps) / n,
+            'syllable_count': syllables,
+            'speech_rate': syllables / total_duration * 60,
+            'articulation_rate': syllables / speech_duration * 60
+        }
+
+
+def make_transcript(num_tokens: int, seed: int = 0) -> str:
+    """Build a long English transcript by resampling words from the sample transcripts"""
+    words = []
+    for name in ("AD TXT.txt", "CN TXT.txt"):
+        words.extend(re.findall(r"\w+", (DATA_DIR / name).read_text(encoding="utf-8").lower()))
+    rng = random.Random(seed)
+    return " ".join(rng.choice(words) for _ in range(num_tokens))
+
+
+def time_extract(extractor, text: str, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor.extract(text, 60.0, 90.0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fused = LexicalFeatureExtractor()
+    legacy = LegacyLexicalExtractor()
+
+    print(f"{'tokens':>8} {'legacy ms':>10} {'fused ms':>10} {'speedup':>8}")
+    for num_tokens in TOKEN_COUNTS:
+        text = make_transcript(num_tokens)
+        expected = legacy.extract(text, 60.0, 90.0)
+        actual = fused.extract(text, 60.0, 90.0)
+        mismatched = [k for k in expected if abs(expected[k] - actual[k]) > 1e-9]
+        if mismatched:
+            raise AssertionError(f"Fused kernel disagrees on: {mismatched}")
+
+        t_legacy = time_extract(legacy, text, args.repeat)
+        t_fused = time_extract(fused, text, args.repeat)
+        print(f"{num_tokens:>8} {t_legacy * 1e3:>10.2f} {t_fused * 1e3:>10.2f} "
+              f"{t_legacy / t_fused:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
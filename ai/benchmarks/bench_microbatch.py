@@ -0,0 +1,123 @@
+"""
+Throughput/latency of batch-1 CNN calls vs the dynamic micro-batcher under concurrency
+
+Usage (from the repository root):
+    python -m ai.benchmarks.bench_microbatch [--clients 16] [--requests 8] [--max-wait-ms 5]
+
+Uses trained weights from ModelConfig.CNN_LSTM_FINAL_PATH when present,
+otherwise a randomly initialised CNNLSTM (timings are the same).
+
+Before timing, checks that a short window scores the same alone as in a
+batch, or in a micro-batch, with full-size windows.
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+import torch
+
+from ai.config import ModelConfig
+from ai.microbatch import MicroBatcher
+from ai.model import CNNLSTM
+from ai.windowing import bucket_batches, pad_batch
+
+
+def build_model() -> CNNLSTM:
+    model = CNNLSTM(num_classes=3, n_mels=128)
+    if ModelConfig.CNN_LSTM_FINAL_PATH.exists():
+        model.load_state_dict(torch.load(ModelConfig.CNN_LSTM_FINAL_PATH, map_location="cpu"))
+    return model.eval()
+
+
+def mixed_windows(seed: int = 0):
+    """Three full-size windows and a short tail window, as in sliding mode or timeline()"""
+    rng = np.random.default_rng(seed)
+    return [rng.standard_normal((128, width)).astype(np.float32) for width in (500, 500, 500, 180)]
+
+
+def check_batch_parity(forward, max_batch: int, max_wait_ms: float, atol: float = 1e-5):
+    """
+    Raise if batching changes any window's logits vs scoring it alone, both
+    for in-request buckets and for windows submitted together to a MicroBatcher
+    """
+    windows = mixed_windows()
+    alone = np.stack([forward(w[None, None])[0] for w in windows])
+
+    bucketed = np.zeros_like(alone)
+    for batch in bucket_batches([w.shape[1] for w in windows], max_batch):
+        bucketed[batch] = forward(pad_batch([windows[i] for i in batch]))
+
+    batcher = MicroBatcher(forward, max_batch=max_batch, max_wait_ms=max_wait_ms)
+    futures = [batcher.submit(w) for w in windows]
+    microbatched = np.stack([f.result() for f in futures])
+    batcher.close()
+
+    for name, logits in (("bucketed", bucketed), ("micro-batched", microbatched)):
+        drift = np.abs(logits - alone).max()
+        if drift > atol:
+            raise AssertionError(f"{name} logits differ from batch-1 logits by {drift:.2e}")
+
+
+def run_load(call, clients: int, requests: int, window: np.ndarray):
+    """Each client thread issues ``requests`` sequential calls; returns (wall seconds, latencies ms)"""
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(requests):
+            start = time.perf_counter()
+            call(window)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, np.array(latencies)
+
+
+def report(name: str, wall: float, latencies: np.ndarray):
+    print(f"{name:>12}: {len(latencies) / wall:7.1f} req/s  "
+          f"p50 {np.percentile(latencies, 50):7.1f} ms  p99 {np.percentile(latencies, 99):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--max-batch", type=int, default=ModelConfig.CNN_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=ModelConfig.CNN_MICROBATCH_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    model = build_model()
+    window = np.random.default_rng(0).standard_normal((128, 500)).astype(np.float32)
+
+    def forward(batch: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            return model(torch.from_numpy(batch)).numpy()
+
+    forward(window[None, None])  # warm-up
+    check_batch_parity(forward, args.max_batch, args.max_wait_ms)
+
+    wall, latencies = run_load(lambda w: forward(w[None, None]), args.clients, args.requests, window)
+    report("batch-1", wall, latencies)
+
+    batcher = MicroBatcher(forward, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    wall, latencies = run_load(lambda w: batcher.submit(w).result(), args.clients, args.requests, window)
+    batcher.close()
+    report("micro-batch", wall, latencies)
+
+    stats = batcher.stats()
+    print(f"{'':>12}  mean batch {stats['mean_batch_size']:.1f} (max {stats['max_batch_size']:.0f}), "
+          f"queue wait p50 {stats['queue_wait_p50_ms']:.1f} ms / p99 {stats['queue_wait_p99_ms']:.1f} ms")
+    print(f"{'':>12}  torch threads: {torch.get_num_threads()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Mel frontend vs the original librosa pipeline: parity and speed
+
+Usage (from the repository root):
+    python -m ai.benchmarks.bench_spectrogram [--repeat 5]
+"""
+
+import argparse
+import time
+
+import librosa
+import numpy as np
+
+from ai.spectrogram import MelFrontend
+
+DURATIONS_S = [10, 60, 600]
+SR = 16000
+
+
+def librosa_reference(audio: np.ndarray) -> np.ndarray:
+    """The original per-request pipeline (full length, no padding)"""
+    mel_spec = librosa.feature.melspectrogram(
+        y=audio, sr=SR, n_mels=128, n_fft=2048, hop_length=512, fmax=8000
+    )
+    mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
+    return (mel_spec_db - mel_spec_db.mean()) / (mel_spec_db.std() + 1e-6)
+
+
+def best_of(fn, repeat: int) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frontend = MelFrontend(sr=SR)
+    rng = np.random.default_rng(0)
+
+    print(f"{'seconds':>8} {'librosa ms':>11} {'frontend ms':>12} {'torch batch ms':>15} {'max |diff|':>11}")
+    for seconds in DURATIONS_S:
+        audio = (0.1 * rng.standard_normal(SR * seconds)).astype(np.float32)
+        diff = float(np.abs(librosa_reference(audio) - frontend(audio, None)).max())
+
+        t_librosa = best_of(lambda: librosa_reference(audio), args.repeat)
+        t_frontend = best_of(lambda: frontend(audio, None), args.repeat)
+        t_batch = best_of(lambda: frontend.batch([audio], max_length=500), args.repeat)
+        print(f"{seconds:>8} {t_librosa * 1e3:>11.1f} {t_frontend * 1e3:>12.1f} "
+              f"{t_batch * 1e3:>15.1f} {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: chunked loading vs whole-file decoding of long recordings
+
+Writes speech-like recordings as 44.1 kHz stereo WAV (so decoding includes
+downmixing and resampling). It then reports wall time and peak numpy
+memory (tracemalloc) for the acoustic features of both paths, and the
+largest relative difference between their features.
+
+Usage (from the repository root):
+    python -m ai.benchmarks.bench_streaming [--minutes 5 20] [--block-seconds 30]
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+from ai.benchmarks.suite import synthetic_audio
+from ai.features import AcousticFeatureExtractor
+from ai.streaming import audio_blocks
+
+SR = 16000
+FILE_SR = 44100
+
+
+def write_recording(path: Path, minutes: float):
+    """Stereo 44.1 kHz PCM_16 WAV, generated and written one minute at a time"""
+    resampler = soxr.ResampleStream(SR, FILE_SR, 1, dtype='float32')
+    with sf.SoundFile(str(path), 'w', FILE_SR, 2, subtype='PCM_16') as f:
+        for minute in range(int(np.ceil(minutes))):
+            seconds = min(60.0, minutes * 60 - minute * 60)
+            block = resampler.resample_chunk(synthetic_audio(seconds, seed=minute),
+                                             last=minute == int(np.ceil(minutes)) - 1)
+            f.write(np.stack((block, 0.7 * block), axis=1))
+
+
+def measure(fn):
+    """(result, seconds, peak MiB of traced allocations)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 20])
+    parser.add_argument("--block-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    extractor = AcousticFeatureExtractor(sr=SR)
+    print(f"{'minutes':>8} {'whole s':>8} {'chunked s':>10} {'whole MiB':>10} "
+          f"{'chunked MiB':>12} {'max rel diff':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            path = Path(tmp) / f"recording_{minutes:g}.wav"
+            write_recording(path, minutes)
+
+            whole, t_whole, m_whole = measure(lambda: extractor.extract(str(path)))
+            (chunked, _, _), t_chunked, m_chunked = measure(
+                lambda: extractor.extract_stream(audio_blocks(str(path), SR, args.block_seconds))
+            )
+            diff = max(abs(float(whole[k]) - float(chunked[k])) / max(abs(float(whole[k])), 1e-12)
+                       for k in whole)
+            print(f"{minutes:>8g} {t_whole:>8.2f} {t_chunked:>10.2f} {m_whole:>10.1f} "
+                  f"{m_chunked:>12.1f} {diff:>13.2e}")
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: VAD engines (webrtc vs energy) on speed and agreement
+
+Speed is measured on synthetic speech-like audio of increasing length.
+Agreement is measured against webrtc (the engine the models were trained
+with) on the bundled recordings and on synthetic clips at a low level,
+with white noise and with mains hum: frame agreement, and the difference
+in the pause features the classifier sees.
+
+Usage (from the repository root):
+    python -m ai.benchmarks.bench_vad [--repeat 5] [--durations 60 600] [--hangover-ms 0]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ai.benchmarks.suite import synthetic_audio
+from ai.features import AcousticFeatureExtractor
+from ai.vad import EnergyVAD, WebRtcVAD
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+SR = 16000
+
+
+def time_vad(vad, audio: np.ndarray, repeat: int) -> float:
+    """Best-of-``repeat`` wall time in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vad(audio)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def agreement_clips(data_dir: Path, extractor: AcousticFeatureExtractor) -> dict:
+    """Bundled recordings plus synthetic level / noise variants"""
+    clips = {path.stem: extractor.load(str(path)) for path in sorted(data_dir.glob("*.wav"))}
+    speech = synthetic_audio(60)
+    rng = np.random.default_rng(0)
+    t = np.arange(len(speech)) / SR
+    clips["synthetic"] = speech
+    clips["synthetic_quiet"] = speech * 0.05
+    clips["synthetic_noisy"] = speech * 0.3 + rng.normal(0, 0.01, len(speech)).astype(np.float32)
+    clips["synthetic_hum"] = speech * 0.3 + (0.01 * np.sin(2 * np.pi * 50 * t)).astype(np.float32)
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--durations", type=float, nargs="+", default=[60, 600],
+                        help="synthetic clip lengths for the speed table (seconds)")
+    parser.add_argument("--hangover-ms", type=float, default=0,
+                        help="hangover smoothing applied to both engines")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args()
+
+    engines = {
+        "webrtc": WebRtcVAD(SR, hangover_ms=args.hangover_ms),
+        "energy": EnergyVAD(SR, hangover_ms=args.hangover_ms)
+    }
+
+    print(f"{'seconds':>8} {'webrtc ms':>10} {'energy ms':>10} {'speedup':>8} {'energy x rt':>12}")
+    for seconds in args.durations:
+        audio = synthetic_audio(seconds)
+        t_webrtc = time_vad(engines["webrtc"], audio, args.repeat)
+        t_energy = time_vad(engines["energy"], audio, args.repeat)
+        print(f"{seconds:>8.0f} {t_webrtc * 1e3:>10.2f} {t_energy * 1e3:>10.2f} "
+              f"{t_webrtc / t_energy:>7.1f}x {seconds / t_energy:>11.0f}x")
+
+    extractor = AcousticFeatureExtractor(sr=SR)
+    print(f"\n{'clip':<20} {'agree':>6} {'pause webrtc':>13} {'pause energy':>13} "
+          f"{'d pauses':>9} {'d mean pause':>13}")
+    for name, audio in agreement_clips(args.data_dir, extractor).items():
+        masks = {engine: vad(audio) for engine, vad in engines.items()}
+        features = {
+            engine: extractor.extract_from_audio(audio, speech_mask=mask)
+            for engine, mask in masks.items()
+        }
+        reference, candidate = features["webrtc"], features["energy"]
+        agree = float((masks["webrtc"] == masks["energy"]).mean()) if len(masks["webrtc"]) else 1.0
+        print(f"{name[:20]:<20} {agree:>6.2f} {reference['pause_ratio']:>13.3f} "
+              f"{candidate['pause_ratio']:>13.3f} "
+              f"{candidate['num_pauses'] - reference['num_pauses']:>+9.0f} "
+              f"{candidate['mean_pause_duration'] - reference['mean_pause_duration']:>+13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare two benchmark suite results and flag regressions
+
+Usage (from the repository root):
+    python -m ai.benchmarks.compare base.json head.json [--threshold 0.10] [--min-delta-ms 5]
+
+A timing regresses when the head median is more than ``threshold`` slower
+than the base median AND slower by at least ``min-delta-ms`` (so
+sub-millisecond stages don't flap on noise). Peak RSS regresses past the
+same relative threshold. Exits with status 1 when anything regressed.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def timings(case: Dict) -> Iterator[Tuple[str, float]]:
+    """(metric name, median seconds) for every timed entry in a case"""
+    yield 'predict', case['predict']['median_s']
+    if 'timeline' in case:
+        yield 'timeline', case['timeline']['median_s']
+    for stage, stats in case.get('stages', {}).items():
+        yield f'stage:{stage}', stats['median_s']
+    for name, stats in case.get('extractors', {}).items():
+        yield f'extractor:{name}', stats['median_s']
+
+
+def compare(base: Dict, head: Dict, threshold: float = 0.10,
+            min_delta_s: float = 0.005) -> List[Dict]:
+    """Row per (clip, metric) present in both results, with a ``regressed`` flag"""
+    base_cases = {c['duration_s']: c for c in base['cases']}
+    rows = []
+    for case in head['cases']:
+        ref = base_cases.get(case['duration_s'])
+        if ref is None:
+            continue
+        ref_times = dict(timings(ref))
+        for metric, value in timings(case):
+            if metric not in ref_times:
+                continue
+            old = ref_times[metric]
+            rows.append(_row(case['duration_s'], metric, old, value,
+                             value > old * (1 + threshold) and value - old >= min_delta_s))
+
+        old_rss, new_rss = ref.get('peak_rss_mb'), case.get('peak_rss_mb')
+        if old_rss and new_rss:
+            rows.append(_row(case['duration_s'], 'peak_rss_mb', old_rss, new_rss,
+                             new_rss > old_rss * (1 + threshold)))
+    return rows
+
+
+def _row(duration: float, metric: str, old: float, new: float, regressed: bool) -> Dict:
+    return {
+        'duration_s': duration,
+        'metric': metric,
+        'base': old,
+        'head': new,
+        'change': (new - old) / old if old else None,
+        'regressed': bool(regressed)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="ignore timing changes smaller than this")
+    parser.add_argument("--all", action="store_true", help="print every row, not just changes")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    rows = compare(base, head, args.threshold, args.min_delta_ms / 1000.0)
+    print(f"base {base['environment'].get('commit')}  ->  head {head['environment'].get('commit')}\n")
+    print(f"{'clip':>7}  {'metric':<36} {'base':>10} {'head':>10} {'change':>8}")
+    for row in rows:
+        if not (args.all or row['regressed'] or abs(row['change'] or 0) >= args.threshold):
+            continue
+        unit = ' MB' if row['metric'] == 'peak_rss_mb' else ' s'
+        change = f"{row['change']:+.1%}" if row['change'] is not None else 'n/a'
+        flag = '  ⚠️ REGRESSION' if row['regressed'] else ''
+        print(f"{row['duration_s']:>6g}s  {row['metric']:<36} {row['base']:>8.3f}{unit} "
+              f"{row['head']:>8.3f}{unit} {change:>8}{flag}")
+
+    regressions = [r for r in rows if r['regressed']]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    print(f"\n✅ No regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
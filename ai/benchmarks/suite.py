@@ -0,0 +1,239 @@
+"""
+End-to-end benchmark suite for ClaritasModel.predict, timeline and its extractors
+
+Usage (from the repository root):
+    python -m ai.benchmarks.suite [--durations 10,60,600,1800] [--repeat 3] [--out results.json]
+    python -m ai.benchmarks.compare base.json head.json
+
+Generates seeded synthetic speech-like audio (voiced harmonic bursts with
+pitch drift, separated by noisy pauses) and matching synthetic transcripts,
+so runs are reproducible and fully offline: no Gemini key, no downloads,
+CPU only. Every ``predict`` stage is timed through ``ai.telemetry`` and the
+extractor methods are timed directly. Results are written as JSON.
+
+Uses trained CNN weights from ModelConfig.CNN_LSTM_FINAL_PATH when present,
+otherwise a randomly initialised CNNLSTM (timings are the same).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+import torch
+
+from ai.config import ModelConfig
+from ai.features import LexicalFeatureExtractor
+from ai.model import CNNLSTM, ClaritasModel
+from ai.telemetry import telemetry
+
+SAMPLE_RATE = 16000
+DEFAULT_DURATIONS = [10, 60, 600, 1800]
+
+
+def synthetic_audio(duration_s: float, sr: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """
+    Speech-like float32 signal: 0.3-2.5 s voiced bursts (5 harmonics of a
+    drifting 90-250 Hz F0, syllable-rate amplitude modulation) alternating
+    with 0.1-3 s pauses of low-level noise.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(duration_s * sr)
+    audio = rng.normal(0, 0.002, total).astype(np.float32)
+
+    pos = 0
+    while pos < total:
+        pos += int(rng.uniform(0.1, 3.0) * sr)
+        length = min(int(rng.uniform(0.3, 2.5) * sr), total - pos)
+        if length <= 0:
+            break
+        t = np.arange(length) / sr
+        f0 = rng.uniform(90, 250) * (1 + 0.1 * np.sin(2 * np.pi * rng.uniform(0.5, 2) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sr
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+        envelope = 0.5 * (1 - np.cos(2 * np.pi * rng.uniform(3, 6) * t)) * np.hanning(length)
+        audio[pos:pos + length] += (0.3 * envelope * voiced).astype(np.float32)
+        pos += length
+
+    return np.clip(audio, -1.0, 1.0)
+
+
+def synthetic_transcript(duration_s: float, words_per_minute: int = 130, seed: int = 0) -> str:
+    """English transcript of plausible length drawn from the lexicons, with some repetitions"""
+    rng = random.Random(seed)
+    vocabulary = (
+        sorted(LexicalFeatureExtractor.CONTENT_WORDS['english'])
+        + sorted(LexicalFeatureExtractor.FUNCTION_WORDS['english'])
+        + sorted(LexicalFeatureExtractor.DEICTIC_WORDS['english'])
+    )
+    words = []
+    for _ in range(max(1, int(duration_s / 60 * words_per_minute))):
+        if words and rng.random() < 0.05:
+            words.append(words[-1])
+        else:
+            words.append(rng.choice(vocabulary))
+    return ' '.join(words)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process high-water RSS in MB (None where ``resource`` is unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def time_call(fn: Callable, repeat: int) -> Dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return summarize(times)
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    return {
+        'median_s': float(np.median(times)),
+        'min_s': float(np.min(times)),
+        'max_s': float(np.max(times))
+    }
+
+
+def build_model(tmp_dir: Path) -> ClaritasModel:
+    config = ModelConfig()
+    if not config.CNN_LSTM_FINAL_PATH.exists():
+        torch.manual_seed(0)
+        weights = tmp_dir / "cnn_lstm_random.pt"
+        torch.save(CNNLSTM(num_classes=3, n_mels=128).state_dict(), weights)
+        print(f"⚠️ {config.CNN_LSTM_FINAL_PATH.name} not found; using random CNN weights")
+        config.CNN_LSTM_FINAL_PATH = weights
+    return ClaritasModel(config)
+
+
+def bench_case(model: ClaritasModel, duration_s: float, repeat: int,
+               tmp_dir: Path, seed: int) -> Dict:
+    audio = synthetic_audio(duration_s, seed=seed)
+    text = synthetic_transcript(duration_s, seed=seed)
+    wav_path = tmp_dir / f"synthetic_{int(duration_s)}s.wav"
+    sf.write(wav_path, audio, SAMPLE_RATE, subtype='PCM_16')
+
+    # Full predict, per-stage timings from telemetry
+    stage_times: Dict[str, List[float]] = {}
+    wall = []
+    for _ in range(repeat):
+        telemetry.reset()
+        start = time.perf_counter()
+        model.predict(wav_path, text=text)
+        wall.append(time.perf_counter() - start)
+        for stage, stats in telemetry.snapshot().items():
+            stage_times.setdefault(stage, []).append(stats['total_s'])
+
+    # Timeline mode over the same file (shared framing, batched CNN windows)
+    timeline = time_call(lambda: model.timeline(wav_path), repeat)
+
+    # Extractor methods in isolation
+    acoustic = model.acoustic_extractor
+    lexical = model.lexical_extractor
+    decoded = acoustic.load(str(wav_path))
+    mask = acoustic.speech_mask(decoded)
+    extractors = {
+        'acoustic.load': time_call(lambda: acoustic.load(str(wav_path)), repeat),
+        'acoustic.speech_mask': time_call(lambda: acoustic.speech_mask(decoded), repeat),
+        'acoustic.pause_features': time_call(
+            lambda: acoustic._extract_pause_features(decoded, mask), repeat),
+        'acoustic.prosody_features': time_call(
+            lambda: acoustic._extract_prosody_features(decoded), repeat),
+        'lexical.extract': time_call(
+            lambda: lexical.extract(text, duration_s * 0.7, duration_s), repeat),
+        'mel_frontend': time_call(lambda: model.mel_frontend(decoded, max_length=None), repeat),
+    }
+
+    median_wall = float(np.median(wall))
+    return {
+        'duration_s': duration_s,
+        'words': len(text.split()),
+        'repeat': repeat,
+        'predict': summarize(wall),
+        'realtime_factor': duration_s / median_wall if median_wall else None,
+        'timeline': timeline,
+        'stages': {stage: summarize(times) for stage, times in sorted(stage_times.items())},
+        'extractors': extractors,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--durations", default=','.join(str(d) for d in DEFAULT_DURATIONS),
+                        help="comma-separated clip lengths in seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="JSON output (default: bench_<commit>.json)")
+    args = parser.parse_args()
+
+    telemetry.enable()
+    env = environment()
+    durations = sorted(float(d) for d in args.durations.split(','))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        model = build_model(tmp_dir)
+
+        # Warm-up: first calls pay for lazy inits and allocator growth
+        warm = tmp_dir / "warmup.wav"
+        sf.write(warm, synthetic_audio(5, seed=args.seed), SAMPLE_RATE, subtype='PCM_16')
+        model.predict(warm, text=synthetic_transcript(5, seed=args.seed))
+
+        cases = []
+        for duration in durations:
+            print(f"\n⏱️  Benchmarking {duration:g}s clip ({args.repeat} runs)...")
+            cases.append(bench_case(model, duration, args.repeat, tmp_dir, args.seed))
+
+    results = {'environment': env, 'cases': cases}
+    out = Path(args.out or f"bench_{env['commit'] or 'local'}.json")
+    out.write_text(json.dumps(results, indent=2))
+
+    print(f"\n{'clip':>8} {'predict':>10} {'x realtime':>11} {'timeline':>10} {'peak RSS':>10}")
+    for case in cases:
+        rss = f"{case['peak_rss_mb']:.0f} MB" if case['peak_rss_mb'] else "n/a"
+        print(f"{case['duration_s']:>7g}s {case['predict']['median_s']:>9.3f}s "
+              f"{case['realtime_factor']:>10.1f}x {case['timeline']['median_s']:>9.3f}s {rss:>10}")
+    print(f"\n✅ Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
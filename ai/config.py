@@ -14,6 +14,23 @@ class ModelConfig:
     MAX_AUDIO_LENGTH = 10  # seconds
     FRAME_DURATION_MS = 30
     VAD_AGGRESSIVENESS = 1
+    # VAD engine: "webrtc" (the models were trained on it) or "energy"
+    # (vectorised energy + ZCR, several times faster). Compare both with
+    # python -m ai.benchmarks.bench_vad before switching.
+    VAD_ENGINE = "webrtc"
+    VAD_HANGOVER_MS = 0           # merge pauses shorter than this into speech
+    VAD_MIN_SPEECH_MS = 0         # drop speech bursts shorter than this
+    VAD_ENERGY_MARGIN_DB = 6.0    # energy engine: threshold above the noise floor
+    VAD_ENERGY_FLOOR_DBFS = -65.0  # energy engine: frames below this are never speech
+    
+    # On-device speech-to-text (optional, requires faster-whisper)
+    # Used only when predict() is called without a transcript
+    ASR_ENABLED = False
+    ASR_MODEL_SIZE = "small"        # Whisper size: tiny / base / small / medium
+    ASR_COMPUTE_TYPE = "int8"       # CTranslate2 quantization for CPU
+    ASR_WORKERS = 1                 # Concurrent transcriptions
+    ASR_CPU_THREADS = 0             # Threads per transcription (0 = library default)
+    ASR_LANGUAGE = None             # e.g. "id", "en", "zh"; None = auto-detect
     
     # Model paths (relative to ai/ folder)
     BASE_DIR = Path(__file__).parent
@@ -22,13 +39,39 @@ class ModelConfig:
     RF_MODEL_PATH = MODELS_DIR / "random_forest_full.pkl"
     XGB_MODEL_PATH = MODELS_DIR / "xgboost_full.pkl"
     
+    # Optional external word lists: lexicons/<language>/<category>.txt
+    LEXICON_DIR = BASE_DIR / "lexicons"
+    
     CAT_FINAL_PATH = MODELS_DIR / "catboost_final.pkl"
     LGBM_FINAL_PATH = MODELS_DIR / "lightgbm_final.pkl"
     RF_FINAL_PATH = MODELS_DIR / "random_forest_final.pkl"
     XGB_FINAL_PATH = MODELS_DIR / "xgboost_final.pkl"
     CNN_LSTM_FINAL_PATH = MODELS_DIR / "cnn_lstm_final.pt"
     
-    # Acoustic feature names (A1-A5 + prosody) - 17 features
+    # CNN-LSTM execution runtime (build artifacts with `python -m ai.export`):
+    #   "eager"     - fp32 nn.Module from CNN_LSTM_FINAL_PATH
+    #   "scripted"  - fp32 TorchScript
+    #   "quantized" - TorchScript with int8 LSTM/Linear (+ int8 conv stack if
+    #                 exported with --static-conv), CPU only
+    CNN_RUNTIME = "eager"
+    CNN_LSTM_SCRIPTED_PATH = MODELS_DIR / "cnn_lstm_scripted.pt"
+    CNN_LSTM_QUANTIZED_PATH = MODELS_DIR / "cnn_lstm_int8.pt"
+    
+    # CNN-LSTM spectrogram inference:
+    #   "truncate" - pad/crop to one window (first ~16 s only), as in training
+    #   "sliding"  - overlapping windows over the whole recording, logits averaged;
+    #                clips shorter than a window run unpadded
+    CNN_INFERENCE_MODE = "truncate"
+    CNN_WINDOW_FRAMES = 500      # ~16 s at hop 512 / 16 kHz
+    CNN_WINDOW_HOP = 250         # 50% overlap between windows
+    CNN_MAX_BATCH = 16           # windows per forward pass
+    MEL_BUFFER_MAX_MB = 32       # largest spectrogram buffer kept per thread between calls
+    
+    # Dynamic micro-batching across concurrent predict() calls
+    CNN_MICROBATCH_ENABLED = False
+    CNN_MICROBATCH_MAX_WAIT_MS = 5   # longest a window waits for a batch to fill
+    
+    # Acoustic feature names (A1-A5 + prosody) - 17 features, in extractor output order
     ACOUSTIC_FEATURES = [
         'pause_ratio',              # A1
         'mean_pause_duration',      # A2
@@ -49,7 +92,7 @@ class ModelConfig:
         'std_zcr'
     ]
     
-    # Lexical feature names (L1-L5) - 16 features (total 33 with acoustic)
+    # Lexical feature names (L1-L5) - 16 features (total 33 with acoustic), extractor order
     LEXICAL_FEATURES = [
         'has_text',                 # Flag: whether text is available
         'total_tokens',
@@ -69,6 +112,122 @@ class ModelConfig:
         'articulation_rate'         # A4: Articulation Rate
     ]
     
+    # Column layout of the tabular vector fed to the scaler and tree models.
+    # This is the order they were fitted in (feature_scaler.pkl
+    # ``feature_names_in_``); the speaking-rate features sit between the
+    # pause and prosody blocks. Extractors write straight into these columns.
+    FEATURE_NAMES = [
+        'pause_ratio', 'mean_pause_duration', 'std_pause_duration',
+        'max_pause_duration', 'num_pauses', 'short_pauses_count',
+        'long_pauses_count', 'voice_ratio', 'speech_duration', 'total_duration',
+        'syllable_count', 'speech_rate', 'articulation_rate',
+        'mean_pitch', 'std_pitch', 'pitch_range', 'mean_energy', 'std_energy',
+        'mean_zcr', 'std_zcr',
+        'has_text', 'total_tokens', 'unique_tokens', 'ttr', 'content_word_count',
+        'function_word_count', 'lexical_density', 'deictic_count', 'deictic_ratio',
+        'word_repetitions', 'phrase_repetitions', 'total_repetitions',
+        'repetition_ratio'
+    ]
+    FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+    
+    # Word/pause alignment features (need word timestamps, e.g. from ASR)
+    ALIGNMENT_MIN_PAUSE = 0.25       # seconds; shorter inter-word gaps are not pauses
+    ALIGNMENT_UTTERANCE_GAP = 1.0    # seconds; longer gaps start a new utterance
+    ALIGNMENT_FEATURES = [
+        'num_utterances',
+        'mean_segment_rate',          # Per-utterance speech rate (syllables/min)
+        'std_segment_rate',
+        'min_segment_rate',
+        'max_segment_rate',
+        'within_utterance_pauses',
+        'mean_within_pause',
+        'between_utterance_pauses',
+        'mean_between_pause',
+        'filled_pause_count',         # Word gaps where VAD still hears voice
+        'noun_count',
+        'pre_noun_pause_count',       # Hesitation before nouns
+        'pre_noun_pause_ratio',
+        'mean_pre_noun_pause'
+    ]
+    
+    # Runtime threading policy (None = library default, which uses every core).
+    # Single-row tree inference gains nothing from threads, so boosters and the
+    # forest default to 1 to stay out of torch's way under concurrent requests.
+    THREADING = {
+        'torch': None,            # intra-op threads for the CNN-LSTM
+        'torch_interop': None,
+        'blas': None,             # threadpoolctl limit around tabular models
+        'openmp': None,
+        'lightgbm': 1,
+        'catboost': 1,
+        'sklearn': 1              # RandomForest n_jobs
+    }
+    # Core pinning: None, a list of core ids, or "worker" to pin each server
+    # worker (CLARITAS_WORKER_INDEX) to its own THREADING['torch'] cores
+    CPU_AFFINITY = None
+    
+    # Soft-voting weights of the ensemble members (sum to 1). Overridden at
+    # load time by ENSEMBLE_WEIGHTS_PATH when present (written by ``python -m
+    # ai.tuning``, which may also store tuned RISK_THRESHOLDS there)
+    ENSEMBLE_WEIGHTS_PATH = MODELS_DIR / "ensemble_weights.pkl"
+    ENSEMBLE_WEIGHTS = {
+        'cnn': 0.65,
+        'catboost': 0.20,
+        'lightgbm': 0.10,
+        'random_forest': 0.05
+    }
+    
+    # Early-exit cascade: run the tree members first and skip the CNN-LSTM
+    # (and its spectrogram) when their weight-renormalised soft vote has a
+    # top-1 minus top-2 margin of at least CASCADE_MARGIN. Calibrate the
+    # margin with ``python -m ai.tuning cascade``. CASCADE_EXIT_CLASSES limits
+    # early exits to some predicted classes (e.g. ['HC']); None allows any.
+    CASCADE_ENABLED = False
+    CASCADE_MARGIN = 0.6
+    CASCADE_EXIT_CLASSES = None
+    
+    # Audio preprocessing of the decoded buffer, before every extractor
+    # (ai/preprocessing.py). The bundled models were trained on raw audio,
+    # so all stages are off by default; enable them together with retraining,
+    # or for recordings whose levels vary widely (quiet or noisy phone calls).
+    # Changing them changes extracted features: bump FEATURE_EXTRACTOR_VERSION.
+    PREPROCESS_DC_REMOVAL = False
+    PREPROCESS_NORMALIZATION = None       # None | "peak" | "loudness" (BS.1770 LUFS)
+    PREPROCESS_PEAK_DBFS = -1.0           # peak target, and ceiling for loudness gain
+    PREPROCESS_TARGET_LUFS = -23.0        # EBU R128 programme loudness
+    PREPROCESS_DENOISE = False            # spectral-gating noise reduction
+    PREPROCESS_DENOISE_STRENGTH = 1.5     # gate, in std devs above the noise floor (dB)
+    PREPROCESS_DENOISE_REDUCTION_DB = 20.0  # attenuation of gated bins
+    
+    # Chunked loading (ai/streaming.py): recordings of at least
+    # STREAMING_MIN_SECONDS are read in soundfile blocks with streaming soxr
+    # resampling, in memory bounded by the block size rather than the file.
+    # Features match whole-file decoding up to float rounding. Not used with
+    # preprocessing or on-device ASR (both need the whole buffer), nor for
+    # formats soundfile cannot read.
+    STREAMING_ENABLED = True
+    STREAMING_MIN_SECONDS = 600.0
+    STREAMING_BLOCK_SECONDS = 30.0
+    
+    # Timeline mode (ClaritasModel.timeline): per-window markers of long recordings
+    TIMELINE_WINDOW_SECONDS = 30.0
+    TIMELINE_HOP_SECONDS = 30.0      # below the window length for overlapping windows
+    TIMELINE_MIN_SECONDS = 5.0       # shorter trailing audio joins the previous window
+    
+    # Per-prediction explanations, computed in the same pass as the ensemble
+    # (TreeSHAP for CatBoost/LightGBM, path contributions for the random
+    # forest, CNN-LSTM attention over time). Off by default: they add ~50 ms
+    # to a predict() call (mostly CatBoost SHAP), so callers opt in with
+    # predict(explain=True).
+    # Attention needs the eager CNN runtime without micro-batching.
+    EXPLAIN_PREDICTIONS = False
+    EXPLAIN_SEGMENT_SECONDS = 1.0    # attention is reported per segment of audio
+    
+    # Persistent feature store (``python -m ai.feature_store``). Bump the
+    # version whenever feature extraction changes so stale vectors are rebuilt.
+    FEATURE_STORE_DIR = BASE_DIR / "feature_store"
+    FEATURE_EXTRACTOR_VERSION = "2"
+    
     # Risk classification thresholds
     RISK_THRESHOLDS = {
         'low': 0.30,      # < 30% probability of impairment
@@ -154,7 +154,8 @@ def example_api_response():
     
     result = model.predict(
         audio_path="ai/data/ncmmsc_1_0638.wav",
-        text="ai/data/ncmmsc_1_0638.txt"
+        text="ai/data/ncmmsc_1_0638.txt",
+        explain=True
     )
     
     # Format for API response
@@ -190,7 +191,9 @@ def example_api_response():
                     'speech_rate': result['fitur_leksikal']['speech_rate'],
                     'repetition_ratio': result['fitur_leksikal']['total_repetitions']
                 }
-            }
+            },
+            # Per-patient contributions + CNN attention, from the same inference
+            'explanation': result['explanation']
         }
     }
     
@@ -198,6 +201,23 @@ def example_api_response():
     print(json.dumps(api_response, indent=2))
 
 
+def example_timeline():
+    """Example showing per-window timeline of a recording"""
+    print("\n" + "=" * 60)
+    print("EXAMPLE 7: Timeline of a Long Recording")
+    print("=" * 60)
+    
+    model = ClaritasModel()
+    
+    # 30 s windows by default (TIMELINE_WINDOW_SECONDS); shorter here for a short clip
+    timeline = model.timeline("ai/data/ncmmsc_1_0638.wav", window_seconds=10)
+    
+    print(f"\n{'window':>13} {'pause':>6} {'fluency':>8} {'CNN':>5}")
+    for w in timeline['windows']:
+        print(f"{w['start']:5.0f}-{w['end']:5.0f}s {w['pause_ratio']:6.1%} "
+              f"{w['fluency_score']:8.1f} {w['predicted_class']:>5}")
+
+
 if __name__ == "__main__":
     # Run examples
     try:
@@ -207,6 +227,7 @@ if __name__ == "__main__":
         example_batch_processing()
         example_feature_importance()
         example_api_response()
+        example_timeline()
         
         print("\n" + "=" * 60)
         print("All examples completed successfully!")
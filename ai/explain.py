@@ -0,0 +1,181 @@
+"""
+Per-prediction explanations for the Claritas ensemble
+
+Every helper returns class probabilities together with the contributions
+that produced them, so explaining a prediction never needs a second
+inference:
+
+- CatBoost / LightGBM: TreeSHAP values (log-odds space). The softmax of
+  their per-class sums is exactly ``predict_proba``.
+- Random forest: Saabas path contributions (probability space). For every
+  split on the decision path, the change in class distribution is credited
+  to the split feature. The per-node deltas are precomputed into one sparse
+  matrix, so a batch is explained with a single ``decision_path`` call and
+  one sparse matmul. Bias plus contributions equals ``predict_proba``.
+- CNN-LSTM: attention weights over LSTM steps, mapped back to time. Each
+  step spans 8 spectrogram frames (three 2x max-pools), ~0.256 s at hop 512
+  and 16 kHz.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from .windowing import window_starts
+
+# Spectrogram frames per LSTM step (three MaxPool2d(2) over time)
+FRAMES_PER_STEP = 8
+
+
+def _softmax(raw: np.ndarray) -> np.ndarray:
+    e = np.exp(raw - raw.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def lightgbm_contributions(model, X: np.ndarray, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, K) probabilities and (N, F, K) TreeSHAP values of an LGBMClassifier"""
+    n, f = X.shape
+    k = len(model.classes_)
+    contrib = model.predict(X, pred_contrib=True, **kwargs).reshape(n, k, f + 1)
+    return _softmax(contrib.sum(axis=2)), contrib[:, :, :f].transpose(0, 2, 1)
+
+
+def catboost_contributions(model, X: np.ndarray, **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """(N, K) probabilities and (N, F, K) TreeSHAP values of a multiclass CatBoostClassifier"""
+    from catboost import Pool
+
+    shap = model.get_feature_importance(Pool(X), type='ShapValues', **kwargs)
+    return _softmax(shap.sum(axis=2)), shap[:, :, :-1].transpose(0, 2, 1)
+
+
+class ForestContributions:
+    """Saabas contributions of a fitted RandomForestClassifier as one sparse matmul"""
+
+    def __init__(self, forest):
+        self.forest = forest
+        self.num_features = forest.n_features_in_
+        self.num_classes = len(forest.classes_)
+        n_trees = len(forest.estimators_)
+
+        rows, cols, data = [], [], []
+        bias = np.zeros(self.num_classes)
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            value = tree.value[:, 0, :]
+            value = value / value.sum(axis=1, keepdims=True)
+            bias += value[0]
+
+            parent = np.full(tree.node_count, -1)
+            internal = np.flatnonzero(tree.children_left >= 0)
+            parent[tree.children_left[internal]] = internal
+            parent[tree.children_right[internal]] = internal
+            children = np.flatnonzero(parent >= 0)
+
+            delta = (value[children] - value[parent[children]]) / n_trees
+            feature = tree.feature[parent[children]]
+            rows.append(np.repeat(offset + children, self.num_classes))
+            cols.append((feature[:, None] * self.num_classes + np.arange(self.num_classes)).ravel())
+            data.append(delta.ravel())
+            offset += tree.node_count
+
+        self.bias = bias / n_trees
+        self.matrix = sp.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(offset, self.num_features * self.num_classes)
+        )
+
+    def __call__(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(N, K) probabilities and (N, F, K) path contributions"""
+        paths, _ = self.forest.decision_path(X)
+        contrib = np.asarray((paths @ self.matrix).todense()).reshape(
+            len(X), self.num_features, self.num_classes
+        )
+        return self.bias + contrib.sum(axis=1), contrib
+
+
+def frame_attention(step_weights: np.ndarray, window_frames: int) -> np.ndarray:
+    """Spread (steps,) attention of one window over its ``window_frames`` frames"""
+    steps = max(1, min(len(step_weights), window_frames // FRAMES_PER_STEP))
+    weights = step_weights[:steps] / max(step_weights[:steps].sum(), 1e-12)
+    frames = np.repeat(weights / FRAMES_PER_STEP, FRAMES_PER_STEP)
+    out = np.zeros(window_frames)
+    out[:min(len(frames), window_frames)] = frames[:window_frames]
+    return out
+
+
+def recording_attention(lengths: List[int], window_attention: List[np.ndarray],
+                        window_lengths: List[int], owners: np.ndarray, weights: np.ndarray,
+                        window: int, hop: int) -> List[np.ndarray]:
+    """
+    Frame-level attention of each recording from its windows' step attention.
+
+    Windows are placed at their ``split_windows`` offsets and overlapping
+    frames get the weighted mean, with the same frame weights used to
+    average the windows' logits.
+    """
+    totals = [np.zeros(n) for n in lengths]
+    coverage = [np.zeros(n) for n in lengths]
+    starts = {}
+    for attention, width, owner, weight in zip(window_attention, window_lengths, owners, weights):
+        queue = starts.setdefault(owner, iter(window_starts(lengths[owner], window, hop)))
+        start = next(queue)
+        frames = frame_attention(attention, width)[:lengths[owner] - start]
+        totals[owner][start:start + len(frames)] += weight * frames
+        coverage[owner][start:start + len(frames)] += weight
+    return [t / np.maximum(c, 1e-12) for t, c in zip(totals, coverage)]
+
+
+def attention_segments(frame_weights: np.ndarray, num_frames: int, frame_seconds: float,
+                       segment_seconds: float = 1.0) -> List[Dict[str, float]]:
+    """
+    Attention per ``segment_seconds`` of audio, renormalised to sum to 1.
+
+    ``frame_weights`` covers the scored spectrogram; frames past
+    ``num_frames`` (padding of short clips) are dropped.
+    """
+    weights = frame_weights[:num_frames]
+    total = weights.sum()
+    if len(weights) == 0 or total <= 0:
+        return []
+    per_segment = max(1, int(round(segment_seconds / frame_seconds)))
+    bins = np.add.reduceat(weights / total, np.arange(0, len(weights), per_segment))
+    return [
+        {
+            'start': round(i * per_segment * frame_seconds, 3),
+            'end': round(min((i + 1) * per_segment, len(weights)) * frame_seconds, 3),
+            'weight': float(w)
+        }
+        for i, w in enumerate(bins)
+    ]
+
+
+def summarize_contributions(contributions: Dict[str, np.ndarray], member_weights: Dict[str, float],
+                            feature_names: List[str], values: np.ndarray,
+                            class_idx: int) -> List[Dict]:
+    """
+    Per-feature explanation of one prediction for ``class_idx``, strongest first.
+
+    Members report in different units (log-odds vs probability), so each
+    member's contributions are scaled to unit L1 norm before the weighted
+    vote. ``contribution`` is that signed share (positive pushes towards
+    the class); raw per-member values are kept under ``members``.
+    """
+    total_weight = sum(member_weights[m] for m in contributions) or 1.0
+    combined = np.zeros(len(feature_names))
+    for member, contrib in contributions.items():
+        scale = np.abs(contrib[:, class_idx]).sum()
+        if scale > 0:
+            combined += member_weights[member] / total_weight * contrib[:, class_idx] / scale
+
+    order = np.argsort(-np.abs(combined), kind='stable')
+    return [
+        {
+            'feature': feature_names[i],
+            'value': float(values[i]),
+            'contribution': float(combined[i]),
+            'members': {m: float(c[i, class_idx]) for m, c in contributions.items()}
+        }
+        for i in order
+    ]
@@ -0,0 +1,188 @@
+"""
+Export the CNN-LSTM for CPU inference
+
+Builds the artifacts selected by ``ModelConfig.CNN_RUNTIME``:
+  - scripted:  fp32 TorchScript
+  - quantized: TorchScript with dynamic int8 LSTM/Linear layers and,
+               with --static-conv, a statically quantized conv stack
+               calibrated on the recordings in ai/data
+
+and writes an accuracy-parity report (vs. the fp32 eager model) plus a
+latency benchmark next to the artifacts.
+
+Usage (from the repository root):
+    python -m ai.export [--static-conv] [--runs 20]
+"""
+
+import argparse
+import copy
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.ao import quantization as tq
+
+from .config import ModelConfig
+from .features import AcousticFeatureExtractor
+from .model import CNNLSTM, mel_spectrogram
+
+# Conv -> BatchNorm -> ReLU triples inside CNNLSTM.conv_layers
+CONV_FUSION_GROUPS = [['0', '1', '2'], ['5', '6', '7'], ['10', '11', '12']]
+
+
+class _StaticQuantConvStack(nn.Module):
+    """Quantize -> int8 conv stack -> dequantize, so the LSTM still sees fp32"""
+
+    def __init__(self, conv_layers: nn.Sequential):
+        super().__init__()
+        self.quant = tq.QuantStub()
+        self.body = conv_layers
+        self.dequant = tq.DeQuantStub()
+
+    def forward(self, x):
+        return self.dequant(self.body(self.quant(x)))
+
+
+def load_eager_model(weights_path=ModelConfig.CNN_LSTM_FINAL_PATH) -> CNNLSTM:
+    """fp32 reference model on CPU"""
+    model = CNNLSTM(num_classes=3, n_mels=128)
+    model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    model.eval()
+    return model
+
+
+def quantize_model(model: CNNLSTM, calibration: List[torch.Tensor] = None) -> nn.Module:
+    """
+    Dynamic int8 quantization of LSTM/Linear layers. When calibration
+    spectrograms are given, the conv stack is also statically quantized.
+    """
+    model = copy.deepcopy(model).eval()
+
+    if calibration:
+        engine = 'x86' if 'x86' in torch.backends.quantized.supported_engines else 'qnnpack'
+        torch.backends.quantized.engine = engine
+        body = tq.fuse_modules(model.conv_layers, CONV_FUSION_GROUPS)
+        stack = _StaticQuantConvStack(body).eval()
+        stack.qconfig = tq.get_default_qconfig(engine)
+        tq.prepare(stack, inplace=True)
+        with torch.no_grad():
+            for spectrogram in calibration:
+                stack(spectrogram)
+        tq.convert(stack, inplace=True)
+        model.conv_layers = stack
+
+    return tq.quantize_dynamic(model, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+
+
+def to_torchscript(model: nn.Module, example: torch.Tensor) -> torch.jit.ScriptModule:
+    """Trace to TorchScript (traced graphs accept any spectrogram width)"""
+    with torch.no_grad():
+        return torch.jit.freeze(torch.jit.trace(model, example).eval())
+
+
+def load_spectrograms(data_dir=ModelConfig.BASE_DIR / "data") -> Dict[str, torch.Tensor]:
+    """Model-ready spectrograms (1, 1, 128, 500) for every WAV in ``data_dir``"""
+    extractor = AcousticFeatureExtractor(sr=ModelConfig.SAMPLE_RATE)
+    spectrograms = {}
+    for path in sorted(Path(data_dir).glob("*.wav")):
+        mel = mel_spectrogram(extractor.load(str(path)), sr=ModelConfig.SAMPLE_RATE)
+        spectrograms[path.name] = torch.from_numpy(mel.astype(np.float32))[None, None]
+    return spectrograms
+
+
+def parity_report(reference: nn.Module, candidates: Dict[str, nn.Module],
+                  inputs: Dict[str, torch.Tensor]) -> Dict:
+    """Per-file probability drift and class agreement against the fp32 model"""
+    report = {}
+    with torch.no_grad():
+        expected = {name: F.softmax(reference(x), dim=1)[0] for name, x in inputs.items()}
+        for runtime, model in candidates.items():
+            files = {}
+            for name, x in inputs.items():
+                probs = F.softmax(model(x), dim=1)[0]
+                files[name] = {
+                    'max_abs_prob_diff': float((probs - expected[name]).abs().max()),
+                    'same_class': bool(probs.argmax() == expected[name].argmax())
+                }
+            report[runtime] = {
+                'max_abs_prob_diff': max((f['max_abs_prob_diff'] for f in files.values()), default=0.0),
+                'class_agreement': float(np.mean([f['same_class'] for f in files.values()])) if files else 1.0,
+                'files': files
+            }
+    return report
+
+
+def latency_benchmark(models: Dict[str, nn.Module], example: torch.Tensor,
+                      runs: int = 20, warmup: int = 3) -> Dict:
+    """Single-request CPU latency per runtime, in milliseconds"""
+    results = {}
+    with torch.no_grad():
+        for runtime, model in models.items():
+            for _ in range(warmup):
+                model(example)
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                model(example)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[runtime] = {
+                'median_ms': float(np.median(timings)),
+                'p90_ms': float(np.percentile(timings, 90))
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export CNN-LSTM for CPU inference")
+    parser.add_argument("--weights", default=str(ModelConfig.CNN_LSTM_FINAL_PATH))
+    parser.add_argument("--out-dir", default=str(ModelConfig.MODELS_DIR))
+    parser.add_argument("--static-conv", action="store_true",
+                        help="also statically quantize the conv stack (calibrated on ai/data)")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    eager = load_eager_model(args.weights)
+    inputs = load_spectrograms()
+    example = next(iter(inputs.values()), torch.zeros(1, 1, 128, 500))
+
+    print("Exporting TorchScript (fp32)...")
+    scripted = to_torchscript(eager, example)
+    scripted_path = out_dir / ModelConfig.CNN_LSTM_SCRIPTED_PATH.name
+    torch.jit.save(scripted, str(scripted_path))
+
+    print(f"Exporting TorchScript (int8{', static conv' if args.static_conv else ''})...")
+    quantized = to_torchscript(
+        quantize_model(eager, list(inputs.values()) if args.static_conv else None), example
+    )
+    quantized_path = out_dir / ModelConfig.CNN_LSTM_QUANTIZED_PATH.name
+    torch.jit.save(quantized, str(quantized_path))
+
+    candidates = {'scripted': scripted, 'quantized': quantized}
+    report = {
+        'static_conv': args.static_conv,
+        'artifacts': {'scripted': str(scripted_path), 'quantized': str(quantized_path)},
+        'parity': parity_report(eager, candidates, inputs),
+        'latency': latency_benchmark({'eager': eager, **candidates}, example, runs=args.runs)
+    }
+    report_path = out_dir / "cnn_export_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for runtime, parity in report['parity'].items():
+        print(f"  {runtime:10s} max |dp| = {parity['max_abs_prob_diff']:.5f}, "
+              f"class agreement = {parity['class_agreement']:.0%}")
+    for runtime, latency in report['latency'].items():
+        print(f"  {runtime:10s} {latency['median_ms']:.1f} ms (p90 {latency['p90_ms']:.1f} ms)")
+    print(f"✅ Report written to {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Persistent feature store for the tabular ensemble and the CNN-LSTM
+
+Extracted ``FEATURE_NAMES`` vectors (and optionally
+the full-length mel spectrograms) are stored as append-only segments of
+memory-mapped ``.npy`` files, keyed by the SHA-256 of the audio bytes plus
+the SHA-256 of the transcript. Each ``FEATURE_EXTRACTOR_VERSION`` gets its
+own directory, so a version bump starts a fresh store instead of mixing
+vectors from different extractors.
+
+    <FEATURE_STORE_DIR>/v<version>/
+        manifest.json              feature names + segment list
+        seg-00001.features.npy     (rows, 33) float64
+        seg-00001.keys.json        [{"key", "path"}, ...] in row order
+        seg-00001.mels.npy         (128, total frames) float32, rows side by side, optional
+        seg-00001.mel_offsets.npy  (rows + 1,) int64 first frame of each row
+
+``update`` only extracts files whose key is not stored yet and writes them
+as one new segment; the manifest is replaced last so a crash never exposes
+a partial segment. A new entry for a path already in the store (e.g. the
+file was re-encoded or its transcript changed) replaces the old entry; the
+old row stays in its segment file, unreachable, until the store is rebuilt. Re-scoring reads the whole matrix and classifies it in
+one vectorized pass. Spectrograms are shaped for ``CNN_INFERENCE_MODE`` when
+read (the whole recording for 'sliding', its first window otherwise), so
+scores match ``predict`` in either mode. Single writer per store.
+
+Usage (from the repository root):
+    python -m ai.feature_store update --csv "ai/data/metadata copy.csv" [--audio-dir ai/data] [--spectrograms]
+    python -m ai.feature_store rescore [--out scores.csv]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import ModelConfig
+
+_CHUNK = 1 << 20
+
+
+def file_sha256(path: os.PathLike) -> str:
+    """SHA-256 of a file, read in 1 MB chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_key(audio_path: os.PathLike, text: Optional[str] = None) -> str:
+    """Store key: audio content hash + transcript hash (lexical features depend on both)"""
+    text_hash = hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+    return f"{file_sha256(audio_path)}:{text_hash[:16]}"
+
+
+class FeatureStore:
+    """Append-only, memory-mapped store of feature vectors and spectrograms"""
+
+    def __init__(self, root: Optional[os.PathLike] = None, config: Optional[ModelConfig] = None):
+        self.config = config or ModelConfig()
+        self.feature_names = list(self.config.FEATURE_NAMES)
+        self.version = str(self.config.FEATURE_EXTRACTOR_VERSION)
+        self.root = Path(root or self.config.FEATURE_STORE_DIR) / f"v{self.version}"
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._manifest = self._load_manifest()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._paths: Dict[str, str] = {}
+        self._keys_by_path: Dict[str, str] = {}
+        for seg, segment in enumerate(self._manifest['segments']):
+            with open(self.root / f"{segment['name']}.keys.json", encoding='utf-8') as f:
+                for row, entry in enumerate(json.load(f)):
+                    self._add(entry['key'], entry['path'], seg, row)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    # ------------------------------------------------------------------ writes
+
+    def update(self, model, items: Iterable[Tuple[os.PathLike, Optional[str]]],
+               spectrograms: bool = False) -> List[str]:
+        """
+        Extract and store every (audio_path, transcript) pair not stored yet.
+
+        ``model`` is a ClaritasModel (its extractors and mel frontend are
+        used, so vectors match ``predict``). Returns the keys of all items,
+        new and existing, in input order.
+        """
+        keys, pending = [], []
+        seen = set()
+        for audio_path, text in items:
+            key = content_key(audio_path, text)
+            keys.append(key)
+            if key not in self._index and key not in seen:
+                seen.add(key)
+                pending.append((key, str(audio_path), text))
+
+        if not pending:
+            print(f"✅ Feature store up to date ({len(self)} entries)")
+            return keys
+
+        print(f"Extracting {len(pending)} new recording(s) "
+              f"({len(keys) - len(pending)} already stored)...")
+        features = np.zeros((len(pending), len(self.feature_names)), dtype=np.float64)
+        mels = [] if spectrograms else None
+
+        for i, (key, audio_path, text) in enumerate(pending):
+            audio = model.acoustic_extractor.load(audio_path)
+            speech_mask = model.acoustic_extractor.speech_mask(audio)
+            acoustic = model.acoustic_extractor.extract_from_audio(
+                audio, speech_mask, out=features[i]
+            )
+            model.lexical_extractor.extract(
+                text, acoustic['speech_duration'], acoustic['total_duration'], out=features[i]
+            )
+            if mels is not None:
+                mels.append(model.mel_frontend(audio, max_length=None).copy())
+
+        self._write_segment([(k, p) for k, p, _ in pending], features, mels)
+        return keys
+
+    def _write_segment(self, entries: List[Tuple[str, str]], features: np.ndarray,
+                       mels: Optional[List[np.ndarray]]):
+        name = f"seg-{len(self._manifest['segments']) + 1:05d}"
+        _atomic_save(self.root / f"{name}.features.npy", features)
+        if mels is not None:
+            offsets = np.cumsum([0] + [m.shape[1] for m in mels]).astype(np.int64)
+            _atomic_save(self.root / f"{name}.mels.npy", np.concatenate(mels, axis=1))
+            _atomic_save(self.root / f"{name}.mel_offsets.npy", offsets)
+        _atomic_write_json(self.root / f"{name}.keys.json",
+                           [{'key': k, 'path': p} for k, p in entries])
+
+        self._manifest['segments'].append({
+            'name': name, 'rows': len(entries), 'spectrograms': mels is not None
+        })
+        _atomic_write_json(self.root / "manifest.json", self._manifest)
+
+        seg = len(self._manifest['segments']) - 1
+        for row, (key, path) in enumerate(entries):
+            self._add(key, path, seg, row)
+        print(f"✅ Stored {len(entries)} vector(s) in {name} ({len(self)} total)")
+
+    def _add(self, key: str, path: str, seg: int, row: int):
+        """Index an entry; it supersedes the entry previously stored for ``path``"""
+        previous = self._keys_by_path.get(path)
+        if previous is not None and previous != key and self._paths.get(previous) == path:
+            del self._index[previous], self._paths[previous]
+        self._index[key] = (seg, row)
+        self._paths[key] = path
+        self._keys_by_path[path] = key
+
+    # ------------------------------------------------------------------- reads
+
+    def keys(self) -> List[str]:
+        return list(self._index)
+
+    def path(self, key: str) -> str:
+        return self._paths[key]
+
+    def features(self, keys: Optional[List[str]] = None) -> np.ndarray:
+        """(len(keys), 33) raw feature matrix (all entries when ``keys`` is None)"""
+        keys = self.keys() if keys is None else keys
+        locations = np.array([self._index[k] for k in keys], dtype=np.int64).reshape(-1, 2)
+        out = np.empty((len(keys), len(self.feature_names)), dtype=np.float64)
+        for seg in np.unique(locations[:, 0]):
+            data = np.load(self.root / f"{self._manifest['segments'][seg]['name']}.features.npy",
+                           mmap_mode='r')
+            mask = locations[:, 0] == seg
+            out[mask] = data[locations[mask, 1]]
+        return out
+
+    def spectrograms(self, keys: Optional[List[str]] = None,
+                     mode: Optional[str] = None) -> List[np.ndarray]:
+        """
+        Stored mels as ``predict`` hands them to the CNN in ``mode`` (default
+        CNN_INFERENCE_MODE): (128, T) for 'sliding', else (128,
+        CNN_WINDOW_FRAMES), truncated or zero-padded. Raises KeyError if an
+        entry was stored without one.
+        """
+        keys = self.keys() if keys is None else keys
+        sliding = (mode or self.config.CNN_INFERENCE_MODE) == 'sliding'
+        window = self.config.CNN_WINDOW_FRAMES
+        loaded, out = {}, []
+        for key in keys:
+            seg, row = self._index[key]
+            if seg not in loaded:
+                loaded[seg] = self._load_mels(self._manifest['segments'][seg])
+            data, offsets = loaded[seg]
+            mel = data[:, offsets[row]:offsets[row + 1]]
+            out.append(np.array(mel) if sliding else _first_window(mel, window))
+        return out
+
+    def has_spectrograms(self, keys: Optional[List[str]] = None) -> bool:
+        keys = self.keys() if keys is None else keys
+        segments = self._manifest['segments']
+        return all(segments[self._index[k][0]]['spectrograms'] for k in keys)
+
+    def _load_mels(self, segment: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Memory-mapped (128, total frames) mels of a segment and their row offsets"""
+        if not segment['spectrograms']:
+            raise KeyError(f"{segment['name']} was stored without spectrograms")
+        return (np.load(self.root / f"{segment['name']}.mels.npy", mmap_mode='r'),
+                np.load(self.root / f"{segment['name']}.mel_offsets.npy"))
+
+    # ----------------------------------------------------------------- scoring
+
+    def member_probabilities(self, model, keys: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        (N, 3) class probabilities of every ensemble member for the stored
+        vectors, in one batched call per member. 'cnn' is present only when
+        every requested entry has a stored spectrogram.
+        """
+        keys = self.keys() if keys is None else keys
+        X = model.scale_features(self.features(keys))
+        policy = model.threading_policy
+        with policy.limits():
+            members = {
+                'catboost': model.cat_model.predict_proba(X, **policy.predict_kwargs('catboost')),
+                'random_forest': model.rf_model.predict_proba(X),
+                'lightgbm': model.lgbm_model.predict_proba(X, **policy.predict_kwargs('lightgbm'))
+            }
+        if keys and self.has_spectrograms(keys):
+            members['cnn'] = model.cnn_probabilities(
+                self.spectrograms(keys, model.config.CNN_INFERENCE_MODE)
+            )
+        return members
+
+    def rescore(self, model, keys: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized re-classification of stored entries with the model's current
+        ensemble weights and RISK_THRESHOLDS. Without stored spectrograms the
+        CNN weight is redistributed over the tree members.
+        """
+        keys = self.keys() if keys is None else keys
+        members = self.member_probabilities(model, keys)
+        if 'cnn' not in members:
+            probabilities = model.tree_probabilities(members)
+        else:
+            probabilities = model.ensemble_probabilities(members)
+
+        predicted = probabilities.argmax(axis=1)
+        impairment = probabilities[:, 1] + probabilities[:, 2]
+        thresholds = model.config.RISK_THRESHOLDS
+        risk = np.where(impairment < thresholds['low'], 'low',
+                        np.where(impairment < thresholds['high'], 'medium', 'high'))
+        return {
+            'keys': np.asarray(keys),
+            'probabilities': probabilities,
+            'predicted_class': np.asarray(model.config.CLASS_NAMES)[predicted],
+            'risk_level': risk,
+            'used_cnn': 'cnn' in members
+        }
+
+    # ---------------------------------------------------------------- manifest
+
+    def _load_manifest(self) -> Dict:
+        path = self.root / "manifest.json"
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest['feature_names'] != self.feature_names:
+                raise ValueError(
+                    f"Feature store at {self.root} was built with different feature names; "
+                    "bump FEATURE_EXTRACTOR_VERSION"
+                )
+            return manifest
+        return {'extractor_version': self.version, 'feature_names': self.feature_names,
+                'segments': []}
+
+
+def _first_window(mel: np.ndarray, frames: int) -> np.ndarray:
+    """First ``frames`` columns of ``mel``, zero-padded (MelFrontend's max_length)"""
+    out = np.zeros((mel.shape[0], frames), dtype=np.float32)
+    keep = min(mel.shape[1], frames)
+    out[:, :keep] = mel[:, :keep]
+    return out
+
+
+def _atomic_save(path: Path, array: np.ndarray):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _atomic_write_json(path: Path, data):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def read_metadata(csv_path: os.PathLike, audio_dir: Optional[os.PathLike] = None,
+                  label_column: Optional[str] = None) -> List[Tuple]:
+    """
+    (audio path, transcript) pairs from a metadata CSV with filename/text
+    columns, or (audio path, transcript, int label) with ``label_column``.
+    Rows whose audio file does not exist are skipped.
+    """
+    audio_dir = Path(audio_dir) if audio_dir else Path(csv_path).parent
+    items, missing = [], 0
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            path = audio_dir / row['filename']
+            if not path.exists():
+                missing += 1
+                continue
+            item = (path, row.get('text') or '')
+            items.append(item + (int(row[label_column]),) if label_column else item)
+    if missing:
+        print(f"⚠️ {missing} audio file(s) listed in {csv_path} not found; skipped")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or re-score the Claritas feature store")
+    parser.add_argument("command", choices=("update", "rescore"))
+    parser.add_argument("--csv", help="metadata CSV with filename and text columns (update)")
+    parser.add_argument("--audio-dir", default=None, help="audio folder (default: CSV folder)")
+    parser.add_argument("--store", default=None, help="store root (default: FEATURE_STORE_DIR)")
+    parser.add_argument("--spectrograms", action="store_true", help="also store CNN mels")
+    parser.add_argument("--out", default=None, help="CSV of re-scored predictions (rescore)")
+    args = parser.parse_args()
+
+    from .model import ClaritasModel
+
+    store = FeatureStore(args.store)
+    model = ClaritasModel()
+
+    if args.command == "update":
+        if not args.csv:
+            parser.error("update needs --csv")
+        store.update(model, read_metadata(args.csv, args.audio_dir), spectrograms=args.spectrograms)
+        return
+
+    result = store.rescore(model)
+    print(f"Re-scored {len(result['keys'])} entries "
+          f"({'with' if result['used_cnn'] else 'without'} CNN spectrograms)")
+    if args.out:
+        with open(args.out, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['path', 'key', 'predicted_class', 'risk_level'] + model.config.CLASS_NAMES)
+            for i, key in enumerate(result['keys']):
+                writer.writerow([store.path(key), key, result['predicted_class'][i],
+                                 result['risk_level'][i]] + list(result['probabilities'][i]))
+        print(f"✅ Predictions written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
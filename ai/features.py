@@ -4,63 +4,150 @@ Feature extraction for acoustic and lexical analysis
 
 import numpy as np
 import librosa
-import webrtcvad
 import re
 from collections import Counter
-from typing import Dict, Optional, List
+from itertools import islice
+from operator import eq
+from typing import Dict, Iterable, Optional, List, Tuple
+
+from .config import ModelConfig
+from .lexicon import CJKSegmenter, build_lexicons
+from .preprocessing import AudioPreprocessor
+from .streaming import CentredFrames, RunningMoments
+from .telemetry import telemetry
+from .vad import VoiceActivityDetector, WebRtcVAD
+
+
+_VOWEL_RUN = re.compile(r'[aeiouy]+')
+
+# CJK Unified Ideographs (+ Extension A and compatibility block)
+_HAN = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_HAN_CHAR = re.compile(f'[{_HAN}]')
+_LETTER = re.compile(r'[^\W\d_]')
+_WORD_TOKEN = re.compile(r'\b\w+\b')
+_MIXED_TOKEN = re.compile(f'([{_HAN}]+)|[^\\W{_HAN}]+')
+
+# Frame length and hop (samples) shared by the pitch, RMS and ZCR frames
+# (librosa's defaults)
+PROSODY_N_FFT = 2048
+PROSODY_HOP = 512
+
+# Columns of each extractor's features (in ModelConfig.ACOUSTIC_FEATURES /
+# LEXICAL_FEATURES order) within a ModelConfig.FEATURE_NAMES row
+_ACOUSTIC_COLUMNS = np.array([ModelConfig.FEATURE_INDEX[n] for n in ModelConfig.ACOUSTIC_FEATURES])
+_LEXICAL_COLUMNS = np.array([ModelConfig.FEATURE_INDEX[n] for n in ModelConfig.LEXICAL_FEATURES])
 
 
 class AcousticFeatureExtractor:
     """Extract acoustic features from audio"""
     
-    def __init__(self, sr=16000, frame_duration_ms=30, aggressiveness=1):
+    def __init__(self, sr=16000, frame_duration_ms=30, aggressiveness=1,
+                 preprocessor: Optional[AudioPreprocessor] = None,
+                 vad: Optional[VoiceActivityDetector] = None):
         self.sr = sr
         self.frame_duration_ms = frame_duration_ms
         self.aggressiveness = aggressiveness
+        self.preprocessor = preprocessor
+        self.vad = vad if vad is not None else WebRtcVAD(sr, frame_duration_ms, aggressiveness)
+        if self.vad.frame_duration_ms != frame_duration_ms:
+            raise ValueError(f"VAD frames are {self.vad.frame_duration_ms} ms, "
+                             f"extractor expects {frame_duration_ms} ms")
+    
+    def load(self, audio_path: str) -> np.ndarray:
+        """Decode and resample an audio file to mono float at ``self.sr``, then preprocess"""
+        with telemetry.span('decode'):
+            audio, _ = librosa.load(audio_path, sr=self.sr, mono=True)
+        if self.preprocessor is not None and self.preprocessor.enabled:
+            with telemetry.span('preprocess'):
+                audio = self.preprocessor(audio)
+        return audio
     
     def extract(self, audio_path: str) -> Dict[str, float]:
         """Extract all acoustic features from audio file"""
-        # Load audio
-        audio, _ = librosa.load(audio_path, sr=self.sr, mono=True)
-        
+        return self.extract_from_audio(self.load(audio_path))
+    
+    def extract_from_audio(self, audio: np.ndarray,
+                           speech_mask: Optional[np.ndarray] = None,
+                           out: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Extract all acoustic features from already-decoded audio.
+        ``out`` (a float64 row in FEATURE_NAMES layout) also receives the values.
+        """
         # Feature 1: Pause analysis (VAD-based)
-        pause_features = self._extract_pause_features(audio)
+        pause_features = self._extract_pause_features(audio, speech_mask)
         
         # Feature 2: Prosody (pitch, energy, ZCR)
-        prosody_features = self._extract_prosody_features(audio)
+        with telemetry.span('prosody'):
+            prosody_features = self._extract_prosody_features(audio)
         
         # Combine all features
         features = {**pause_features, **prosody_features}
         
+        if out is not None:
+            out[_ACOUSTIC_COLUMNS] = [features[n] for n in ModelConfig.ACOUSTIC_FEATURES]
         return features
     
-    def _extract_pause_features(self, audio: np.ndarray) -> Dict[str, float]:
+    def extract_stream(self, blocks: Iterable[np.ndarray],
+                       out: Optional[np.ndarray] = None) -> Tuple[Dict[str, float], np.ndarray, int]:
+        """
+        ``extract_from_audio`` for a recording that arrives as consecutive
+        blocks (``ai.streaming.audio_blocks``), without holding it: VAD
+        decisions are kept (one byte per frame) and prosody frames are folded
+        into running moments. Matches the whole-buffer features up to float
+        rounding. Returns the features, the speech mask and the sample count.
+        """
+        vad = self.vad.stream()
+        framer = CentredFrames(PROSODY_N_FFT, PROSODY_HOP)
+        moments = {name: RunningMoments() for name in ('pitch', 'energy', 'zcr')}
+        
+        def fold(segment):
+            if segment is None:
+                return
+            frames = self.segment_prosody_frames(*segment)
+            moments['pitch'].update(frames['pitch'][frames['pitch'] > 0])
+            moments['energy'].update(frames['energy'])
+            moments['zcr'].update(frames['zcr'])
+        
+        for block in blocks:
+            with telemetry.span('vad'):
+                vad.push(block)
+            with telemetry.span('prosody'):
+                fold(framer.push(block))
+        with telemetry.span('prosody'):
+            fold(framer.finish())
+        with telemetry.span('vad'):
+            speech_mask = vad.finish()
+        
+        pitch, energy, zcr = moments['pitch'], moments['energy'], moments['zcr']
+        features = {
+            **self._pause_statistics(speech_mask, framer.num_samples),
+            'mean_pitch': pitch.mean,
+            'std_pitch': pitch.std,
+            'pitch_range': pitch.max - pitch.min if pitch.count else 0,
+            'mean_energy': energy.mean,
+            'std_energy': energy.std,
+            'mean_zcr': zcr.mean,
+            'std_zcr': zcr.std
+        }
+        if out is not None:
+            out[_ACOUSTIC_COLUMNS] = [features[n] for n in ModelConfig.ACOUSTIC_FEATURES]
+        return features, speech_mask, framer.num_samples
+    
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """Per-frame VAD decisions (1 = speech) for ``frame_duration_ms`` frames"""
+        with telemetry.span('vad'):
+            return self.vad(audio)
+    
+    def _extract_pause_features(self, audio: np.ndarray,
+                                speech_mask: Optional[np.ndarray] = None) -> Dict[str, float]:
         """Extract pause and silence features using VAD"""
-        # Convert to int16 for VAD
-        audio_int16 = (audio * 32768).astype(np.int16).tobytes()
-        
-        # Initialize VAD
-        vad = webrtcvad.Vad(self.aggressiveness)
-        frame_length = int(self.sr * self.frame_duration_ms / 1000) * 2
-        
-        # Process frames
-        speech_frames = []
-        offset = 0
-        frame_count = 0
-        
-        while offset + frame_length <= len(audio_int16):
-            frame = audio_int16[offset:offset + frame_length]
-            try:
-                is_speech = vad.is_speech(frame, self.sr)
-                speech_frames.append(1 if is_speech else 0)
-                frame_count += 1
-            except:
-                pass
-            offset += frame_length
-        
-        speech_mask = np.array(speech_frames)
+        if speech_mask is None:
+            speech_mask = self.speech_mask(audio)
+        return self._pause_statistics(speech_mask, len(audio))
+    
+    def _pause_statistics(self, speech_mask: np.ndarray, num_samples: int) -> Dict[str, float]:
         frame_duration_s = self.frame_duration_ms / 1000.0
-        total_duration = len(audio) / self.sr
+        total_duration = num_samples / self.sr
         
         # Find pause segments
         pauses = []
@@ -108,29 +195,62 @@ class AcousticFeatureExtractor:
     
     def _extract_prosody_features(self, audio: np.ndarray) -> Dict[str, float]:
         """Extract pitch, energy, and zero-crossing rate"""
-        # Pitch (F0)
-        pitches, magnitudes = librosa.piptrack(y=audio, sr=self.sr, fmin=75, fmax=400)
-        
-        pitch_values = []
-        for t in range(pitches.shape[1]):
-            index = magnitudes[:, t].argmax()
-            pitch = pitches[index, t]
-            if pitch > 0:
-                pitch_values.append(pitch)
-        
+        return self._prosody_statistics(self.prosody_frames(audio))
+    
+    def prosody_frames(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Per-frame pitch (0 = unvoiced), RMS energy and zero-crossing rate,
+        all centred frames on the same PROSODY_HOP grid
+        """
+        return self._prosody_frames(audio, audio, center=True)
+    
+    def segment_prosody_frames(self, segment: np.ndarray, left_pad: int,
+                               right_pad: int) -> Dict[str, np.ndarray]:
+        """
+        ``prosody_frames`` of the frames in a ``CentredFrames`` segment. Its
+        padding is zeros, as pitch and RMS expect; zero_crossing_rate pads
+        by repeating the edge samples instead.
+        """
+        edged = segment
+        if (left_pad or right_pad) and left_pad + right_pad < len(segment):
+            edged = segment.copy()
+            edged[:left_pad] = segment[left_pad]
+            edged[len(segment) - right_pad:] = segment[len(segment) - right_pad - 1]
+        return self._prosody_frames(segment, edged, center=False)
+    
+    def _prosody_frames(self, audio: np.ndarray, zcr_audio: np.ndarray,
+                        center: bool) -> Dict[str, np.ndarray]:
+        # Pitch (F0): strongest piptrack bin per frame
+        pitches, magnitudes = librosa.piptrack(
+            y=audio, sr=self.sr, n_fft=PROSODY_N_FFT, fmin=75, fmax=400,
+            hop_length=PROSODY_HOP, center=center
+        )
+        pitch = pitches[magnitudes.argmax(axis=0), np.arange(pitches.shape[1])]
+        return {
+            'pitch': pitch,
+            'energy': librosa.feature.rms(
+                y=audio, frame_length=PROSODY_N_FFT, hop_length=PROSODY_HOP, center=center
+            )[0],
+            'zcr': librosa.feature.zero_crossing_rate(
+                zcr_audio, frame_length=PROSODY_N_FFT, hop_length=PROSODY_HOP, center=center
+            )[0]
+        }
+    
+    def _prosody_statistics(self, frames: Dict[str, np.ndarray]) -> Dict[str, float]:
+        pitch_values = frames['pitch'][frames['pitch'] > 0]
         mean_pitch = np.mean(pitch_values) if len(pitch_values) > 0 else 0
         std_pitch = np.std(pitch_values) if len(pitch_values) > 0 else 0
-        pitch_range = max(pitch_values) - min(pitch_values) if len(pitch_values) > 0 else 0
+        pitch_range = pitch_values.max() - pitch_values.min() if len(pitch_values) > 0 else 0
         
         # Energy (RMS)
-        rms = librosa.feature.rms(y=audio)[0]
-        mean_energy = np.mean(rms)
-        std_energy = np.std(rms)
+        rms = frames['energy']
+        mean_energy = np.mean(rms) if len(rms) > 0 else 0
+        std_energy = np.std(rms) if len(rms) > 0 else 0
         
         # Zero-crossing rate
-        zcr = librosa.feature.zero_crossing_rate(audio)[0]
-        mean_zcr = np.mean(zcr)
-        std_zcr = np.std(zcr)
+        zcr = frames['zcr']
+        mean_zcr = np.mean(zcr) if len(zcr) > 0 else 0
+        std_zcr = np.std(zcr) if len(zcr) > 0 else 0
         
         return {
             'mean_pitch': mean_pitch,
@@ -187,9 +307,48 @@ class LexicalFeatureExtractor:
         'indonesian': ['ini', 'itu', 'hal', 'sesuatu', 'di sini', 'di sana', 'satu']
     }
     
+    # Nouns (subset of content words), used for hesitation-before-noun timing
+    NOUN_WORDS = {
+        'english': ['boy', 'girl', 'woman', 'mother', 'child', 'children', 'cookie', 'cookies',
+                    'jar', 'stool', 'chair', 'sink', 'water', 'window', 'curtain', 'dish', 'dishes',
+                    'kitchen', 'floor', 'counter', 'cupboard'],
+        'chinese': ['男孩', '女孩', '女人', '母亲', '孩子', '饼干', '罐子', '凳子', '椅子',
+                    '水槽', '水', '窗户', '窗帘', '碗', '盘子', '厨房', '地板'],
+        'indonesian': ['anak', 'perempuan', 'wanita', 'ibu', 'kue', 'toples', 'bangku',
+                    'kursi', 'wastafel', 'air', 'jendela', 'tirai', 'piring', 'dapur', 'lantai']
+    }
+    
+    # Compiled once at import: {language: {'content'|'function'|'deictic'|'noun': Lexicon}}
+    LEXICONS = build_lexicons(
+        {'content': CONTENT_WORDS, 'function': FUNCTION_WORDS,
+         'deictic': DEICTIC_WORDS, 'noun': NOUN_WORDS},
+        ModelConfig.LEXICON_DIR
+    )
+    SEGMENTER = CJKSegmenter.from_lexicons(LEXICONS['chinese'])
+    
+    def __init__(self, lexicon_dir: Optional[str] = None):
+        # A custom word-list directory gets its own index; otherwise share the class one
+        if lexicon_dir is not None:
+            self.LEXICONS = build_lexicons(
+                {'content': self.CONTENT_WORDS, 'function': self.FUNCTION_WORDS,
+                 'deictic': self.DEICTIC_WORDS, 'noun': self.NOUN_WORDS},
+                lexicon_dir
+            )
+            self.SEGMENTER = CJKSegmenter.from_lexicons(self.LEXICONS['chinese'])
+    
     def extract(self, text: Optional[str], speech_duration: float, 
-                total_duration: float) -> Dict[str, float]:
-        """Extract all lexical features from text"""
+                total_duration: float, out: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Extract all lexical features from text.
+        ``out`` (a float64 row in FEATURE_NAMES layout) also receives the values.
+        """
+        features = self._extract(text, speech_duration, total_duration)
+        if out is not None:
+            out[_LEXICAL_COLUMNS] = [features[n] for n in ModelConfig.LEXICAL_FEATURES]
+        return features
+    
+    def _extract(self, text: Optional[str], speech_duration: float,
+                 total_duration: float) -> Dict[str, float]:
         if not text or text.strip() == '':
             return self._get_default_features()
         
@@ -200,33 +359,93 @@ class LexicalFeatureExtractor:
             return self._get_default_features()
         
         lang = self._detect_language(text)
+        lexicons = self.LEXICONS.get(lang, self.LEXICONS['english'])
         
-        # Feature 1: Type-Token Ratio
-        ttr_features = self._extract_ttr(tokens)
-        
-        # Feature 2: Lexical Density
-        density_features = self._extract_lexical_density(tokens, lang)
-        
-        # Feature 3: Deictic expressions
-        deictic_features = self._extract_deictic(tokens, lang)
-        
-        # Feature 4: Repetition
-        repetition_features = self._extract_repetition(tokens)
+        return self._compute_features(
+            text, tokens, lexicons, speech_duration, total_duration
+        )
+    
+    def _compute_features(self, text: str, tokens: List[str], lexicons: Dict,
+                          speech_duration: float, total_duration: float) -> Dict[str, float]:
+        """
+        Fused kernel computing all LEXICAL_FEATURES from one token list.
+        
+        Lexicon hits are accumulated per word type from a single Counter pass,
+        so the Python-level loop runs over the vocabulary rather than every
+        token. Adjacent repetitions and bigrams use C-level zip/map passes
+        over tuples instead of joined strings.
+        """
+        total_tokens = len(tokens)
+        type_counts = Counter(tokens)
         
-        # Feature 5: Speaking rate
-        rate_features = self._extract_speaking_rate(
-            text, speech_duration, total_duration
+        # L1 / L2 / L3: type-token ratio and lexicon hits
+        content, function, deictic = (
+            lexicons['content'], lexicons['function'], lexicons['deictic']
         )
+        content_count = function_count = deictic_count = 0
+        for token, count in type_counts.items():
+            if token in content.words:
+                content_count += count
+            if token in function.words:
+                function_count += count
+            if token in deictic.words:
+                deictic_count += count
+        
+        # Multi-word entries need positional matching; only scan when present
+        if content.phrases:
+            content_count = content.count(tokens)
+        if function.phrases:
+            function_count = function.count(tokens)
+        if deictic.phrases:
+            deictic_count = deictic.count(tokens)
+        
+        # L4: adjacent word repetitions and repeated bigrams
+        if total_tokens >= 2:
+            word_reps = sum(map(eq, tokens, islice(tokens, 1, None)))
+            bigram_types = len(set(zip(tokens, islice(tokens, 1, None))))
+            phrase_reps = (total_tokens - 1) - bigram_types
+        else:
+            word_reps = phrase_reps = 0
+        total_reps = word_reps + phrase_reps
+        
+        # A3 / A4: speaking rate
+        syllables = self._count_syllables(text)
+        speech_rate = (syllables / total_duration) * 60 if total_duration > 0 else 0
+        articulation_rate = (syllables / speech_duration) * 60 if speech_duration > 0 else 0
         
         return {
             'has_text': 1,  # Flag indicating text is available
-            **ttr_features,
-            **density_features,
-            **deictic_features,
-            **repetition_features,
-            **rate_features
+            'total_tokens': total_tokens,
+            'unique_tokens': len(type_counts),
+            'ttr': len(type_counts) / total_tokens,
+            'content_word_count': content_count,
+            'function_word_count': function_count,
+            'lexical_density': content_count / total_tokens,
+            'deictic_count': deictic_count,
+            'deictic_ratio': deictic_count / total_tokens,
+            'word_repetitions': word_reps,
+            'phrase_repetitions': phrase_reps,
+            'total_repetitions': total_reps,
+            'repetition_ratio': total_reps / total_tokens,
+            'syllable_count': syllables,
+            'speech_rate': speech_rate,
+            'articulation_rate': articulation_rate
         }
     
+    def tag_words(self, words: List[str]) -> Tuple[List[int], List[bool]]:
+        """Syllable count and noun flag for each word of a timed transcript"""
+        lang = self._detect_language(' '.join(words).lower())
+        nouns = self.LEXICONS.get(lang, self.LEXICONS['english'])['noun']
+        
+        syllables = []
+        is_noun = []
+        for word in words:
+            word = self._preprocess_text(word)
+            tokens = self._tokenize(word)
+            syllables.append(self._count_syllables(word) if tokens else 0)
+            is_noun.append(bool(tokens) and tokens[0] in nouns)
+        return syllables, is_noun
+    
     def _preprocess_text(self, text: str) -> str:
         """Clean and normalize text"""
         text = str(text).lower()
@@ -234,119 +453,37 @@ class LexicalFeatureExtractor:
         return text
     
     def _tokenize(self, text: str) -> List[str]:
-        """Split text into tokens"""
-        return re.findall(r'\b\w+\b', text.lower())
+        """Split text into tokens, segmenting runs of Chinese characters into words"""
+        text = text.lower()
+        if not _HAN_CHAR.search(text):
+            return _WORD_TOKEN.findall(text)
+        
+        tokens = []
+        for match in _MIXED_TOKEN.finditer(text):
+            if match.group(1):
+                tokens.extend(self.SEGMENTER.segment(match.group(1)))
+            else:
+                tokens.append(match.group())
+        return tokens
     
     def _detect_language(self, text: str) -> str:
-        """Simple language detection"""
+        """Script-based language detection, then keyword check for Indonesian"""
+        han_chars = len(_HAN_CHAR.findall(text))
+        if han_chars and han_chars * 2 >= len(_LETTER.findall(text)):
+            return 'chinese'
+        
         indonesian_indicators = ['yang', 'adalah', 'dengan', 'dari', 'untuk']
         if any(word in text.lower() for word in indonesian_indicators):
             return 'indonesian'
         return 'english'
     
-    def _extract_ttr(self, tokens: List[str]) -> Dict[str, float]:
-        """Type-Token Ratio: lexical diversity"""
-        total_tokens = len(tokens)
-        unique_tokens = len(set(tokens))
-        ttr = unique_tokens / total_tokens if total_tokens > 0 else 0
-        
-        return {
-            'total_tokens': total_tokens,
-            'unique_tokens': unique_tokens,
-            'ttr': ttr
-        }
-    
-    def _extract_lexical_density(self, tokens: List[str], lang: str) -> Dict[str, float]:
-        """Ratio of content words to total words"""
-        content_list = self.CONTENT_WORDS.get(lang, self.CONTENT_WORDS['english'])
-        function_list = self.FUNCTION_WORDS.get(lang, self.FUNCTION_WORDS['english'])
-        
-        content_count = sum(1 for token in tokens if token in content_list)
-        function_count = sum(1 for token in tokens if token in function_list)
-        
-        lexical_density = content_count / len(tokens) if len(tokens) > 0 else 0
-        
-        return {
-            'content_word_count': content_count,
-            'function_word_count': function_count,
-            'lexical_density': lexical_density
-        }
-    
-    def _extract_deictic(self, tokens: List[str], lang: str) -> Dict[str, float]:
-        """Count vague reference words"""
-        deictic_list = self.DEICTIC_WORDS.get(lang, self.DEICTIC_WORDS['english'])
-        
-        deictic_count = sum(1 for token in tokens if token in deictic_list)
-        deictic_ratio = deictic_count / len(tokens) if len(tokens) > 0 else 0
-        
-        return {
-            'deictic_count': deictic_count,
-            'deictic_ratio': deictic_ratio
-        }
-    
-    def _extract_repetition(self, tokens: List[str]) -> Dict[str, float]:
-        """Detect word and phrase repetitions"""
-        if len(tokens) < 2:
-            return {
-                'word_repetitions': 0,
-                'phrase_repetitions': 0,
-                'total_repetitions': 0,
-                'repetition_ratio': 0.0
-            }
-        
-        # Word repetitions
-        word_reps = 0
-        for i in range(len(tokens) - 1):
-            if tokens[i] == tokens[i + 1]:
-                word_reps += 1
-        
-        # Phrase repetitions (bigrams)
-        bigrams = [' '.join(tokens[i:i+2]) for i in range(len(tokens) - 1)]
-        bigram_counts = Counter(bigrams)
-        phrase_reps = sum(count - 1 for count in bigram_counts.values() if count > 1)
-        
-        total_reps = word_reps + phrase_reps
-        repetition_ratio = total_reps / len(tokens) if len(tokens) > 0 else 0
-        
-        return {
-            'word_repetitions': word_reps,
-            'phrase_repetitions': phrase_reps,
-            'total_repetitions': total_reps,
-            'repetition_ratio': repetition_ratio
-        }
-    
-    def _extract_speaking_rate(self, text: str, speech_duration: float, 
-                               total_duration: float) -> Dict[str, float]:
-        """Calculate speech rate and articulation rate"""
-        syllables = self._count_syllables(text)
-        
-        # Speech rate: syllables per minute (including pauses)
-        speech_rate = (syllables / total_duration) * 60 if total_duration > 0 else 0
-        
-        # Articulation rate: syllables per minute (excluding pauses)
-        articulation_rate = (syllables / speech_duration) * 60 if speech_duration > 0 else 0
-        
-        return {
-            'syllable_count': syllables,
-            'speech_rate': speech_rate,
-            'articulation_rate': articulation_rate
-        }
-    
     def _count_syllables(self, text: str) -> int:
-        """Simple syllable counting"""
+        """Simple syllable counting: one per vowel run, one per Chinese character"""
         if not text:
             return 0
         
         text = text.lower()
-        vowels = "aeiouy"
-        syllable_count = 0
-        previous_was_vowel = False
-        
-        for char in text:
-            is_vowel = char in vowels
-            if is_vowel and not previous_was_vowel:
-                syllable_count += 1
-            previous_was_vowel = is_vowel
+        syllable_count = len(_VOWEL_RUN.findall(text)) + len(_HAN_CHAR.findall(text))
         
         if text.endswith('e'):
             syllable_count -= 1
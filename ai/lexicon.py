@@ -0,0 +1,164 @@
+"""
+Precompiled lexicon index for lexical feature extraction
+
+Word lists are compiled once into a frozenset of single-word entries plus a
+token-level trie of multi-word phrases (e.g. Indonesian 'di sini'), so
+membership checks stay O(1) per token no matter how large the lists grow.
+
+The same trie, walked over characters, drives a forward maximum-matching
+segmenter for Chinese text, which has no spaces between words.
+
+Extra entries can be supplied as plain text files laid out as
+``<lexicon_dir>/<language>/<category>.txt`` with one entry per line;
+blank lines and lines starting with ``#`` are ignored.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+
+class PhraseTrie:
+    """Token-level trie used for longest-match lookup of multi-word entries"""
+
+    _END = None  # key marking the end of a complete phrase
+
+    def __init__(self, phrases: Iterable[Sequence[str]] = ()):
+        self.root: Dict = {}
+        self.max_length = 0
+        for phrase in phrases:
+            self.add(phrase)
+
+    def __bool__(self) -> bool:
+        return self.max_length > 0
+
+    def add(self, phrase: Sequence[str]):
+        """Insert a phrase given as a sequence of tokens"""
+        if not phrase:
+            return
+        node = self.root
+        for token in phrase:
+            node = node.setdefault(token, {})
+        node[self._END] = True
+        self.max_length = max(self.max_length, len(phrase))
+
+    def match(self, tokens: Sequence[str], start: int) -> int:
+        """Length of the longest phrase starting at ``tokens[start]`` (0 if none)"""
+        node = self.root
+        longest = 0
+        end = min(len(tokens), start + self.max_length)
+        for i in range(start, end):
+            node = node.get(tokens[i])
+            if node is None:
+                break
+            if self._END in node:
+                longest = i - start + 1
+        return longest
+
+
+class Lexicon:
+    """Compiled word list: frozenset for single words, trie for phrases"""
+
+    def __init__(self, entries: Iterable[str] = ()):
+        words = set()
+        phrases = PhraseTrie()
+        for entry in entries:
+            parts = str(entry).lower().split()
+            if len(parts) == 1:
+                words.add(parts[0])
+            elif parts:
+                phrases.add(parts)
+        self.words = frozenset(words)
+        self.phrases = phrases
+
+    def __contains__(self, token: str) -> bool:
+        return token in self.words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def count(self, tokens: Sequence[str]) -> int:
+        """Count lexicon hits in a token sequence, a phrase counting once"""
+        words = self.words
+        if not self.phrases:
+            return sum(1 for token in tokens if token in words)
+
+        count = 0
+        i = 0
+        n = len(tokens)
+        while i < n:
+            length = self.phrases.match(tokens, i)
+            if length:
+                count += 1
+                i += length
+                continue
+            if tokens[i] in words:
+                count += 1
+            i += 1
+        return count
+
+
+class CJKSegmenter:
+    """Forward maximum-matching word segmenter over a character trie"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        # Single characters are the fallback anyway, so only longer words go in the trie
+        self.trie = PhraseTrie(word for word in words if len(word) > 1)
+
+    @classmethod
+    def from_lexicons(cls, lexicons: Dict[str, 'Lexicon']) -> 'CJKSegmenter':
+        """Build a segmenter from every single-word entry of a language's lexicons"""
+        words = set()
+        for lexicon in lexicons.values():
+            words.update(lexicon.words)
+        return cls(words)
+
+    def segment(self, text: str) -> List[str]:
+        """Split a run of CJK characters into words in O(len(text) * longest word)"""
+        tokens = []
+        i = 0
+        n = len(text)
+        while i < n:
+            length = self.trie.match(text, i) or 1
+            tokens.append(text[i:i + length])
+            i += length
+        return tokens
+
+
+def load_word_list(path: Union[str, Path]) -> List[str]:
+    """Read a word-list file (one entry per line, '#' comments allowed)"""
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            entry = line.strip()
+            if entry and not entry.startswith('#'):
+                entries.append(entry)
+    return entries
+
+
+def build_lexicons(categories: Dict[str, Dict[str, List[str]]],
+                   lexicon_dir: Optional[Union[str, Path]] = None
+                   ) -> Dict[str, Dict[str, Lexicon]]:
+    """
+    Compile built-in word lists (``{category: {language: words}}``) into
+    ``{language: {category: Lexicon}}``, merging any external word-list
+    files found under ``lexicon_dir``.
+    """
+    merged: Dict[str, Dict[str, List[str]]] = {}
+    for category, by_language in categories.items():
+        for language, words in by_language.items():
+            merged.setdefault(language, {}).setdefault(category, []).extend(words)
+
+    if lexicon_dir is not None and Path(lexicon_dir).is_dir():
+        for path in sorted(Path(lexicon_dir).glob('*/*.txt')):
+            language, category = path.parent.name, path.stem
+            merged.setdefault(language, {}).setdefault(category, []).extend(
+                load_word_list(path)
+            )
+
+    return {
+        language: {
+            category: Lexicon(by_category.get(category, []))
+            for category in set(categories) | set(by_category)
+        }
+        for language, by_category in merged.items()
+    }
@@ -0,0 +1,135 @@
+"""
+Dynamic micro-batching for CNN-LSTM inference
+
+Concurrent requests submit spectrogram windows to a single background
+worker. Windows are queued by width, and each width's queue runs as one
+forward pass once ``max_batch`` windows are waiting or its oldest window
+has waited ``max_wait_ms``. The model has no padding mask, so a batch
+never mixes widths, and a window's logits do not depend on concurrent
+traffic. Whether batching raises throughput depends on the machine: on
+one core it does not (``python -m ai.benchmarks.bench_microbatch``, 16
+clients: 11.2 req/s batched vs 12.4 req/s batch-1), so measure before
+enabling CNN_MICROBATCH_ENABLED.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from .windowing import pad_batch
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Collect same-width windows for up to N ms or B items, run one batched forward"""
+
+    def __init__(self, forward: Callable[[np.ndarray], np.ndarray],
+                 max_batch: int = 16, max_wait_ms: float = 5.0,
+                 stats_window: int = 1000):
+        """
+        Args:
+            forward: maps a (B, 1, n_mels, T) float32 batch to (B, num_classes) logits
+            max_batch: most windows per forward pass
+            max_wait_ms: longest time a queued window waits for same-width company
+            stats_window: how many recent batches/waits the metrics cover
+        """
+        self.forward = forward
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: queue.Queue = queue.Queue()
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._queue_waits = deque(maxlen=stats_window)
+        self._stats_lock = threading.Lock()
+        self._total_batches = 0
+        self._total_items = 0
+
+        self._worker = threading.Thread(
+            target=self._run, name="claritas-microbatch", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, window: np.ndarray) -> Future:
+        """Queue one (n_mels, T) window; the future resolves to its logits"""
+        future: Future = Future()
+        self._queue.put((window, future, time.perf_counter()))
+        return future
+
+    def close(self, timeout: float = 5.0):
+        """Finish queued work and stop the worker"""
+        self._queue.put(_STOP)
+        self._worker.join(timeout)
+
+    def stats(self) -> Dict[str, float]:
+        """Batch-size and queue-wait metrics over the recent window"""
+        with self._stats_lock:
+            sizes = np.array(self._batch_sizes, dtype=np.float64)
+            waits = np.array(self._queue_waits, dtype=np.float64) * 1000
+            total_batches, total_items = self._total_batches, self._total_items
+        return {
+            'total_batches': total_batches,
+            'total_items': total_items,
+            'mean_batch_size': float(sizes.mean()) if len(sizes) else 0.0,
+            'max_batch_size': float(sizes.max()) if len(sizes) else 0.0,
+            'queue_wait_p50_ms': float(np.percentile(waits, 50)) if len(waits) else 0.0,
+            'queue_wait_p99_ms': float(np.percentile(waits, 99)) if len(waits) else 0.0,
+            'queue_depth': self._queue.qsize()
+        }
+
+    def _run(self):
+        # Pending windows keyed by width: the model has no padding mask, so a
+        # batch never mixes widths and batching cannot change a result
+        pending: Dict[int, List[Tuple]] = {}
+        stopping = False
+        while not stopping or pending:
+            if not stopping:
+                timeout = None
+                if pending:
+                    oldest = min(items[0][2] for items in pending.values())
+                    timeout = max(0.0, oldest + self.max_wait - time.perf_counter())
+                # Take everything already queued: after a long forward pass the
+                # waiting windows are all past their deadline and batch together
+                arrived = []
+                try:
+                    arrived.append(self._queue.get(timeout=timeout))
+                    while True:
+                        arrived.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                for item in arrived:
+                    if item is _STOP:
+                        stopping = True
+                    else:
+                        pending.setdefault(item[0].shape[1], []).append(item)
+
+            now = time.perf_counter()
+            for width in list(pending):
+                items = pending[width]
+                if len(items) >= self.max_batch or stopping or now >= items[0][2] + self.max_wait:
+                    self._flush(items[:self.max_batch], now)
+                    if len(items) > self.max_batch:
+                        pending[width] = items[self.max_batch:]
+                    else:
+                        del pending[width]
+
+    def _flush(self, items: List[Tuple], started: float):
+        """One forward pass over same-width windows; resolve their futures"""
+        try:
+            logits = self.forward(pad_batch([w for w, _, _ in items]))
+            for (_, future, _), row in zip(items, logits):
+                future.set_result(row)
+        except Exception as e:
+            for _, future, _ in items:
+                future.set_exception(e)
+
+        with self._stats_lock:
+            self._batch_sizes.append(len(items))
+            self._queue_waits.extend(started - enqueued for _, _, enqueued in items)
+            self._total_batches += 1
+            self._total_items += len(items)
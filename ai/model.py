@@ -5,17 +5,33 @@ Main Claritas Model Class
 import numpy as np
 import joblib
 import os
+import threading
+import time
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import librosa
 from pathlib import Path
-from typing import Dict, Optional, Union
+from collections import Counter
+from typing import Callable, Dict, Optional, Union
 import warnings
 warnings.filterwarnings('ignore')
 
 from .config import ModelConfig
 from .features import AcousticFeatureExtractor, LexicalFeatureExtractor
+from .preprocessing import AudioPreprocessor
+from .vad import VoiceActivityDetector
+from .asr import SpeechRecognizer
+from .alignment import PauseAligner
+from .windowing import aggregate_logits, bucket_batches, pad_batch, plan_windows, timeline_spans
+from .explain import (ForestContributions, attention_segments, catboost_contributions,
+                      lightgbm_contributions, recording_attention, summarize_contributions)
+from .microbatch import MicroBatcher
+from .threading_policy import ThreadingPolicy
+from .spectrogram import MelFrontend
+from .streaming import CentredFrames, audio_blocks, audio_duration, audio_length, span_audio
+from .telemetry import telemetry
+from .tuning import load_ensemble_config
 
 # =========================================================
 # 1. DEFINE DEEP LEARNING ARCHITECTURE
@@ -76,6 +92,10 @@ class CNNLSTM(nn.Module):
         )
     
     def forward(self, x):
+        return self.forward_with_attention(x)[0]
+    
+    def forward_with_attention(self, x):
+        """Logits plus the (batch, steps) attention weights over LSTM time steps"""
         # CNN feature extraction
         x = self.conv_layers(x)
         
@@ -93,7 +113,20 @@ class CNNLSTM(nn.Module):
         
         # Classification
         logits = self.classifier(x)
-        return logits
+        return logits, attn_weights.squeeze(-1)
+
+_default_frontends = {}
+
+
+def mel_spectrogram(audio: np.ndarray, sr=16000, n_mels=128, max_length=500) -> np.ndarray:
+    """
+    Normalized log-mel spectrogram (n_mels, max_length), as used in training.
+    ``max_length=None`` keeps the full recording (n_mels, T).
+    """
+    frontend = _default_frontends.get((sr, n_mels))
+    if frontend is None:
+        frontend = _default_frontends.setdefault((sr, n_mels), MelFrontend(sr=sr, n_mels=n_mels))
+    return frontend(audio, max_length).copy()
 
 # =========================================================
 # 2. MAIN CLARITAS MODEL CLASS
@@ -113,25 +146,41 @@ class ClaritasModel:
         # Ensure model files exist
         self.config.ensure_models_exist()
         
+        # Cap per-backend thread pools before any model spins one up
+        self.threading_policy = ThreadingPolicy.from_config(self.config)
+        self.threading_policy.apply()
+        
         print(f"🚀 Initializing Claritas AI on {self.device}...")
         
-        # 1. Load Scaler
+        # 1. Load Scaler, folded into a broadcast (x - mean) / scale
         self.scaler = joblib.load(self.config.SCALER_PATH)
+        self._fold_scaler()
 
         # 2. Load Machine Learning Models
         print("   Loading ML Ensemble (CatBoost, RF, LightGBM)...")
         self.cat_model = joblib.load(self.config.CAT_FINAL_PATH)
         self.rf_model = joblib.load(self.config.RF_FINAL_PATH)
         self.lgbm_model = joblib.load(self.config.LGBM_FINAL_PATH)
+        self.threading_policy.configure_models(rf_model=self.rf_model)
+        self.forest_contributions = ForestContributions(self.rf_model)
+        self._load_ensemble_config()
         
         # 3. Load Deep Learning Model
-        print("   Loading Deep Learning Model (CNN-LSTM)...")
-        self.cnn_model = CNNLSTM(num_classes=3, n_mels=128).to(self.device)
+        print(f"   Loading Deep Learning Model (CNN-LSTM, {self.config.CNN_RUNTIME})...")
+        self.cnn_model = self._load_cnn_model()
+        
+        # Optional shared micro-batcher for concurrent callers
+        self.microbatcher = None
+        if self.config.CNN_MICROBATCH_ENABLED:
+            self.microbatcher = MicroBatcher(
+                self._cnn_forward,
+                max_batch=self.config.CNN_MAX_BATCH,
+                max_wait_ms=self.config.CNN_MICROBATCH_MAX_WAIT_MS
+            )
         
-        # Load weights safely
-        state_dict = torch.load(self.config.CNN_LSTM_FINAL_PATH, map_location=self.device)
-        self.cnn_model.load_state_dict(state_dict)
-        self.cnn_model.eval() # Set to inference mode
+        # Cascade path counters (see cascade_stats)
+        self._cascade_counts = Counter()
+        self._cascade_lock = threading.Lock()
         
         print("✅ All models loaded successfully")
         
@@ -139,42 +188,156 @@ class ClaritasModel:
         self.acoustic_extractor = AcousticFeatureExtractor(
             sr=self.config.SAMPLE_RATE,
             frame_duration_ms=self.config.FRAME_DURATION_MS,
-            aggressiveness=self.config.VAD_AGGRESSIVENESS
+            aggressiveness=self.config.VAD_AGGRESSIVENESS,
+            preprocessor=AudioPreprocessor.from_config(self.config),
+            vad=VoiceActivityDetector.from_config(self.config)
         )
         self.lexical_extractor = LexicalFeatureExtractor()
+        self.mel_frontend = MelFrontend(
+            sr=self.config.SAMPLE_RATE, n_mels=128,
+            max_buffer_bytes=int(self.config.MEL_BUFFER_MAX_MB * 2 ** 20)
+        )
+        self.aligner = PauseAligner(
+            frame_duration_ms=self.config.FRAME_DURATION_MS,
+            min_pause=self.config.ALIGNMENT_MIN_PAUSE,
+            utterance_gap=self.config.ALIGNMENT_UTTERANCE_GAP,
+            lexical_extractor=self.lexical_extractor
+        )
+        
+        # Optional on-device speech-to-text for calls without a transcript
+        self.asr = None
+        if self.config.ASR_ENABLED:
+            if SpeechRecognizer.is_available():
+                self.asr = SpeechRecognizer(
+                    model_size=self.config.ASR_MODEL_SIZE,
+                    compute_type=self.config.ASR_COMPUTE_TYPE,
+                    num_workers=self.config.ASR_WORKERS,
+                    cpu_threads=self.config.ASR_CPU_THREADS,
+                    language=self.config.ASR_LANGUAGE
+                )
+            else:
+                print("⚠️ ASR_ENABLED but faster-whisper is not installed; "
+                      "lexical features need a supplied transcript")
+    
+    def _load_ensemble_config(self):
+        """Tuned member weights (and risk thresholds) from ENSEMBLE_WEIGHTS_PATH, if present"""
+        path = getattr(self.config, 'ENSEMBLE_WEIGHTS_PATH', None)
+        if not path or not Path(path).exists():
+            return
+        weights, thresholds = load_ensemble_config(path)
+        self.config.ENSEMBLE_WEIGHTS = weights
+        if thresholds:
+            self.config.RISK_THRESHOLDS = thresholds
+    
+    def _load_cnn_model(self):
+        """Load the CNN-LSTM for the configured runtime (eager / scripted / quantized)"""
+        runtime = self.config.CNN_RUNTIME
+        artifact = {
+            'scripted': self.config.CNN_LSTM_SCRIPTED_PATH,
+            'quantized': self.config.CNN_LSTM_QUANTIZED_PATH
+        }.get(runtime)
+        
+        if artifact is not None:
+            if Path(artifact).exists():
+                # Quantized kernels are CPU-only
+                if runtime == 'quantized':
+                    self.device = torch.device("cpu")
+                model = torch.jit.load(str(artifact), map_location=self.device)
+                model.eval()
+                return model
+            print(f"⚠️ {runtime} artifact not found at {artifact}; "
+                  f"run `python -m ai.export`. Falling back to eager.")
+        elif runtime != 'eager':
+            raise ValueError(f"Unknown CNN_RUNTIME: {runtime}")
+        
+        model = CNNLSTM(num_classes=3, n_mels=128).to(self.device)
+        
+        # Load weights safely
+        state_dict = torch.load(self.config.CNN_LSTM_FINAL_PATH, map_location=self.device)
+        model.load_state_dict(state_dict)
+        model.eval() # Set to inference mode
+        return model
     
     def predict(self, audio_path: Union[str, Path], 
-                text: Optional[Union[str, Path]] = None) -> Dict:
+                text: Optional[Union[str, Path]] = None,
+                explain: Optional[bool] = None) -> Dict:
         """
         Predict from audio file using Hybrid Ensemble Strategy
+        (``explain`` overrides EXPLAIN_PREDICTIONS for this call)
         """
+        if explain is None:
+            explain = self.config.EXPLAIN_PREDICTIONS
         print(f"\n🎵 Analyzing audio: {audio_path}")
+        started = time.perf_counter()
         
         # --- Handle Text Input ---
         text_content = self._resolve_text_input(text)
-
+        
         # --- Step 1: Extract Tabular Features (For ML Models) ---
-        print("Extracting acoustic features...")
-        acoustic_features = self.acoustic_extractor.extract(str(audio_path))
+        # Extractors write straight into a fixed-layout row (FEATURE_NAMES)
+        feature_row = np.zeros((1, len(self.config.FEATURE_NAMES)))
+        transcript = None
+        asr_future = None
+        
+        if self._should_stream(audio_path, text_content):
+            # Long recording: read block by block, never held in memory
+            print("Extracting acoustic features (chunked)...")
+            acoustic_features, speech_mask, num_samples, peak_power = \
+                self._stream_acoustic_features(str(audio_path), feature_row[0])
+            spectrogram = lambda: self._streamed_spectrogram(str(audio_path), peak_power)
+        else:
+            # Decode once; every stage below shares this buffer
+            audio = self.acoustic_extractor.load(str(audio_path))
+            num_samples = len(audio)
+            spectrogram = lambda: self._cnn_spectrogram(audio)
+            
+            # Transcribe in the background while acoustic features are computed
+            if not text_content and self.asr is not None:
+                print("Transcribing audio (on-device ASR)...")
+                asr_future = self.asr.submit(audio)
+            
+            print("Extracting acoustic features...")
+            speech_mask = self.acoustic_extractor.speech_mask(audio)
+            acoustic_features = self.acoustic_extractor.extract_from_audio(
+                audio, speech_mask, out=feature_row[0]
+            )
+        
+        if asr_future is not None:
+            try:
+                transcript = asr_future.result()
+                text_content = transcript['text']
+            except Exception as e:
+                print(f"⚠️ ASR Error: {e}")
         
         print("Extracting lexical features...")
-        lexical_features = self.lexical_extractor.extract(
-            text_content,
-            acoustic_features['speech_duration'],
-            acoustic_features['total_duration']
-        )
+        with telemetry.span('lexical'):
+            lexical_features = self.lexical_extractor.extract(
+                text_content,
+                acoustic_features['speech_duration'],
+                acoustic_features['total_duration'],
+                out=feature_row[0]
+            )
         
-        # Prepare tabular vector
-        all_features = {**acoustic_features, **lexical_features}
-        feature_vector = self._prepare_features(all_features)
+        # Word-timing alignment is only possible with ASR word timestamps
+        alignment = None
+        if transcript and transcript.get('words'):
+            with telemetry.span('alignment'):
+                alignment = self.aligner.align(transcript['words'], speech_mask)
         
-        # --- Step 2: Extract Spectrogram (For Deep Learning Model) ---
-        print("Generating spectrogram for CNN...")
-        spectrogram_tensor = self._preprocess_spectrogram(str(audio_path))
+        # Scale tabular vector
+        with telemetry.span('scaling'):
+            feature_vector = self.scale_features(feature_row)
         
-        # --- Step 3: Run Classification ---
+        # --- Step 2 + 3: Spectrogram (For Deep Learning Model) + Classification ---
+        # The spectrogram is built only if the cascade does not exit early
         print("Running Grand Ensemble classification...")
-        classification_result = self._classify(feature_vector, spectrogram_tensor)
+        explanation_parts = {} if explain else None
+        classification_result = self._classify(feature_vector, spectrogram, explanation_parts)
+        explanation = None
+        if explain:
+            explanation = self._explanation(
+                explanation_parts, classification_result, feature_row[0], num_samples
+            )
         
         # --- Step 4: Calculate Scores ---
         fluency_score = self._calculate_fluency_score(acoustic_features)
@@ -187,15 +350,163 @@ class ClaritasModel:
             'speech_fluency_score': fluency_score,
             'lexical_coherence_score': coherence_score,
             'classification': classification_result,
-            'risk_level': risk_level
+            'risk_level': risk_level,
+            'transcript': transcript,  # Set only when produced by on-device ASR
+            'alignment': alignment,    # Needs ASR word timestamps
+            'explanation': explanation # None when explanations are skipped
         }
         
+        telemetry.observe('predict_total', time.perf_counter() - started)
         print(f"Analysis complete!")
         print(f"   Prediction: {classification_result['predicted_class']}")
         print(f"   Risk Level: {risk_level.upper()}")
         
         return result
 
+    def timeline(self, audio_path: Union[str, Path],
+                 window_seconds: Optional[float] = None,
+                 hop_seconds: Optional[float] = None) -> Dict:
+        """
+        Per-window pause ratio, energy, pitch, CNN class probabilities and
+        fluency score across a (long) recording.
+        
+        Each window is analysed like a training clip: VAD, prosody and the
+        mel spectrogram run on the window alone, and the spectrogram is
+        standardised over the window's own frames. The file is read in
+        blocks (whole only when it needs preprocessing or soundfile cannot
+        read it), and the CNN scores CNN_MAX_BATCH windows at a time, so
+        memory does not grow with the recording's length.
+        """
+        window_seconds = window_seconds or self.config.TIMELINE_WINDOW_SECONDS
+        hop_seconds = hop_seconds or self.config.TIMELINE_HOP_SECONDS
+        print(f"\n📈 Timeline analysis: {audio_path} ({window_seconds:g}s windows)")
+        
+        extractor = self.acoustic_extractor
+        blocks, num_samples = self._timeline_blocks(str(audio_path))
+        spans = timeline_spans(num_samples, extractor.sr, window_seconds, hop_seconds,
+                               self.config.TIMELINE_MIN_SECONDS)
+        
+        windows, mels = [], []
+        
+        def score_pending():
+            with telemetry.span('member_cnn'):
+                probabilities = self.cnn_probabilities(mels)
+            for window, proba in zip(windows[len(windows) - len(mels):], probabilities):
+                window['probabilities'] = dict(zip(self.config.CLASS_NAMES, map(float, proba)))
+                window['predicted_class'] = self.config.CLASS_NAMES[int(np.argmax(proba))]
+            mels.clear()
+        
+        with telemetry.span('timeline_windows'):
+            for (start, end), audio in zip(spans, span_audio(blocks, spans)):
+                features = extractor.extract_from_audio(audio)
+                with telemetry.span('spectrogram'):
+                    mels.append(self.mel_frontend(audio, max_length=None).copy())
+                windows.append({
+                    'start': start / extractor.sr,
+                    'end': end / extractor.sr,
+                    'pause_ratio': float(features['pause_ratio']),
+                    'long_pauses_count': int(features['long_pauses_count']),
+                    'mean_energy': float(features['mean_energy']),
+                    'mean_pitch': float(features['mean_pitch']),
+                    'std_pitch': float(features['std_pitch']),
+                    'probabilities': None,     # filled in by score_pending
+                    'predicted_class': None,
+                    'fluency_score': float(self._calculate_fluency_score(features))
+                })
+                if len(mels) == self.config.CNN_MAX_BATCH:
+                    score_pending()
+            if mels:
+                score_pending()
+        
+        return {
+            'duration': num_samples / extractor.sr,
+            'window_seconds': window_seconds,
+            'hop_seconds': hop_seconds,
+            'windows': windows
+        }
+    
+    def _timeline_blocks(self, audio_path: str):
+        """(blocks, total samples) of a recording for timeline(): streamed when possible"""
+        preprocessor = self.acoustic_extractor.preprocessor
+        num_samples = None
+        if self.config.STREAMING_ENABLED and not (preprocessor is not None and preprocessor.enabled):
+            num_samples = audio_length(audio_path, self.config.SAMPLE_RATE)
+        if num_samples is not None:
+            return self._stream_blocks(audio_path), num_samples
+        audio = self.acoustic_extractor.load(audio_path)
+        return [audio], len(audio)
+
+    def _should_stream(self, audio_path: Union[str, Path], text_content: str) -> bool:
+        """Whether predict() reads this file in blocks (STREAMING_* settings)"""
+        if not self.config.STREAMING_ENABLED:
+            return False
+        preprocessor = self.acoustic_extractor.preprocessor
+        if preprocessor is not None and preprocessor.enabled:
+            return False   # Gains and noise profile are measured on the whole signal
+        if not text_content and self.asr is not None:
+            return False   # ASR transcribes the whole buffer
+        seconds = audio_duration(str(audio_path))
+        return seconds is not None and seconds >= self.config.STREAMING_MIN_SECONDS
+    
+    def _stream_blocks(self, audio_path: str):
+        return audio_blocks(audio_path, self.config.SAMPLE_RATE,
+                            self.config.STREAMING_BLOCK_SECONDS)
+    
+    def _stream_acoustic_features(self, audio_path: str, out: np.ndarray):
+        """
+        Acoustic features, speech mask and sample count of a file read in
+        blocks, plus its peak mel power for a later spectrogram pass
+        """
+        frontend = self.mel_frontend
+        framer = CentredFrames(frontend.n_fft, frontend.hop_length)
+        peak_power = 0.0
+        
+        def blocks():
+            nonlocal peak_power
+            for block in self._stream_blocks(audio_path):
+                yield block
+                segment = framer.push(block)
+                if segment is not None:
+                    with telemetry.span('spectrogram'):
+                        peak_power = max(peak_power, float(frontend.segment_power(segment[0]).max()))
+            segment = framer.finish()
+            if segment is not None:
+                with telemetry.span('spectrogram'):
+                    peak_power = max(peak_power, float(frontend.segment_power(segment[0]).max()))
+        
+        features, speech_mask, num_samples = self.acoustic_extractor.extract_stream(blocks(), out=out)
+        return features, speech_mask, num_samples, peak_power
+    
+    def _streamed_spectrogram(self, audio_path: str, peak_power: float) -> torch.Tensor:
+        """_cnn_spectrogram of a streamed file: a second block-wise pass"""
+        print("Generating spectrogram for CNN (chunked)...")
+        max_length = None if self.config.CNN_INFERENCE_MODE == 'sliding' else self.config.CNN_WINDOW_FRAMES
+        frontend = self.mel_frontend
+        framer = CentredFrames(frontend.n_fft, frontend.hop_length)
+        
+        def powers():
+            for block in self._stream_blocks(audio_path):
+                segment = framer.push(block)
+                if segment is not None:
+                    yield frontend.segment_power(segment[0])
+            segment = framer.finish()
+            if segment is not None:
+                yield frontend.segment_power(segment[0])
+        
+        with telemetry.span('spectrogram'):
+            mel = frontend.from_segments(powers(), peak_power, max_length)
+            return torch.from_numpy(mel)[None, None].to(self.device)
+    
+    def _cnn_spectrogram(self, audio: np.ndarray) -> torch.Tensor:
+        """Spectrogram tensor for the configured CNN inference mode"""
+        print("Generating spectrogram for CNN...")
+        with telemetry.span('spectrogram'):
+            if self.config.CNN_INFERENCE_MODE == 'sliding':
+                return self._preprocess_spectrogram(audio, max_length=None)
+            return self._preprocess_spectrogram(
+                audio, max_length=self.config.CNN_WINDOW_FRAMES
+            )
+
     def _resolve_text_input(self, text):
         """Helper to handle file path vs raw string text"""
         if not text: return ""
@@ -208,74 +519,111 @@ class ClaritasModel:
                 return ""
         return text_str
 
-    def _preprocess_spectrogram(self, audio_path, sr=16000, n_mels=128, max_length=500):
-        """Convert audio file to Normalized Mel Spectrogram Tensor"""
+    def _preprocess_spectrogram(self, audio, sr=16000, n_mels=128, max_length=500):
+        """
+        Convert audio (file path or decoded array) to Normalized Mel Spectrogram Tensor.
+        ``max_length=None`` keeps the whole recording for sliding-window inference.
+        """
         try:
-            # 1. Load Audio
-            audio, _ = librosa.load(audio_path, sr=sr, mono=True)
-            
-            # 2. Extract Mel Spectrogram
-            mel_spec = librosa.feature.melspectrogram(
-                y=audio, sr=sr, n_mels=n_mels, 
-                n_fft=2048, hop_length=512, fmax=8000
-            )
-            mel_spec_db = librosa.power_to_db(mel_spec, ref=np.max)
-            
-            # 3. Normalize (Same as training)
-            mel_spec_db = (mel_spec_db - mel_spec_db.mean()) / (mel_spec_db.std() + 1e-6)
-            
-            # 4. Pad or Truncate
-            if mel_spec_db.shape[1] < max_length:
-                pad_width = max_length - mel_spec_db.shape[1]
-                mel_spec_db = np.pad(mel_spec_db, ((0, 0), (0, pad_width)), mode='constant')
-            else:
-                mel_spec_db = mel_spec_db[:, :max_length]
+            # 1. Load Audio (skipped when already decoded)
+            if not isinstance(audio, np.ndarray):
+                audio, _ = librosa.load(audio, sr=sr, mono=True)
             
-            # 5. Convert to Tensor (Add Batch and Channel Dimensions)
+            # 2. Normalized Mel Spectrogram, padded/truncated, as a zero-copy
+            # tensor view (Batch and Channel Dimensions added)
             # Shape: (1, 1, 128, 500)
-            tensor = torch.FloatTensor(mel_spec_db).unsqueeze(0).unsqueeze(0)
+            tensor = self.mel_frontend.tensor(audio, max_length=max_length)
             return tensor.to(self.device)
             
         except Exception as e:
             print(f"⚠️ Spectrogram Error: {e}")
             # Return empty tensor to prevent crash (batch=1, channel=1, freq=128, time=500)
-            return torch.zeros((1, 1, n_mels, max_length)).to(self.device)
+            return torch.zeros((1, 1, n_mels, max_length or 500)).to(self.device)
 
-    def _prepare_features(self, features: Dict) -> np.ndarray:
-        """Prepare tabular features for ML models"""
-        feature_order = self.config.ACOUSTIC_FEATURES + self.config.LEXICAL_FEATURES
-        feature_values = [features.get(feat, 0) for feat in feature_order]
-        feature_array = np.array(feature_values).reshape(1, -1)
-        return self.scaler.transform(feature_array)
+    def _fold_scaler(self):
+        """Check the scaler's column layout and keep its mean/scale for scale_features"""
+        fitted = getattr(self.scaler, 'feature_names_in_', None)
+        if fitted is not None and list(fitted) != self.config.FEATURE_NAMES:
+            raise ValueError(
+                f"Scaler was fitted on columns {list(fitted)}, "
+                f"expected ModelConfig.FEATURE_NAMES {self.config.FEATURE_NAMES}"
+            )
+        self._scale_mean = self.scaler.mean_ if self.scaler.with_mean else 0.0
+        self._scale = self.scaler.scale_ if self.scaler.with_std else 1.0
+    
+    def scale_features(self, features: np.ndarray) -> np.ndarray:
+        """StandardScaler transform of (N, 33) FEATURE_NAMES rows as one broadcast op"""
+        return (features - self._scale_mean) / self._scale
     
-    def _classify(self, features_tabular: np.ndarray, spectrogram_tensor: torch.Tensor) -> Dict:
+    def _classify(self, features_tabular: np.ndarray,
+                  spectrogram_tensor: Union[torch.Tensor, Callable[[], torch.Tensor]],
+                  explanation: Optional[Dict] = None) -> Dict:
         """
         Run 4-Way Ensemble Classification
+        (``spectrogram_tensor`` may be a callable so the cascade can skip building it).
+        When ``explanation`` is a dict, member contributions and CNN attention
+        from the same pass are stored in it.
         """
-        # 1. Get ML Probabilities (CPU)
+        # 1. Get ML Probabilities (CPU), with their contributions if explaining
+        policy = self.threading_policy
         try:
-            p_cat  = self.cat_model.predict_proba(features_tabular)[0]
-            p_rf   = self.rf_model.predict_proba(features_tabular)[0]
-            p_lgbm = self.lgbm_model.predict_proba(features_tabular)[0]
+            with policy.limits():
+                if explanation is None:
+                    with telemetry.span('member_catboost'):
+                        p_cat  = self.cat_model.predict_proba(
+                            features_tabular, **policy.predict_kwargs('catboost'))[0]
+                    with telemetry.span('member_random_forest'):
+                        p_rf   = self.rf_model.predict_proba(features_tabular)[0]
+                    with telemetry.span('member_lightgbm'):
+                        p_lgbm = self.lgbm_model.predict_proba(
+                            features_tabular, **policy.predict_kwargs('lightgbm'))[0]
+                else:
+                    with telemetry.span('member_catboost'):
+                        p_cat, c_cat = catboost_contributions(
+                            self.cat_model, features_tabular, **policy.predict_kwargs('catboost'))
+                    with telemetry.span('member_random_forest'):
+                        p_rf, c_rf = self.forest_contributions(features_tabular)
+                    with telemetry.span('member_lightgbm'):
+                        p_lgbm, c_lgbm = lightgbm_contributions(
+                            self.lgbm_model, features_tabular, **policy.predict_kwargs('lightgbm'))
+                    p_cat, p_rf, p_lgbm = p_cat[0], p_rf[0], p_lgbm[0]
+                    explanation['contributions'] = {
+                        'catboost': c_cat[0], 'lightgbm': c_lgbm[0], 'random_forest': c_rf[0]
+                    }
         except:
             # Fallback if model fails
             p_cat = p_rf = p_lgbm = np.array([0.33, 0.33, 0.33])
+            telemetry.increment('ensemble_fallbacks', {'member': 'trees'})
 
-        # 2. Get Deep Learning Probabilities (GPU/CPU)
-        with torch.no_grad():
-            outputs = self.cnn_model(spectrogram_tensor)
-            p_cnn = F.softmax(outputs, dim=1).cpu().numpy()[0]
-
-        # 3. Weighted Ensemble (Soft Voting)
-        # Weights from your optimization: CNN=0.65, Cat=0.20, LGBM=0.10, RF=0.05
-        w_cnn, w_cat, w_lgbm, w_rf = 0.65, 0.20, 0.10, 0.05
-        
-        ensemble_proba = (
-            (w_cnn  * p_cnn) + 
-            (w_cat  * p_cat) + 
-            (w_lgbm * p_lgbm) + 
-            (w_rf   * p_rf)
-        )
+        members = {'catboost': p_cat, 'lightgbm': p_lgbm, 'random_forest': p_rf}
+        
+        # 2. Cascade: stop here when the tree members alone are confident enough
+        ensemble_proba = None
+        p_cnn = None
+        if self.config.CASCADE_ENABLED:
+            tree_proba = self.tree_probabilities(members)
+            if self._cascade_exits(tree_proba):
+                ensemble_proba = tree_proba
+        
+        # 3. Get Deep Learning Probabilities (GPU/CPU)
+        if ensemble_proba is None:
+            if callable(spectrogram_tensor):
+                spectrogram_tensor = spectrogram_tensor()
+            # A truncated spectrogram is exactly one window, so both modes share this path
+            mel = spectrogram_tensor[0, 0].cpu().numpy()
+            with telemetry.span('member_cnn'):
+                if explanation is None:
+                    p_cnn = self.cnn_probabilities([mel])[0]
+                else:
+                    p_cnn, attention = self.cnn_probabilities([mel], return_attention=True)
+                    p_cnn = p_cnn[0]
+                    explanation['attention'] = attention[0] if attention else None
+            
+            # 4. Weighted Ensemble (Soft Voting)
+            ensemble_proba = self.ensemble_probabilities({'cnn': p_cnn, **members})
+        
+        cascade_path = 'full' if p_cnn is not None else 'early_exit'
+        self._count_cascade_path(cascade_path)
         
         ensemble_pred_idx = np.argmax(ensemble_proba)
         
@@ -289,11 +637,142 @@ class ClaritasModel:
             },
             'confidence': float(ensemble_proba[ensemble_pred_idx]),
             'details': {
-                'cnn_conf': float(p_cnn[ensemble_pred_idx]),
-                'ml_conf': float(p_cat[ensemble_pred_idx])
+                'cnn_conf': float(p_cnn[ensemble_pred_idx]) if p_cnn is not None else None,
+                'ml_conf': float(p_cat[ensemble_pred_idx]),
+                'cascade_path': cascade_path   # 'early_exit' = CNN skipped
             }
         }
     
+    def ensemble_probabilities(self, members: Dict[str, np.ndarray]) -> np.ndarray:
+        """Weighted soft vote over member probabilities, (3,) or (N, 3) arrays"""
+        weights = self.config.ENSEMBLE_WEIGHTS
+        return (
+            (weights['cnn']           * members['cnn']) +
+            (weights['catboost']      * members['catboost']) +
+            (weights['lightgbm']      * members['lightgbm']) +
+            (weights['random_forest'] * members['random_forest'])
+        )
+    
+    def tree_probabilities(self, members: Dict[str, np.ndarray]) -> np.ndarray:
+        """Soft vote of the tree members alone, their weights renormalised to sum to 1"""
+        weights = self.config.ENSEMBLE_WEIGHTS
+        trees = ('catboost', 'lightgbm', 'random_forest')
+        total = sum(weights[m] for m in trees)
+        if total <= 0:
+            return sum(members[m] for m in trees) / len(trees)
+        return sum(weights[m] / total * members[m] for m in trees)
+    
+    def _cascade_exits(self, proba: np.ndarray) -> bool:
+        """True when the top-1 vs top-2 margin clears CASCADE_MARGIN for an allowed class"""
+        runner_up, top = np.sort(proba)[-2:]
+        if top - runner_up < self.config.CASCADE_MARGIN:
+            return False
+        allowed = self.config.CASCADE_EXIT_CLASSES
+        return allowed is None or self.config.CLASS_NAMES[int(np.argmax(proba))] in allowed
+    
+    def _count_cascade_path(self, path: str):
+        with self._cascade_lock:
+            self._cascade_counts[path] += 1
+        telemetry.increment('cascade_path', {'path': path})
+    
+    def cascade_stats(self) -> Dict:
+        """How often predictions exited after the tree members vs ran the full ensemble"""
+        with self._cascade_lock:
+            counts = dict(self._cascade_counts)
+        total = sum(counts.values())
+        return {
+            'early_exit': counts.get('early_exit', 0),
+            'full': counts.get('full', 0),
+            'early_exit_rate': counts.get('early_exit', 0) / total if total else 0.0
+        }
+    
+    def cnn_probabilities(self, mels: list, return_attention: bool = False):
+        """
+        CNN-LSTM class probabilities for full-length (n_mels, T) spectrograms.
+        
+        Each recording is split into overlapping windows, windows from all
+        recordings are run in length-bucketed batches, and window logits are
+        averaged per recording. Returns (len(mels), num_classes).
+        
+        With ``return_attention`` also returns per-frame attention for each
+        recording from the same forward passes (None when the runtime cannot
+        expose it: scripted/quantized artifacts or micro-batching).
+        """
+        window, hop = self.config.CNN_WINDOW_FRAMES, self.config.CNN_WINDOW_HOP
+        windows, owners, weights = plan_windows(mels, window, hop)
+        
+        step_attention = None
+        if self.microbatcher is not None:
+            # Windows join other in-flight requests' batches
+            futures = [self.microbatcher.submit(w) for w in windows]
+            logits = np.stack([f.result() for f in futures]).astype(np.float64)
+        else:
+            if return_attention and hasattr(self.cnn_model, 'forward_with_attention'):
+                step_attention = [None] * len(windows)
+            logits = np.zeros((len(windows), len(self.config.CLASS_NAMES)), dtype=np.float64)
+            for batch in bucket_batches([w.shape[1] for w in windows], self.config.CNN_MAX_BATCH):
+                padded = pad_batch([windows[i] for i in batch])
+                if step_attention is None:
+                    logits[batch] = self._cnn_forward(padded)
+                    continue
+                logits[batch], attention = self._cnn_forward_with_attention(padded)
+                for row, i in enumerate(batch):
+                    step_attention[i] = attention[row]
+        
+        recording_logits = aggregate_logits(logits, owners, weights, len(mels))
+        proba = F.softmax(torch.from_numpy(recording_logits), dim=1).numpy()
+        if not return_attention:
+            return proba
+        
+        attention = None
+        if step_attention is not None:
+            attention = recording_attention(
+                [m.shape[1] for m in mels], step_attention, [w.shape[1] for w in windows],
+                owners, weights, window, hop
+            )
+        return proba, attention
+    
+    def _cnn_forward(self, batch: np.ndarray) -> np.ndarray:
+        """Logits for a (B, 1, n_mels, T) float32 batch"""
+        with torch.no_grad():
+            return self.cnn_model(torch.from_numpy(batch).to(self.device)).cpu().numpy()
+    
+    def _cnn_forward_with_attention(self, batch: np.ndarray):
+        """Logits and (B, steps) attention weights for a (B, 1, n_mels, T) batch (eager model)"""
+        with torch.no_grad():
+            logits, attention = self.cnn_model.forward_with_attention(
+                torch.from_numpy(batch).to(self.device))
+        return logits.cpu().numpy(), attention.cpu().numpy()
+    
+    def _explanation(self, parts: Dict, classification: Dict, feature_values: np.ndarray,
+                     num_samples: int) -> Optional[Dict]:
+        """Response-ready explanation of one prediction from its _classify parts"""
+        contributions = parts.get('contributions')
+        if contributions is None:
+            return None   # Tree members fell back to uniform probabilities
+        class_idx = self.config.CLASS_NAMES.index(classification['predicted_class'])
+        
+        attention = None
+        frame_attention = parts.get('attention')
+        if frame_attention is not None:
+            frontend = self.mel_frontend
+            attention = {
+                'segment_seconds': self.config.EXPLAIN_SEGMENT_SECONDS,
+                'segments': attention_segments(
+                    frame_attention, frontend.num_frames(num_samples),
+                    frontend.hop_length / frontend.sr, self.config.EXPLAIN_SEGMENT_SECONDS
+                )
+            }
+        
+        return {
+            'class': classification['predicted_class'],
+            'features': summarize_contributions(
+                contributions, self.config.ENSEMBLE_WEIGHTS, self.config.FEATURE_NAMES,
+                feature_values, class_idx
+            ),
+            'attention': attention   # None if the CNN was skipped or cannot expose it
+        }
+    
     def _calculate_fluency_score(self, acoustic_features: Dict) -> float:
         """
         Calculate speech fluency score (0-100)
@@ -372,7 +851,7 @@ class ClaritasModel:
     
     def get_feature_importance(self) -> Dict:
         """Get averaged feature importance from the ML ensemble (CatBoost + RF + LightGBM)"""
-        feature_names = self.config.ACOUSTIC_FEATURES + self.config.LEXICAL_FEATURES
+        feature_names = self.config.FEATURE_NAMES
         
         # 1. Get importances from each model
         # Note: CatBoost and LGBM returns raw scores, RF returns 0-1 probabilities.
@@ -0,0 +1,178 @@
+"""
+Audio preprocessing applied to the decoded buffer before every extractor
+
+Phone and tablet recordings arrive at very different levels, with DC
+offsets and background noise. Since webrtcvad decides on absolute levels,
+the same speaker can come out with very different pause ratios. The stages
+below are vectorised and run in order on the shared float32 buffer:
+
+1. DC offset removal (in place)
+2. Spectral-gating noise reduction (optional): STFT bins below a noise
+   threshold estimated from the quietest frames are attenuated by a fixed
+   amount, under a smoothed mask. A floor rather than a hard gate keeps
+   the residual noise stationary; gated "musical noise" reads as speech
+   to the VAD.
+3. Peak or loudness normalisation (in place). Loudness is measured as
+   ITU-R BS.1770 / EBU R128 integrated loudness, i.e. K-weighted and
+   gated, in LUFS. Gain never pushes the peak above the ceiling, so the
+   buffer cannot clip.
+
+``to_int16`` is the clipping-safe conversion used for the VAD.
+"""
+
+from typing import Optional
+
+import numpy as np
+import scipy.ndimage
+import scipy.signal
+
+
+def to_int16(audio: np.ndarray) -> np.ndarray:
+    """float [-1, 1] -> int16 PCM, saturating instead of wrapping around at full scale"""
+    return np.clip(audio * 32768.0, -32768, 32767).astype(np.int16)
+
+
+def _biquad_sos(kind: str, fc: float, q: float, sr: int, gain_db: float = 0.0) -> np.ndarray:
+    """RBJ cookbook high-shelf / high-pass biquad as one second-order section"""
+    w0 = 2 * np.pi * fc / sr
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    if kind == 'high_shelf':
+        A = 10 ** (gain_db / 40)
+        sqrt_a = 2 * np.sqrt(A) * alpha
+        b = [A * ((A + 1) + (A - 1) * cos_w0 + sqrt_a),
+             -2 * A * ((A - 1) + (A + 1) * cos_w0),
+             A * ((A + 1) + (A - 1) * cos_w0 - sqrt_a)]
+        a = [(A + 1) - (A - 1) * cos_w0 + sqrt_a,
+             2 * ((A - 1) - (A + 1) * cos_w0),
+             (A + 1) - (A - 1) * cos_w0 - sqrt_a]
+    else:
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    return np.array([b + a]) / a[0]
+
+
+def integrated_loudness(audio: np.ndarray, sr: int) -> float:
+    """
+    BS.1770 integrated loudness (LUFS) of a mono signal: K-weighting, 400 ms
+    blocks with 75% overlap, -70 LUFS absolute and -10 LU relative gates.
+    Returns -inf for clips shorter than one block or entirely gated out.
+    """
+    sos = np.vstack([
+        _biquad_sos('high_shelf', 1500.0, 1 / np.sqrt(2), sr, gain_db=4.0),
+        _biquad_sos('high_pass', 38.0, 0.5, sr)
+    ])
+    weighted = scipy.signal.sosfilt(sos, audio.astype(np.float64))
+
+    block, step = int(0.4 * sr), int(0.1 * sr)
+    if len(weighted) < block:
+        return float('-inf')
+    energy = np.concatenate(([0.0], np.cumsum(weighted ** 2)))
+    starts = np.arange(0, len(weighted) - block + 1, step)
+    power = (energy[starts + block] - energy[starts]) / block
+
+    with np.errstate(divide='ignore'):
+        loudness = -0.691 + 10 * np.log10(power)
+    gated = power[loudness > -70.0]
+    if len(gated) == 0:
+        return float('-inf')
+    relative = -0.691 + 10 * np.log10(gated.mean()) - 10.0
+    with np.errstate(divide='ignore'):
+        gated = gated[-0.691 + 10 * np.log10(gated) > relative]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def spectral_gate(audio: np.ndarray, sr: int, strength: float = 1.5, reduction_db: float = 20.0,
+                  n_fft: int = 512, hop: int = 128, noise_quantile: float = 0.1) -> np.ndarray:
+    """
+    Stationary spectral-gating noise reduction.
+
+    The noise floor per frequency is the mean (dB) of the quietest
+    ``noise_quantile`` of frames. Bins less than ``strength`` standard
+    deviations above it are attenuated by ``reduction_db``; the mask is
+    smoothed over 3 bins x 5 frames before it is applied.
+    """
+    if len(audio) < n_fft:
+        return audio
+    _, _, spectrum = scipy.signal.stft(audio, fs=sr, nperseg=n_fft, noverlap=n_fft - hop)
+    magnitude_db = 20 * np.log10(np.abs(spectrum) + 1e-10)
+
+    frame_level = magnitude_db.mean(axis=0)
+    quiet = magnitude_db[:, frame_level <= np.quantile(frame_level, noise_quantile)]
+    threshold = quiet.mean(axis=1) + strength * quiet.std(axis=1)
+
+    mask = (magnitude_db > threshold[:, None]).astype(np.float32)
+    mask = scipy.ndimage.uniform_filter(mask, size=(3, 5), mode='nearest')
+    floor = 10 ** (-reduction_db / 20)
+    mask = floor + (1 - floor) * mask
+    _, cleaned = scipy.signal.istft(spectrum * mask, fs=sr, nperseg=n_fft, noverlap=n_fft - hop)
+    return cleaned[:len(audio)].astype(audio.dtype, copy=False)
+
+
+class AudioPreprocessor:
+    """DC removal, optional spectral gating and peak / loudness normalisation"""
+
+    NORMALIZATIONS = (None, 'peak', 'loudness')
+
+    def __init__(self, sr: int = 16000, dc_removal: bool = False,
+                 normalization: Optional[str] = None, peak_dbfs: float = -1.0,
+                 target_lufs: float = -23.0, denoise: bool = False,
+                 denoise_strength: float = 1.5, denoise_reduction_db: float = 20.0):
+        if normalization not in self.NORMALIZATIONS:
+            raise ValueError(f"Unknown normalization: {normalization!r} "
+                             f"(expected one of {self.NORMALIZATIONS})")
+        self.sr = sr
+        self.dc_removal = dc_removal
+        self.normalization = normalization
+        self.ceiling = 10 ** (peak_dbfs / 20)
+        self.target_lufs = target_lufs
+        self.denoise = denoise
+        self.denoise_strength = denoise_strength
+        self.denoise_reduction_db = denoise_reduction_db
+
+    @classmethod
+    def from_config(cls, config) -> 'AudioPreprocessor':
+        return cls(
+            sr=config.SAMPLE_RATE,
+            dc_removal=config.PREPROCESS_DC_REMOVAL,
+            normalization=config.PREPROCESS_NORMALIZATION,
+            peak_dbfs=config.PREPROCESS_PEAK_DBFS,
+            target_lufs=config.PREPROCESS_TARGET_LUFS,
+            denoise=config.PREPROCESS_DENOISE,
+            denoise_strength=config.PREPROCESS_DENOISE_STRENGTH,
+            denoise_reduction_db=config.PREPROCESS_DENOISE_REDUCTION_DB
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.dc_removal or self.denoise or self.normalization is not None
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """Process a mono float buffer in place where possible; returns the processed buffer"""
+        if not self.enabled or audio.size == 0:
+            return audio
+        if not audio.flags.writeable:
+            audio = audio.copy()
+
+        if self.dc_removal:
+            audio -= audio.mean(dtype=np.float64)
+        if self.denoise:
+            audio[:] = spectral_gate(audio, self.sr, self.denoise_strength,
+                                     self.denoise_reduction_db)
+
+        gain = self._gain(audio)
+        if gain != 1.0:
+            audio *= gain
+        return audio
+
+    def _gain(self, audio: np.ndarray) -> float:
+        peak = float(np.abs(audio).max())
+        if self.normalization is None or peak <= 0:
+            return 1.0
+        if self.normalization == 'peak':
+            return self.ceiling / peak
+
+        loudness = integrated_loudness(audio, self.sr)
+        if not np.isfinite(loudness):
+            return 1.0   # Too short or silent to measure
+        return min(10 ** ((self.target_lufs - loudness) / 20), self.ceiling / peak)
@@ -0,0 +1,229 @@
+"""
+Log-mel spectrogram frontend for the CNN-LSTM
+
+Equivalent to ``librosa.feature.melspectrogram`` + ``power_to_db(ref=np.max)``
++ per-recording standardisation, but the mel filterbank and window are built
+once, the STFT runs over fixed-size blocks of frames, and every intermediate
+lives in per-thread buffers that are reused across calls. Buffers larger
+than ``max_buffer_bytes`` are allocated for one call only, so a thread that
+once processed a very long recording does not hold on to its memory. The
+result can be handed to torch without a copy via ``torch.from_numpy``.
+
+The ``batch`` method runs the same pipeline on torch (``torch.stft``) for
+several recordings at once. ``segment_power`` + ``from_segments`` build it
+from a recording streamed in blocks (``ai.streaming``).
+"""
+
+import threading
+from typing import Iterable, List, Optional
+
+import librosa
+import numpy as np
+import scipy.fft
+import scipy.signal
+import torch
+
+
+class MelFrontend:
+    """Normalized log-mel spectrograms with a cached filterbank and reusable buffers"""
+
+    def __init__(self, sr: int = 16000, n_fft: int = 2048, hop_length: int = 512,
+                 n_mels: int = 128, fmax: float = 8000, top_db: float = 80.0,
+                 amin: float = 1e-10, block_frames: int = 512,
+                 max_buffer_bytes: int = 32 * 2 ** 20):
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self.top_db = top_db
+        self.amin = amin
+        self.block_frames = block_frames
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self.mel_basis = librosa.filters.mel(
+            sr=sr, n_fft=n_fft, n_mels=n_mels, fmax=fmax
+        ).astype(np.float32)
+        self.window = scipy.signal.get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self._mel_basis_t = torch.from_numpy(self.mel_basis)
+        self._window_t = torch.from_numpy(self.window)
+
+        self._local = threading.local()
+
+    def num_frames(self, num_samples: int) -> int:
+        """Frame count of a centered STFT over ``num_samples``"""
+        return 1 + num_samples // self.hop_length
+
+    def __call__(self, audio: np.ndarray, max_length: Optional[int] = 500) -> np.ndarray:
+        """
+        (n_mels, max_length) normalized log-mel spectrogram, zero-padded or
+        truncated as in training; ``max_length=None`` keeps all frames.
+
+        The returned array is a view of a per-thread buffer: it stays valid
+        until the next call from the same thread. Copy it to keep it longer.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        pad = self.n_fft // 2
+        total = self.num_frames(len(audio))
+
+        # Centered, zero-padded signal
+        padded = self._buffer('padded', len(audio) + 2 * pad)
+        padded[:pad] = 0
+        padded[pad:pad + len(audio)] = audio
+        padded[pad + len(audio):] = 0
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.hop_length]
+
+        mel = self._buffer('mel', self.n_mels * total).reshape(self.n_mels, total)
+        self._mel_power(frames, mel)
+
+        # power_to_db(ref=np.max, top_db) in place
+        ref_db = 10.0 * np.log10(max(self.amin, float(mel.max()))) if total else 0.0
+        self._to_db(mel, ref_db)
+        if self.top_db is not None and total:
+            np.maximum(mel, mel.max() - self.top_db, out=mel)
+
+        # Standardise over the whole recording (before padding, as in training)
+        mel -= mel.mean()
+        mel /= mel.std() + 1e-6
+
+        if max_length is None:
+            return mel
+
+        out = self._buffer('out', self.n_mels * max_length).reshape(self.n_mels, max_length)
+        keep = min(total, max_length)
+        out[:, :keep] = mel[:, :keep]
+        out[:, keep:] = 0
+        return out
+
+    def segment_power(self, segment: np.ndarray) -> np.ndarray:
+        """
+        (n_mels, frames) mel power of a ``CentredFrames`` segment, i.e. the
+        ``center=False`` frames of an already padded signal (new array)
+        """
+        frames = np.lib.stride_tricks.sliding_window_view(
+            np.asarray(segment, dtype=np.float32), self.n_fft)[::self.hop_length]
+        mel = np.empty((self.n_mels, len(frames)), dtype=np.float32)
+        self._mel_power(frames, mel)
+        return mel
+
+    def from_segments(self, powers: Iterable[np.ndarray], peak_power: float,
+                      max_length: Optional[int] = 500) -> np.ndarray:
+        """
+        ``__call__`` for a recording given as consecutive ``segment_power``
+        blocks, plus its peak mel power from an earlier pass. Only the first
+        ``max_length`` frames are kept (all with None). The dB mean and std
+        accumulate over every frame, so the result matches the whole-buffer
+        spectrogram up to float32 rounding of those two statistics.
+        """
+        ref_db = 10.0 * np.log10(max(self.amin, peak_power))
+        floor = None
+        if self.top_db is not None:
+            peak_db = np.array([peak_power], dtype=np.float32)
+            floor = float(self._to_db(peak_db, ref_db)[0]) - self.top_db
+
+        kept, num_kept = [], 0
+        total, total_sum, total_sq = 0, 0.0, 0.0
+        for mel in powers:
+            self._to_db(mel, ref_db)
+            if floor is not None:
+                np.maximum(mel, floor, out=mel)
+            total += mel.size
+            total_sum += float(mel.sum(dtype=np.float64))
+            total_sq += float(np.square(mel, dtype=np.float64).sum())
+            if max_length is None or num_kept < max_length:
+                part = mel if max_length is None else mel[:, :max_length - num_kept]
+                kept.append(part)
+                num_kept += part.shape[1]
+
+        mean = total_sum / total if total else 0.0
+        std = np.sqrt(max(total_sq / total - mean * mean, 0.0)) if total else 0.0
+        mel = np.concatenate(kept, axis=1) if kept else np.zeros((self.n_mels, 0), np.float32)
+        mel -= np.float32(mean)
+        mel /= np.float32(std + 1e-6)
+        if max_length is None:
+            return mel
+
+        out = np.zeros((self.n_mels, max_length), dtype=np.float32)
+        out[:, :mel.shape[1]] = mel
+        return out
+
+    def tensor(self, audio: np.ndarray, max_length: Optional[int] = 500) -> torch.Tensor:
+        """(1, 1, n_mels, T) tensor sharing memory with the frontend buffer"""
+        return torch.from_numpy(self(audio, max_length))[None, None]
+
+    def batch(self, audios: List[np.ndarray], max_length: int = 500) -> torch.Tensor:
+        """
+        (B, 1, n_mels, max_length) batch computed with torch.stft in one pass.
+        Each recording is normalised over its own frames only.
+        """
+        lengths = [len(a) for a in audios]
+        signal = torch.zeros(len(audios), max(lengths, default=0))
+        for i, audio in enumerate(audios):
+            signal[i, :len(audio)] = torch.from_numpy(np.asarray(audio, dtype=np.float32))
+
+        spectrum = torch.stft(
+            signal, self.n_fft, hop_length=self.hop_length, window=self._window_t,
+            center=True, pad_mode='constant', return_complex=True
+        )
+        mel = torch.matmul(self._mel_basis_t, spectrum.abs().square_())
+
+        frames = torch.tensor([self.num_frames(n) for n in lengths])
+        valid = (torch.arange(mel.shape[-1])[None, :] < frames[:, None])[:, None, :]
+
+        # power_to_db(ref=max over each recording's own frames)
+        ref = torch.where(valid, mel, torch.zeros(())).amax(dim=(1, 2), keepdim=True)
+        mel_db = 10.0 * torch.log10(mel.clamp_min(self.amin))
+        mel_db -= 10.0 * torch.log10(ref.clamp_min(self.amin))
+        if self.top_db is not None:
+            peak = torch.where(valid, mel_db, torch.full((), -torch.inf)).amax(dim=(1, 2), keepdim=True)
+            mel_db = torch.maximum(mel_db, peak - self.top_db)
+
+        counts = (frames * self.n_mels).to(mel_db.dtype)[:, None, None]
+        masked = torch.where(valid, mel_db, torch.zeros(()))
+        mean = masked.sum(dim=(1, 2), keepdim=True) / counts
+        var = (torch.where(valid, mel_db - mean, torch.zeros(())) ** 2).sum(dim=(1, 2), keepdim=True) / counts
+        mel_db = torch.where(valid, (mel_db - mean) / (var.sqrt() + 1e-6), torch.zeros(()))
+
+        out = torch.zeros(len(audios), 1, self.n_mels, max_length)
+        keep = min(mel_db.shape[-1], max_length)
+        out[:, 0, :, :keep] = mel_db[:, :, :keep]
+        return out
+
+    def _mel_power(self, frames: np.ndarray, mel: np.ndarray):
+        """Blocked STFT -> power -> mel projection of (T, n_fft) frames into (n_mels, T)"""
+        total = len(frames)
+        windowed = self._buffer('windowed', self.block_frames * self.n_fft).reshape(
+            self.block_frames, self.n_fft)
+        power = self._buffer('power', self.block_frames * (self.n_fft // 2 + 1)).reshape(
+            self.block_frames, self.n_fft // 2 + 1)
+        for start in range(0, total, self.block_frames):
+            n = min(self.block_frames, total - start)
+            np.multiply(frames[start:start + n], self.window, out=windowed[:n])
+            spectrum = scipy.fft.rfft(windowed[:n], axis=1)
+            np.abs(spectrum, out=power[:n])
+            np.square(power[:n], out=power[:n])
+            np.matmul(self.mel_basis, power[:n].T, out=mel[:, start:start + n])
+
+    def _to_db(self, mel: np.ndarray, ref_db: float) -> np.ndarray:
+        """power_to_db relative to ``ref_db``, in place (top_db is applied by the caller)"""
+        np.maximum(mel, self.amin, out=mel)
+        np.log10(mel, out=mel)
+        mel *= 10.0
+        mel -= ref_db
+        return mel
+
+    def _buffer(self, name: str, size: int) -> np.ndarray:
+        """
+        Flat per-thread float32 buffer of at least ``size`` elements, grown
+        geometrically up to ``max_buffer_bytes``. Larger requests get a fresh
+        array that is not retained (freed once the caller drops the result).
+        """
+        buffers = self._local.__dict__.setdefault('buffers', {})
+        buf = buffers.get(name)
+        if buf is None or buf.size < size:
+            limit = self.max_buffer_bytes // 4
+            if size > limit:
+                return np.empty(size, dtype=np.float32)
+            buf = np.empty(min(max(size, int(buf.size * 1.5) if buf is not None else size), limit),
+                           dtype=np.float32)
+            buffers[name] = buf
+        return buf[:size]
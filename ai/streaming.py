@@ -0,0 +1,181 @@
+"""
+Chunked, bounded-memory audio loading for long recordings
+
+``librosa.load`` decodes a whole file at its native rate, downmixes and
+resamples it in memory. A multi-hour recording then needs several copies
+of the signal at once. The helpers here read the file with soundfile in
+fixed-size blocks and resample each block with a streaming soxr resampler
+(the same 'HQ' filter librosa uses), so at most one block of audio is in
+memory. Concatenated, the blocks are bit-identical to ``librosa.load``.
+
+Consumers see the blocks in order:
+
+- ``VoiceActivityDetector.stream()`` keeps one decision per VAD frame.
+- ``CentredFrames`` regroups blocks into segments of whole STFT frames, on
+  the same grid as ``center=True``. Prosody and the mel spectrogram are
+  computed per segment and reduced to ``RunningMoments``.
+"""
+
+import math
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+import soxr
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """Length in seconds, or None when soundfile cannot read the file"""
+    try:
+        return sf.info(path).duration
+    except RuntimeError:   # LibsndfileError: unsupported container / codec
+        return None
+
+
+def audio_length(path: str, sr: int) -> Optional[int]:
+    """Number of samples ``audio_blocks(path, sr)`` yields, or None when soundfile cannot read the file"""
+    try:
+        info = sf.info(path)
+    except RuntimeError:
+        return None
+    return int(np.ceil(info.frames * (float(sr) / info.samplerate)))
+
+
+def audio_blocks(path: str, sr: int, block_seconds: float = 30.0) -> Iterator[np.ndarray]:
+    """
+    Mono float32 blocks of ``path`` at ``sr``. Blocks are consecutive and
+    about ``block_seconds`` long. Like librosa, the resampled signal is
+    zero-padded or trimmed to ``ceil(frames * sr / native_sr)`` samples.
+    """
+    with sf.SoundFile(path) as f:
+        native = f.samplerate
+        resampler = None
+        if native != sr:
+            resampler = soxr.ResampleStream(native, sr, 1, dtype='float32', quality='HQ')
+        expected = int(np.ceil(f.frames * (float(sr) / native)))   # as audio_length
+        emitted = 0
+
+        for block in f.blocks(blocksize=max(1, int(block_seconds * native)),
+                              dtype='float32', always_2d=True):
+            mono = block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+            mono = np.ascontiguousarray(mono, dtype=np.float32)
+            if resampler is not None:
+                mono = resampler.resample_chunk(mono, last=False)
+            mono = mono[:expected - emitted]
+            emitted += len(mono)
+            if len(mono):
+                yield mono
+
+        if resampler is not None:
+            tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            tail = tail[:expected - emitted]
+            emitted += len(tail)
+            if len(tail):
+                yield tail
+        if emitted < expected:
+            yield np.zeros(expected - emitted, dtype=np.float32)
+
+
+def span_audio(blocks: Iterable[np.ndarray], spans: List[Tuple[int, int]]) -> Iterator[np.ndarray]:
+    """
+    Samples ``[start:end]`` of each span (starts and ends non-decreasing),
+    cut from consecutive blocks as soon as the span is complete. Only audio
+    from the first unfinished span onward is held. Spans running past the
+    last block come back shortened.
+    """
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start, i = 0, 0
+    for block in blocks:
+        buffer = np.concatenate((buffer, block))
+        while i < len(spans) and spans[i][1] <= buffer_start + len(buffer):
+            start, end = spans[i]
+            yield buffer[start - buffer_start:end - buffer_start].copy()
+            i += 1
+        # The next span may start past the audio read so far
+        keep = buffer_start + len(buffer)
+        if i < len(spans):
+            keep = min(spans[i][0], keep)
+        buffer = buffer[keep - buffer_start:]
+        buffer_start = keep
+    for start, end in spans[i:]:
+        yield buffer[max(0, start - buffer_start):max(0, end - buffer_start)].copy()
+
+
+class RunningMoments:
+    """Count, mean, population std, min and max of values seen in batches"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray):
+        n = len(values)
+        if n == 0:
+            return
+        values = values.astype(np.float64, copy=False)
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        # Chan et al. pairwise combination
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+
+class CentredFrames:
+    """
+    Regroups consecutive blocks into segments that hold whole STFT frames.
+
+    Frame ``t`` covers samples ``[t * hop - n_fft // 2, t * hop + n_fft // 2)``
+    of the zero-padded signal, as with ``center=True``. Each segment from
+    ``push``/``finish`` frames those samples with ``center=False``, i.e.
+    ``1 + (len(segment) - n_fft) // hop`` frames starting at the previous
+    ``next_frame``. Only the overlap between segments is carried over.
+    """
+
+    def __init__(self, n_fft: int = 2048, hop: int = 512):
+        self.n_fft = n_fft
+        self.hop = hop
+        self.half = n_fft // 2
+        self.num_samples = 0
+        self.next_frame = 0
+        self._buffer = np.zeros(self.half, dtype=np.float32)   # left zero padding
+        self._buffer_start = -self.half
+
+    def push(self, block: np.ndarray) -> Optional[Tuple[np.ndarray, int, int]]:
+        """``(segment, left_pad, right_pad)`` for every frame now complete, or None"""
+        self._buffer = np.concatenate((self._buffer, block))
+        self.num_samples += len(block)
+        if self.num_samples < self.half:
+            return None
+        return self._emit((self.num_samples - self.half) // self.hop + 1)
+
+    def finish(self) -> Optional[Tuple[np.ndarray, int, int]]:
+        """The remaining frames, zero-padded on the right"""
+        self._buffer = np.concatenate((self._buffer, np.zeros(self.half, dtype=np.float32)))
+        return self._emit(1 + self.num_samples // self.hop)
+
+    def _emit(self, end_frame: int) -> Optional[Tuple[np.ndarray, int, int]]:
+        if end_frame <= self.next_frame:
+            return None
+        start = self.next_frame * self.hop - self.half
+        stop = (end_frame - 1) * self.hop + self.half
+        segment = self._buffer[start - self._buffer_start:stop - self._buffer_start]
+        left_pad = max(0, -start)
+        right_pad = max(0, stop - self.num_samples)
+
+        keep_from = end_frame * self.hop - self.half
+        self._buffer = self._buffer[keep_from - self._buffer_start:].copy()
+        self._buffer_start = keep_from
+        self.next_frame = end_frame
+        return segment, left_pad, right_pad
@@ -0,0 +1,175 @@
+"""
+Per-stage latency telemetry for the analysis pipeline
+
+Pipeline stages are wrapped in ``telemetry.span("stage")``. While telemetry
+is enabled each span records its wall time into a fixed-bucket histogram
+(``claritas_stage_duration_seconds{stage=...}``); named counters cover
+discrete events. ``render_prometheus`` produces the Prometheus text
+exposition format for a ``/metrics`` endpoint.
+
+Disabled (the default unless ``CLARITAS_METRICS=1``), ``span`` returns a
+shared no-op context manager, so instrumented code pays one attribute check
+per stage. The module only uses the standard library so the backend can
+import it without pulling in torch.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, Optional, Tuple
+
+# Seconds; spans from sub-millisecond scaling up to multi-minute LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (non-cumulative counts, +Inf last)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)  # Prometheus buckets are "<= le"
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Span:
+    """Times one stage into its histogram"""
+
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class Telemetry:
+    """Stage histograms and counters with a Prometheus text renderer"""
+
+    def __init__(self, namespace: str = 'claritas', buckets=DEFAULT_BUCKETS,
+                 enabled: bool = False):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop every recorded sample"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def span(self, stage: str):
+        """Context manager timing ``stage``; a shared no-op while disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self._histogram(stage))
+
+    def observe(self, stage: str, seconds: float):
+        """Record an externally measured duration for ``stage``"""
+        if self.enabled:
+            self._histogram(stage).observe(seconds)
+
+    def increment(self, name: str, labels: Optional[Dict[str, str]] = None,
+                  value: float = 1.0):
+        """Add ``value`` to the counter ``<namespace>_<name>_total{labels}``"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {'count', 'total_s', 'mean_s'}} for reports and benchmarks"""
+        with self._lock:
+            histograms = list(self._histograms.items())
+        return {
+            stage: {
+                'count': h.count,
+                'total_s': h.sum,
+                'mean_s': h.sum / h.count if h.count else 0.0
+            }
+            for stage, h in sorted(histograms)
+        }
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        if histograms:
+            name = f"{self.namespace}_stage_duration_seconds"
+            lines.append(f"# HELP {name} Wall time per analysis pipeline stage.")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, h in histograms:
+                with h._lock:
+                    counts, total, count = list(h.counts), h.sum, h.count
+                label = f'stage="{_escape(stage)}"'
+                cumulative = 0
+                for bound, bucket_count in zip(h.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append(f'{name}_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{label}}} {total!r}")
+                lines.append(f"{name}_count{{{label}}} {count}")
+
+        typed = set()
+        for (counter, labels), value in counters:
+            name = f"{self.namespace}_{counter}_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            label = ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+            lines.append(f"{name}{{{label}}} {value!r}" if label else f"{name} {value!r}")
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def _histogram(self, stage: str) -> Histogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram(self.buckets))
+        return histogram
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Process-wide registry shared by the ai pipeline and the backend
+telemetry = Telemetry(
+    enabled=os.getenv('CLARITAS_METRICS', '0').lower() in ('1', 'true', 'yes')
+)
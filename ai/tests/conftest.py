@@ -0,0 +1,10 @@
+"""Shared fixtures for the AI module tests."""
+import pytest
+
+from ai.benchmarks.suite import build_model
+
+
+@pytest.fixture(scope="session")
+def model(tmp_path_factory):
+    """ClaritasModel with the bundled ensemble (random CNN weights if none are bundled)."""
+    return build_model(tmp_path_factory.mktemp("models"))
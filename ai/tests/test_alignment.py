@@ -0,0 +1,74 @@
+"""Tests for word-timestamp / VAD pause alignment."""
+import numpy as np
+import pytest
+
+from ai.alignment import PauseAligner
+from ai.config import ModelConfig
+
+WORDS = [
+    {'word': 'the', 'start': 0.0, 'end': 0.2},
+    {'word': 'boy', 'start': 0.5, 'end': 0.8},     # 0.3 s pause before a noun
+    {'word': 'took', 'start': 0.8, 'end': 1.0},
+    {'word': 'the', 'start': 2.5, 'end': 2.6},     # 1.5 s: new utterance
+    {'word': 'cookie', 'start': 2.6, 'end': 3.0},
+    {'word': 'jar', 'start': 3.4, 'end': 3.6}      # 0.4 s voiced pause before a noun
+]
+
+
+def _speech_mask():
+    """30 ms frames, speech only during the 'um' between 'cookie' and 'jar'"""
+    mask = np.zeros(130, dtype=np.int8)
+    mask[100:114] = 1
+    return mask
+
+
+def test_align_splits_utterances_and_classifies_pauses():
+    """Gaps become within/between-utterance, filled and pre-noun pauses."""
+    result = PauseAligner().align(WORDS, _speech_mask())
+    features = result['features']
+
+    assert set(features) == set(ModelConfig.ALIGNMENT_FEATURES)
+    assert features['num_utterances'] == 2
+    assert features['within_utterance_pauses'] == 2
+    assert features['mean_within_pause'] == pytest.approx(0.35)
+    assert features['between_utterance_pauses'] == 1
+    assert features['mean_between_pause'] == pytest.approx(1.5)
+    assert features['filled_pause_count'] == 1
+    assert features['noun_count'] == 3
+    assert features['pre_noun_pause_count'] == 2
+    assert features['pre_noun_pause_ratio'] == pytest.approx(2 / 3)
+    assert features['mean_pre_noun_pause'] == pytest.approx(0.35)
+
+    first, second = result['segments']
+    assert (first['start'], first['end'], first['text']) == (0.0, 1.0, 'the boy took')
+    assert (second['start'], second['end'], second['text']) == (2.5, 3.6, 'the cookie jar')
+    assert first['syllables'] == 3 and second['syllables'] == 3
+    assert first['speech_rate'] == pytest.approx(180.0)
+    assert second['speech_rate'] == pytest.approx(3 * 60 / 1.1)
+    assert features['mean_segment_rate'] == pytest.approx((180.0 + 3 * 60 / 1.1) / 2)
+
+
+def test_align_is_independent_of_word_order_and_overlaps():
+    """Unsorted words give the same result; overlapping words leave no gap."""
+    aligner = PauseAligner()
+    expected = aligner.align(WORDS, _speech_mask())
+
+    assert aligner.align(WORDS[::-1], _speech_mask()) == expected
+
+    overlapping = [{'word': 'the', 'start': 0.0, 'end': 1.0},
+                   {'word': 'boy', 'start': 0.5, 'end': 0.7},
+                   {'word': 'jar', 'start': 0.9, 'end': 1.2}]
+    features = aligner.align(overlapping, np.zeros(50))['features']
+    assert features['within_utterance_pauses'] == 0
+    assert features['num_utterances'] == 1
+
+
+def test_align_without_words_returns_defaults():
+    """No usable word timings give every alignment feature at 0."""
+    aligner = PauseAligner()
+    backwards = [{'word': 'boy', 'start': 1.0, 'end': 0.5}]
+
+    for words in ([], backwards):
+        result = aligner.align(words, np.ones(10))
+        assert result['segments'] == []
+        assert result['features'] == dict.fromkeys(ModelConfig.ALIGNMENT_FEATURES, 0.0)
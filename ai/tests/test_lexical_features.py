@@ -0,0 +1,109 @@
+"""Tests for lexical feature extraction."""
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from ai.config import ModelConfig
+from ai.features import LexicalFeatureExtractor
+
+
+def _reference_features(extractor, text, lang, speech_duration, total_duration):
+    """Per-feature loops over plain word lists, as before the fused kernel"""
+    text = extractor._preprocess_text(text)
+    tokens = extractor._tokenize(text)
+    n = len(tokens)
+    content = extractor.CONTENT_WORDS[lang]
+    function = extractor.FUNCTION_WORDS[lang]
+    deictic = extractor.DEICTIC_WORDS[lang]
+
+    word_reps = sum(1 for i in range(n - 1) if tokens[i] == tokens[i + 1])
+    bigrams = Counter(' '.join(tokens[i:i + 2]) for i in range(n - 1))
+    phrase_reps = sum(count - 1 for count in bigrams.values() if count > 1)
+    content_count = sum(1 for t in tokens if t in content)
+    deictic_count = sum(1 for t in tokens if t in deictic)
+    syllables = extractor._count_syllables(text)
+    return {
+        'has_text': 1,
+        'total_tokens': n,
+        'unique_tokens': len(set(tokens)),
+        'ttr': len(set(tokens)) / n,
+        'content_word_count': content_count,
+        'function_word_count': sum(1 for t in tokens if t in function),
+        'lexical_density': content_count / n,
+        'deictic_count': deictic_count,
+        'deictic_ratio': deictic_count / n,
+        'word_repetitions': word_reps,
+        'phrase_repetitions': phrase_reps,
+        'total_repetitions': word_reps + phrase_reps,
+        'repetition_ratio': (word_reps + phrase_reps) / n,
+        'syllable_count': syllables,
+        'speech_rate': syllables / total_duration * 60,
+        'articulation_rate': syllables / speech_duration * 60
+    }
+
+
+@pytest.mark.parametrize('text, lang', [
+    ('The boy the boy is is reaching for the cookie jar and and the the stool '
+     'is falling, the mother is washing dishes and the water is overflowing', 'english'),
+    ('um that that thing there, the thing, the girl is is looking at it', 'english'),
+    ('anak laki yang ambil kue dari toples dan ibu itu cuci piring piring '
+     'dengan air yang meluap ke lantai ke lantai', 'indonesian'),
+    ('word', 'english')
+])
+def test_fused_kernel_matches_per_feature_loops(text, lang):
+    """One Counter pass gives the same values as the separate feature loops."""
+    extractor = LexicalFeatureExtractor()
+    features = extractor.extract(text, 20.0, 30.0)
+
+    assert extractor._detect_language(extractor._preprocess_text(text)) == lang
+    assert features == pytest.approx(_reference_features(extractor, text, lang, 20.0, 30.0))
+
+
+def test_extract_writes_into_feature_row():
+    """``out`` receives the lexical values at their FEATURE_NAMES columns."""
+    row = np.zeros(len(ModelConfig.FEATURE_NAMES))
+    features = LexicalFeatureExtractor().extract('the boy took the cookie', 2.0, 3.0, out=row)
+
+    for name in ModelConfig.LEXICAL_FEATURES:
+        assert row[ModelConfig.FEATURE_INDEX[name]] == pytest.approx(features[name])
+
+
+def test_empty_text_returns_defaults():
+    """Missing or blank transcripts give the no-text defaults."""
+    extractor = LexicalFeatureExtractor()
+
+    for text in (None, '', '   ', '...'):
+        features = extractor.extract(text, 1.0, 1.0)
+        assert features['has_text'] == 0
+        assert features['total_tokens'] == 0
+
+
+@pytest.mark.parametrize('text, lang', [
+    ('男孩站在凳子上拿饼干', 'chinese'),
+    ('那个 boy 在拿饼干', 'chinese'),
+    ('the boy said 饼干', 'english'),
+    ('anak itu yang jatuh', 'indonesian'),
+    ('the boy is falling', 'english')
+])
+def test_language_detection_by_script(text, lang):
+    """Mostly-Han text is Chinese; otherwise Indonesian keywords, else English."""
+    assert LexicalFeatureExtractor()._detect_language(text) == lang
+
+
+def test_chinese_transcript_is_segmented_into_words():
+    """Han runs are segmented with the Chinese lexicons; other words stay whole."""
+    extractor = LexicalFeatureExtractor()
+
+    assert extractor._tokenize('男孩在拿饼干, ok 那个东西') == [
+        '男孩', '在', '拿', '饼干', 'ok', '那个', '东西']
+
+    features = extractor.extract('男孩在拿饼干，那个东西掉了', 3.0, 4.0)
+    # 男孩 / 在 / 拿 / 饼干 / 那个 / 东西 / 掉 / 了
+    assert features['total_tokens'] == 8
+    # 男孩, 拿, 饼干, 掉
+    assert features['content_word_count'] == 4
+    # 那个, 东西
+    assert features['deictic_count'] == 2
+    # One syllable per character
+    assert features['syllable_count'] == 12
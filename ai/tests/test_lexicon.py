@@ -0,0 +1,82 @@
+"""Tests for the compiled lexicon index."""
+from ai.features import LexicalFeatureExtractor
+from ai.lexicon import CJKSegmenter, Lexicon, PhraseTrie, build_lexicons, load_word_list
+
+
+def test_phrase_trie_returns_longest_match():
+    """match() reports the longest phrase starting at a position, 0 if none."""
+    trie = PhraseTrie([('di',), ('di', 'sini'), ('di', 'sini', 'saja')])
+    tokens = ['dia', 'di', 'sini', 'saja', 'di', 'sana']
+
+    assert trie.max_length == 3
+    assert trie.match(tokens, 0) == 0
+    assert trie.match(tokens, 1) == 3
+    assert trie.match(tokens, 4) == 1
+    assert not PhraseTrie()
+
+
+def test_lexicon_counts_words_and_phrases_once():
+    """Single words are set lookups; a multi-word entry counts as one hit."""
+    lexicon = Lexicon(['Ini', 'itu', 'di sini', 'di sana'])
+
+    assert 'ini' in lexicon and 'di' not in lexicon
+    assert len(lexicon) == 2
+    assert lexicon.count(['ini', 'di', 'sini', 'itu', 'di', 'rumah']) == 3
+    assert Lexicon(['a', 'b']).count(['a', 'b', 'c', 'a']) == 3
+
+
+def test_build_lexicons_merges_word_list_files(tmp_path):
+    """Files under <dir>/<language>/<category>.txt extend the built-in lists."""
+    (tmp_path / 'english').mkdir()
+    (tmp_path / 'english' / 'content.txt').write_text(
+        '# picture items\nplate\n\n  spoon  \n', encoding='utf-8')
+    (tmp_path / 'english' / 'filler.txt').write_text('um\nuh\n', encoding='utf-8')
+
+    lexicons = build_lexicons({'content': {'english': ['boy'], 'chinese': ['水']}}, tmp_path)
+
+    assert load_word_list(tmp_path / 'english' / 'content.txt') == ['plate', 'spoon']
+    assert lexicons['english']['content'].words == {'boy', 'plate', 'spoon'}
+    assert lexicons['english']['filler'].words == {'um', 'uh'}
+    assert lexicons['chinese']['content'].words == {'水'}
+    assert set(lexicons['chinese']) == {'content'}
+
+
+def test_extractor_counts_indonesian_deictic_phrases():
+    """'di sini' is one deictic hit, not a function word plus a stray token."""
+    features = LexicalFeatureExtractor().extract(
+        'anak itu ada di sini dan ibu yang cuci piring', 10.0, 12.0)
+
+    # 'itu' and 'di sini'
+    assert features['deictic_count'] == 2
+    # 'anak', 'ibu', 'cuci', 'piring'
+    assert features['content_word_count'] == 4
+
+
+def test_extractor_lexicon_dir_is_per_instance(tmp_path):
+    """A custom word-list directory does not leak into the shared index."""
+    (tmp_path / 'english').mkdir()
+    (tmp_path / 'english' / 'content.txt').write_text('plate\n', encoding='utf-8')
+    text = 'the boy dropped a plate'
+
+    custom = LexicalFeatureExtractor(lexicon_dir=str(tmp_path)).extract(text, 5.0, 5.0)
+    shared = LexicalFeatureExtractor().extract(text, 5.0, 5.0)
+
+    assert custom['content_word_count'] == 2
+    assert shared['content_word_count'] == 1
+
+
+def test_cjk_segmenter_takes_longest_dictionary_word():
+    """Forward maximum matching prefers the longest word, else one character."""
+    segmenter = CJKSegmenter(['男孩', '饼干', '罐子', '饼干罐', '水'])
+
+    assert segmenter.segment('男孩拿饼干罐子') == ['男孩', '拿', '饼干罐', '子']
+    assert segmenter.segment('他拿饼干') == ['他', '拿', '饼干']
+    assert segmenter.segment('') == []
+
+
+def test_cjk_segmenter_from_lexicons_uses_every_category():
+    """Words of any category of the language become segmenter entries."""
+    segmenter = CJKSegmenter.from_lexicons(
+        {'content': Lexicon(['厨房', '地板']), 'deictic': Lexicon(['那个'])})
+
+    assert segmenter.segment('那个厨房地板') == ['那个', '厨房', '地板']
@@ -0,0 +1,100 @@
+"""Tests for the CNN-LSTM micro-batcher."""
+import threading
+
+import numpy as np
+import pytest
+
+from ai.microbatch import MicroBatcher
+
+
+def _window(width, seed=0, n_mels=8):
+    return np.random.default_rng(seed).standard_normal((n_mels, width)).astype(np.float32)
+
+
+def _forward(batch):
+    """Per-row statistics: padding or mixing rows would change them"""
+    rows = batch.reshape(len(batch), -1)
+    return np.stack((rows.mean(axis=1), rows.std(axis=1), rows[:, -1]), axis=1)
+
+
+class RecordingForward:
+    """Wraps a forward and records the shape of every batch it sees"""
+
+    def __init__(self, forward=_forward):
+        self.forward = forward
+        self.shapes = []
+        self.lock = threading.Lock()
+
+    def __call__(self, batch):
+        with self.lock:
+            self.shapes.append(batch.shape)
+        return self.forward(batch)
+
+
+def test_same_width_windows_share_one_forward_pass():
+    """Same-width windows queued together run as a single batch."""
+    forward = RecordingForward()
+    batcher = MicroBatcher(forward, max_batch=4, max_wait_ms=10_000)
+    futures = [batcher.submit(_window(50, seed)) for seed in range(4)]
+    for future in futures:
+        future.result(timeout=5)
+    batcher.close()
+
+    assert forward.shapes == [(4, 1, 8, 50)]
+    assert batcher.stats()['total_batches'] == 1
+
+
+def test_mixed_widths_never_share_a_batch():
+    """Windows of different widths go to separate forward passes, unpadded."""
+    forward = RecordingForward()
+    batcher = MicroBatcher(forward, max_batch=16, max_wait_ms=50)
+    futures = [batcher.submit(_window(width, seed))
+               for seed, width in enumerate([50, 30, 50, 30, 40])]
+    for future in futures:
+        future.result(timeout=5)
+    batcher.close()
+
+    assert sorted(forward.shapes) == [(1, 1, 8, 40), (2, 1, 8, 30), (2, 1, 8, 50)]
+
+
+def test_results_match_unbatched_forward():
+    """Every future resolves to the logits of a batch-1 forward on its window."""
+    windows = [_window(width, seed) for seed, width in enumerate([50, 30, 50, 50, 30, 20] * 3)]
+    batcher = MicroBatcher(_forward, max_batch=4, max_wait_ms=20)
+    futures = [batcher.submit(window) for window in windows]
+    results = [future.result(timeout=5) for future in futures]
+    batcher.close()
+
+    for window, result in zip(windows, results):
+        np.testing.assert_array_equal(result, _forward(window[None, None])[0])
+
+
+def test_forward_error_reaches_every_waiter():
+    """An exception in the batched forward is set on all of its futures."""
+    def failing(batch):
+        raise RuntimeError("forward failed")
+
+    batcher = MicroBatcher(failing, max_batch=3, max_wait_ms=10_000)
+    futures = [batcher.submit(_window(50, seed)) for seed in range(3)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="forward failed"):
+            future.result(timeout=5)
+
+    # The worker survives the failure and keeps serving
+    batcher.forward = _forward
+    futures = [batcher.submit(_window(50, seed)) for seed in range(3)]
+    assert [future.result(timeout=5).shape for future in futures] == [(3,)] * 3
+    batcher.close()
+
+
+def test_close_drains_pending_windows():
+    """close() runs windows still waiting for company instead of dropping them."""
+    forward = RecordingForward()
+    batcher = MicroBatcher(forward, max_batch=16, max_wait_ms=60_000)
+    futures = [batcher.submit(_window(width, seed))
+               for seed, width in enumerate([50, 50, 30])]
+    batcher.close()
+
+    assert all(future.done() for future in futures)
+    assert sorted(forward.shapes) == [(1, 1, 8, 30), (2, 1, 8, 50)]
+    assert batcher.stats()['total_items'] == 3
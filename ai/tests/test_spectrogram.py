@@ -0,0 +1,59 @@
+"""Tests for the log-mel spectrogram frontend."""
+import librosa
+import numpy as np
+import pytest
+
+from ai.benchmarks.suite import synthetic_audio
+from ai.spectrogram import MelFrontend
+from ai.streaming import CentredFrames
+
+
+def _librosa_mel(audio, sr=16000, max_length=500):
+    """The training pipeline: melspectrogram -> power_to_db(ref=max) -> standardise -> pad"""
+    mel = librosa.feature.melspectrogram(y=audio, sr=sr, n_fft=2048, hop_length=512,
+                                         n_mels=128, fmax=8000)
+    mel = librosa.power_to_db(mel, ref=np.max)
+    mel = (mel - mel.mean()) / (mel.std() + 1e-6)
+    if max_length is None:
+        return mel
+    if mel.shape[1] < max_length:
+        return np.pad(mel, ((0, 0), (0, max_length - mel.shape[1])))
+    return mel[:, :max_length]
+
+
+@pytest.mark.parametrize('seconds, max_length', [(3.0, 500), (20.0, 500), (20.0, None)])
+def test_frontend_matches_librosa(seconds, max_length):
+    """Cached filterbank + blocked STFT reproduce the librosa pipeline."""
+    audio = synthetic_audio(seconds, seed=6)
+
+    mel = MelFrontend()(audio, max_length=max_length)
+
+    np.testing.assert_allclose(mel, _librosa_mel(audio, max_length=max_length), atol=1e-4)
+
+
+def test_frontend_output_is_thread_buffer_view():
+    """A call reuses the previous call's buffer; copies stay valid."""
+    frontend = MelFrontend()
+    first = frontend(synthetic_audio(2.0, seed=1)).copy()
+    view = frontend(synthetic_audio(2.0, seed=1))
+    frontend(synthetic_audio(2.0, seed=2))
+
+    assert not np.array_equal(view, first)
+    np.testing.assert_array_equal(frontend(synthetic_audio(2.0, seed=1)), first)
+
+
+@pytest.mark.parametrize('max_length', [500, None])
+def test_from_segments_matches_whole_buffer(max_length):
+    """A spectrogram built from streamed segments equals the one-shot result."""
+    frontend = MelFrontend()
+    audio = synthetic_audio(40.0, seed=7)
+    framer = CentredFrames(frontend.n_fft, frontend.hop_length)
+
+    segments = [framer.push(audio[i:i + 48_001]) for i in range(0, len(audio), 48_001)]
+    segments = [s for s in segments + [framer.finish()] if s is not None]
+    powers = [frontend.segment_power(segment) for segment, _, _ in segments]
+    peak_power = max(float(p.max()) for p in powers)
+
+    streamed = frontend.from_segments(powers, peak_power, max_length)
+
+    np.testing.assert_allclose(streamed, frontend(audio, max_length=max_length), atol=1e-5)
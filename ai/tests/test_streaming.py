@@ -0,0 +1,117 @@
+"""Tests for chunked audio loading and block-wise feature extraction."""
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+from ai.benchmarks.suite import synthetic_audio
+from ai.features import AcousticFeatureExtractor
+from ai.streaming import (CentredFrames, RunningMoments, audio_blocks, audio_length,
+                          span_audio)
+from ai.vad import EnergyVAD, WebRtcVAD
+
+SR = 16000
+DATA_WAV = 'ai/data/adresso_0_2843.wav'
+
+
+def _split(audio, sizes):
+    """Consecutive blocks of ``audio`` with sizes cycling through ``sizes``"""
+    blocks, pos, i = [], 0, 0
+    while pos < len(audio):
+        blocks.append(audio[pos:pos + sizes[i % len(sizes)]])
+        pos += sizes[i % len(sizes)]
+        i += 1
+    return blocks
+
+
+def test_audio_blocks_match_librosa_load():
+    """Concatenated blocks equal a whole-file librosa.load, resampling included."""
+    expected, _ = librosa.load(DATA_WAV, sr=SR, mono=True)
+    blocks = list(audio_blocks(DATA_WAV, SR, block_seconds=0.25))
+
+    assert len(blocks) > 1
+    assert audio_length(DATA_WAV, SR) == len(expected)
+    np.testing.assert_array_equal(np.concatenate(blocks), expected)
+
+
+def test_audio_blocks_downmix_and_resample(tmp_path):
+    """Stereo 44.1 kHz input is downmixed and resampled like librosa.load."""
+    path = tmp_path / 'stereo.wav'
+    left = synthetic_audio(7.3, sr=44100, seed=1)
+    sf.write(path, np.stack((left, 0.5 * left[::-1]), axis=1), 44100, subtype='FLOAT')
+
+    expected, _ = librosa.load(path, sr=SR, mono=True)
+    streamed = np.concatenate(list(audio_blocks(str(path), SR, block_seconds=1.0)))
+
+    assert audio_length(str(path), SR) == len(expected)
+    np.testing.assert_allclose(streamed, expected, atol=1e-6)
+
+
+def test_span_audio_cuts_spans_across_blocks():
+    """Overlapping or gapped spans equal slices of the whole signal; the last is shortened."""
+    audio = np.arange(10_000, dtype=np.float32)
+    spans = [(0, 3000), (1500, 4500), (3000, 6000), (9000, 12_000)]
+
+    spans_out = list(span_audio(_split(audio, [700, 1300]), spans))
+
+    assert len(spans_out) == len(spans)
+    for (start, end), part in zip(spans, spans_out):
+        np.testing.assert_array_equal(part, audio[start:end])
+
+
+def test_running_moments_match_numpy():
+    """Pairwise-merged batch moments equal the statistics of all values."""
+    values = np.random.default_rng(0).normal(5.0, 3.0, 10_001)
+    moments = RunningMoments()
+    for part in _split(values, [1, 999, 4000, 0 + 17]):
+        moments.update(part)
+
+    assert moments.count == len(values)
+    assert moments.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert moments.std == pytest.approx(values.std(), rel=1e-10)
+    assert (moments.min, moments.max) == (values.min(), values.max())
+
+
+def test_centred_frames_tile_the_centred_stft_grid():
+    """Segments frame exactly the center=True frames, none repeated or lost."""
+    n_fft, hop = 2048, 512
+    audio = synthetic_audio(3.1, seed=2)
+    framer = CentredFrames(n_fft, hop)
+
+    frames = []
+    for segment in [framer.push(b) for b in _split(audio, [5000, 333])] + [framer.finish()]:
+        if segment is not None:
+            frames.append(librosa.util.frame(segment[0], frame_length=n_fft, hop_length=hop))
+    padded = np.pad(audio, n_fft // 2)
+    expected = librosa.util.frame(padded, frame_length=n_fft, hop_length=hop)
+
+    np.testing.assert_array_equal(np.concatenate(frames, axis=1), expected)
+
+
+@pytest.mark.parametrize('vad', [
+    WebRtcVAD(SR, 30, aggressiveness=2, hangover_ms=300),
+    EnergyVAD(SR, 30, min_speech_ms=90)
+])
+def test_vad_stream_matches_whole_recording(vad):
+    """Feeding blocks of any size gives the same mask as one call."""
+    audio = synthetic_audio(20.0, seed=4)
+    stream = vad.stream()
+    for block in _split(audio, [12_345, 480, 7]):
+        stream.push(block)
+
+    np.testing.assert_array_equal(stream.finish(), vad(audio))
+
+
+def test_extract_stream_matches_whole_buffer_features():
+    """Block-wise acoustic features equal extract_from_audio up to float rounding."""
+    extractor = AcousticFeatureExtractor(sr=SR)
+    audio = synthetic_audio(45.0, seed=5)
+
+    expected = extractor.extract_from_audio(audio)
+    features, speech_mask, num_samples = extractor.extract_stream(_split(audio, [SR * 7 + 11]))
+
+    assert num_samples == len(audio)
+    np.testing.assert_array_equal(speech_mask, extractor.speech_mask(audio))
+    assert set(features) == set(expected)
+    for name, value in expected.items():
+        assert features[name] == pytest.approx(value, rel=1e-6, abs=1e-9), name
@@ -0,0 +1,85 @@
+"""Tests for sliding-window CNN inference."""
+import numpy as np
+import pytest
+
+from ai.benchmarks.suite import synthetic_audio
+from ai.windowing import aggregate_logits, bucket_batches, pad_batch, split_windows, window_starts
+
+
+def test_split_windows_covers_every_frame():
+    """Windows overlap by the hop and the last one ends at the last frame."""
+    mel = np.arange(3 * 1100, dtype=np.float32).reshape(3, 1100)
+    windows = split_windows(mel, window=500, hop=250)
+
+    assert window_starts(1100, 500, 250) == [0, 250, 500, 600]
+    assert [w.shape for w in windows] == [(3, 500)] * 4
+    np.testing.assert_array_equal(windows[-1], mel[:, 600:])
+
+
+def test_split_windows_keeps_short_clips_at_natural_length():
+    """A clip within one window is not padded, except up to the conv minimum."""
+    assert split_windows(np.ones((3, 320)))[0].shape == (3, 320)
+
+    tiny = split_windows(np.ones((3, 5)), min_frames=8)[0]
+    assert tiny.shape == (3, 8)
+    assert tiny[:, 5:].sum() == 0
+
+
+def test_bucket_batches_never_mixes_widths():
+    """Batches hold equal-width windows, longest first, at most max_batch each."""
+    lengths = [500, 120, 500, 500, 120, 80]
+    batches = bucket_batches(lengths, max_batch=2)
+
+    assert batches == [[0, 2], [3], [1, 4], [5]]
+    for batch in batches:
+        assert pad_batch([np.ones((4, lengths[i])) for i in batch]).shape[-1] == lengths[batch[0]]
+
+
+def test_aggregate_logits_is_frame_weighted_mean_per_recording():
+    """Each recording's logits are its windows' logits weighted by frames covered."""
+    logits = np.array([[1.0, 0.0], [3.0, 2.0], [5.0, 5.0]])
+    owners = np.array([0, 0, 1])
+    weights = np.array([500.0, 100.0, 40.0])
+
+    np.testing.assert_allclose(
+        aggregate_logits(logits, owners, weights, 2),
+        [[(500 + 300) / 600, 200 / 600], [5.0, 5.0]]
+    )
+
+
+def test_sliding_matches_truncation_for_one_window(model, monkeypatch):
+    """A clip exactly one window long scores the same in both inference modes."""
+    frames = model.config.CNN_WINDOW_FRAMES
+    audio = synthetic_audio(1.0, seed=3)
+    audio = np.resize(audio, (frames - 1) * model.mel_frontend.hop_length)
+
+    def probabilities(mode):
+        monkeypatch.setattr(model.config, 'CNN_INFERENCE_MODE', mode)
+        mel = model._cnn_spectrogram(audio)[0, 0].cpu().numpy().copy()
+        return mel, model.cnn_probabilities([mel])[0]
+
+    truncated_mel, truncated = probabilities('truncate')
+    sliding_mel, sliding = probabilities('sliding')
+
+    assert sliding_mel.shape == truncated_mel.shape == (128, frames)
+    np.testing.assert_array_equal(sliding_mel, truncated_mel)
+    np.testing.assert_allclose(sliding, truncated, atol=1e-6)
+
+
+def test_sliding_scores_are_independent_of_batching(model):
+    """Recordings scored together match each scored alone, window by window."""
+    mels = [model.mel_frontend(synthetic_audio(seconds, seed=seed), max_length=None).copy()
+            for seed, seconds in enumerate([40.0, 6.0, 40.0, 0.1])]
+    together = model.cnn_probabilities(mels)
+    alone = np.concatenate([model.cnn_probabilities([mel]) for mel in mels])
+
+    np.testing.assert_allclose(together, alone, atol=1e-5)
+
+    # A long recording is the frame-weighted mean of its windows' logits
+    windows = split_windows(mels[0], model.config.CNN_WINDOW_FRAMES, model.config.CNN_WINDOW_HOP)
+    logits = np.concatenate([model._cnn_forward(pad_batch([w])) for w in windows])
+    expected = aggregate_logits(logits, np.zeros(len(windows), dtype=np.int64),
+                                np.full(len(windows), float(windows[0].shape[1])), 1)
+    expected = np.exp(expected - expected.max()) / np.exp(expected - expected.max()).sum()
+    np.testing.assert_allclose(together[0], expected[0], atol=1e-5)
+    assert len(windows) > 1
@@ -0,0 +1,95 @@
+"""
+Runtime threading policy for the mixed torch / BLAS / booster process
+
+ClaritasModel runs torch, CatBoost, LightGBM and scikit-learn side by side.
+Left at their defaults each backend sizes its own pool to every core, so
+overlapping requests oversubscribe the CPU and tail latency explodes. This
+module caps each pool from ``ModelConfig.THREADING`` and can pin the process
+to a fixed set of cores (``ModelConfig.CPU_AFFINITY``).
+"""
+
+import os
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Union
+
+import torch
+
+
+class ThreadingPolicy:
+    """Per-backend thread counts, threadpoolctl limits and core pinning"""
+
+    BACKENDS = ('torch', 'torch_interop', 'blas', 'openmp', 'lightgbm', 'catboost', 'sklearn')
+
+    def __init__(self, threads: Optional[Dict[str, Optional[int]]] = None,
+                 cpu_affinity: Union[None, str, List[int]] = None):
+        """
+        Args:
+            threads: {backend: count or None (library default)} for BACKENDS
+            cpu_affinity: None, an explicit list of core ids, or "worker" to
+                take a contiguous slice of cores chosen by the
+                CLARITAS_WORKER_INDEX environment variable (one slice of
+                ``threads['torch']`` cores per server worker process)
+        """
+        threads = threads or {}
+        unknown = set(threads) - set(self.BACKENDS)
+        if unknown:
+            raise ValueError(f"Unknown threading backends: {sorted(unknown)}")
+        self.threads = {name: threads.get(name) for name in self.BACKENDS}
+        self.cpu_affinity = cpu_affinity
+
+    @classmethod
+    def from_config(cls, config) -> 'ThreadingPolicy':
+        return cls(getattr(config, 'THREADING', None), getattr(config, 'CPU_AFFINITY', None))
+
+    def apply(self):
+        """Pin cores and size torch's pools; call once per process before inference"""
+        cores = self._resolve_affinity()
+        if cores and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cores)
+            print(f"   Pinned to cores {sorted(cores)}")
+
+        if self.threads['torch']:
+            torch.set_num_threads(self.threads['torch'])
+        if self.threads['torch_interop']:
+            try:
+                torch.set_num_interop_threads(self.threads['torch_interop'])
+            except RuntimeError:
+                # Only settable before the first parallel torch op in the process
+                print("⚠️ torch inter-op threads already initialised; keeping current value")
+
+    def configure_models(self, rf_model=None):
+        """Set thread counts stored on estimator objects"""
+        if rf_model is not None and self.threads['sklearn']:
+            rf_model.n_jobs = self.threads['sklearn']
+
+    def limits(self):
+        """threadpoolctl context capping BLAS/OpenMP pools (no-op when unset)"""
+        limits = {api: self.threads[api] for api in ('blas', 'openmp') if self.threads[api]}
+        if not limits:
+            return nullcontext()
+        from threadpoolctl import threadpool_limits
+        return threadpool_limits(limits=limits)
+
+    def predict_kwargs(self, backend: str) -> Dict[str, int]:
+        """Per-call thread arguments for booster predict_proba"""
+        count = self.threads.get(backend)
+        if not count:
+            return {}
+        if backend == 'catboost':
+            return {'thread_count': count}
+        if backend == 'lightgbm':
+            return {'num_threads': count}
+        return {}
+
+    def _resolve_affinity(self) -> Optional[set]:
+        if not self.cpu_affinity:
+            return None
+        if self.cpu_affinity != 'worker':
+            return set(self.cpu_affinity)
+
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') \
+            else list(range(os.cpu_count() or 1))
+        per_worker = self.threads['torch'] or 1
+        index = int(os.getenv('CLARITAS_WORKER_INDEX', '0'))
+        start = (index * per_worker) % len(available)
+        return {available[(start + i) % len(available)] for i in range(per_worker)}
@@ -0,0 +1,310 @@
+"""
+Ensemble weight and risk-threshold tuning over cached member probabilities
+
+Step 1 (slow, once): run every ensemble member over a labeled set and cache
+the per-sample class probabilities. Features and spectrograms come from the
+feature store, so only recordings not seen before are extracted.
+
+Step 2 (seconds): score thousands of weight vectors on the probability
+simplex and every (low, high) RISK_THRESHOLDS pair with vectorized NumPy,
+then write the best ones to an ``ensemble_weights.pkl``-style file that
+ClaritasModel loads from ``ModelConfig.ENSEMBLE_WEIGHTS_PATH``.
+
+Usage (from the repository root):
+    python -m ai.tuning cache --csv "ai/data/metadata copy.csv" --out member_probs.npz
+    python -m ai.tuning search --cache member_probs.npz --out ai/models/ensemble_weights.pkl
+"""
+
+import argparse
+import json
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+# Ensemble member -> key in ensemble_weights.pkl
+MEMBERS = ('cnn', 'catboost', 'lightgbm', 'random_forest')
+WEIGHT_KEYS = {'cnn': 'w_cnn', 'catboost': 'w_cat', 'lightgbm': 'w_lgbm', 'random_forest': 'w_rf'}
+
+
+def load_ensemble_config(path) -> Tuple[Dict[str, float], Optional[Dict[str, float]]]:
+    """(member weights, risk thresholds or None) from an ensemble_weights.pkl file"""
+    tuned = joblib.load(path)
+    weights = {member: float(tuned[key]) for member, key in WEIGHT_KEYS.items()}
+    thresholds = tuned.get('risk_thresholds')
+    return weights, dict(thresholds) if thresholds else None
+
+
+def save_ensemble_config(path, weights: Dict[str, float],
+                         thresholds: Optional[Dict[str, float]] = None, **metadata):
+    data = {WEIGHT_KEYS[m]: float(weights[m]) for m in MEMBERS}
+    if thresholds:
+        data['risk_thresholds'] = {k: float(v) for k, v in thresholds.items()}
+    data.update(metadata)
+    joblib.dump(data, path)
+
+
+# ---------------------------------------------------------------------- search
+
+def simplex_grid(n_members: int = len(MEMBERS), step: float = 0.05) -> np.ndarray:
+    """Every weight vector with entries in multiples of ``step`` summing to 1 -> (C, n_members)"""
+    k = int(round(1 / step))
+    cuts = np.array(list(combinations(range(k + n_members - 1), n_members - 1)), dtype=np.int64)
+    bounds = np.column_stack([
+        np.full(len(cuts), -1), cuts, np.full(len(cuts), k + n_members - 1)
+    ])
+    return (np.diff(bounds, axis=1) - 1) / k
+
+
+def _balanced_accuracy(pred: np.ndarray, y: np.ndarray, num_classes: int) -> np.ndarray:
+    """Mean per-class recall for each row of a (C, N) prediction matrix"""
+    onehot = np.eye(num_classes, dtype=np.float32)[y]
+    counts = onehot.sum(axis=0)
+    present = counts > 0
+    hits = (pred == y).astype(np.float32) @ onehot
+    return (hits[:, present] / counts[present]).mean(axis=1)
+
+
+def score_weights(probs: np.ndarray, y: np.ndarray, grid: np.ndarray,
+                  metric: str = 'balanced_accuracy', chunk: int = 2048
+                  ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score every weight vector of ``grid`` (C, M) on member probabilities
+    ``probs`` (M, N, K). Returns (metric, mean log-loss) arrays of length C;
+    higher metric is better.
+    """
+    if metric not in ('accuracy', 'balanced_accuracy', 'log_loss'):
+        raise ValueError(f"Unknown metric: {metric}")
+    num_classes = probs.shape[2]
+    # The ensemble is linear in the weights, so every quantity is a matmul
+    per_class = [np.ascontiguousarray(probs[:, :, k]) for k in range(num_classes)]
+    true_class = probs[:, np.arange(len(y)), y]
+    scores = np.empty(len(grid))
+    nll = np.empty(len(grid))
+    for start in range(0, len(grid), chunk):
+        w = grid[start:start + chunk]
+        # Running argmax over classes (first max wins, as np.argmax)
+        best = w @ per_class[0]
+        pred = np.zeros(best.shape, dtype=np.int64)
+        for k in range(1, num_classes):
+            proba = w @ per_class[k]
+            pred[proba > best] = k
+            np.maximum(best, proba, out=best)
+        nll[start:start + chunk] = -np.log(np.clip(w @ true_class, 1e-12, None)).mean(axis=1)
+        if metric == 'accuracy':
+            scores[start:start + chunk] = (pred == y).mean(axis=1)
+        elif metric == 'balanced_accuracy':
+            scores[start:start + chunk] = _balanced_accuracy(pred, y, num_classes)
+        else:
+            scores[start:start + chunk] = -nll[start:start + chunk]
+    return scores, nll
+
+
+def search_weights(probs: np.ndarray, y: np.ndarray, step: float = 0.05,
+                   metric: str = 'balanced_accuracy') -> Dict:
+    """Best simplex weights (ties broken by lower log-loss)"""
+    grid = simplex_grid(probs.shape[0], step)
+    scores, nll = score_weights(probs, y, grid, metric)
+    best = np.lexsort((nll, -scores))[0]
+    return {
+        'weights': dict(zip(MEMBERS, grid[best].tolist())),
+        'score': float(scores[best]),
+        'log_loss': float(nll[best]),
+        'candidates': len(grid)
+    }
+
+
+def risk_levels(impairment: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """0/1/2 (low/medium/high) exactly as ClaritasModel._determine_risk_level, broadcast"""
+    return (impairment >= low).astype(np.int8) + (impairment >= high)
+
+
+def search_thresholds(impairment: np.ndarray, y: np.ndarray, step: float = 0.01) -> Dict:
+    """
+    Best (low, high) RISK_THRESHOLDS pair, scored by balanced accuracy of
+    HC -> low, MCI -> medium, AD -> high risk.
+    """
+    t = np.arange(step, 1.0, step)
+    low, high = np.meshgrid(t, t, indexing='ij')
+    keep = low <= high
+    low, high = low[keep], high[keep]
+    levels = risk_levels(impairment[None, :], low[:, None], high[:, None])
+    scores = _balanced_accuracy(levels, y, 3)
+    best = int(np.argmax(scores))
+    return {
+        'thresholds': {'low': float(low[best]), 'medium': float(high[best]), 'high': float(high[best])},
+        'score': float(scores[best]),
+        'candidates': len(low)
+    }
+
+
+def stratified_split(y: np.ndarray, holdout: float, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Boolean (train, holdout) masks with ``holdout`` of each class held out"""
+    rng = np.random.default_rng(seed)
+    test = np.zeros(len(y), dtype=bool)
+    for k in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == k))
+        test[idx[:int(round(len(idx) * holdout))]] = True
+    return ~test, test
+
+
+def tune(probs: np.ndarray, y: np.ndarray, step: float = 0.05, threshold_step: float = 0.01,
+         metric: str = 'balanced_accuracy', holdout: float = 0.2, seed: int = 0) -> Dict:
+    """Pick weights then thresholds on the train split; report both splits"""
+    train, test = stratified_split(y, holdout, seed) if holdout > 0 else \
+        (np.ones(len(y), dtype=bool), np.zeros(len(y), dtype=bool))
+
+    weights = search_weights(probs[:, train], y[train], step, metric)
+    w = np.array([weights['weights'][m] for m in MEMBERS])
+    ensemble = np.einsum('m,mnk->nk', w, probs)
+    impairment = ensemble[:, 1] + ensemble[:, 2]
+    thresholds = search_thresholds(impairment[train], y[train], threshold_step)
+
+    report = {'weights': weights, 'thresholds': thresholds,
+              'n_train': int(train.sum()), 'n_holdout': int(test.sum())}
+    if test.any():
+        t = thresholds['thresholds']
+        report['holdout'] = {
+            metric: float(score_weights(probs[:, test], y[test], w[None, :], metric)[0][0]),
+            'risk_balanced_accuracy': float(_balanced_accuracy(
+                risk_levels(impairment[test], t['low'], t['high'])[None, :], y[test], 3)[0])
+        }
+    return report
+
+
+def cascade_tradeoff(probs: np.ndarray, y: np.ndarray, weights: Dict[str, float],
+                     margins: np.ndarray, exit_classes: Optional[List[int]] = None,
+                     tree_ms: float = 10.0, cnn_ms: float = 60.0) -> List[Dict]:
+    """
+    Accuracy vs compute of the early-exit cascade for each candidate margin.
+
+    Mirrors ClaritasModel._classify: trees vote with renormalised weights,
+    rows whose top-1 minus top-2 margin reaches the threshold (and whose
+    class is in ``exit_classes``) keep the tree answer, the rest get the
+    full four-member ensemble. Cost is the expected ms per request given
+    per-path latencies (CNN cost includes its spectrogram).
+    """
+    w = np.array([weights[m] for m in MEMBERS])
+    full_pred = np.einsum('m,mnk->nk', w, probs).argmax(axis=1)
+    tree_w = w[1:] / w[1:].sum() if w[1:].sum() > 0 else np.full(len(w) - 1, 1 / (len(w) - 1))
+    trees = np.einsum('m,mnk->nk', tree_w, probs[1:])
+    ranked = np.sort(trees, axis=1)
+    margin = ranked[:, -1] - ranked[:, -2]
+    tree_pred = trees.argmax(axis=1)
+    allowed = np.isin(tree_pred, exit_classes) if exit_classes is not None else \
+        np.ones(len(y), dtype=bool)
+
+    exits = (margin[None, :] >= margins[:, None]) & allowed[None, :]
+    pred = np.where(exits, tree_pred[None, :], full_pred[None, :])
+    exit_rate = exits.mean(axis=1)
+    accuracy = (pred == y).mean(axis=1)
+    balanced = _balanced_accuracy(pred, y, probs.shape[2])
+    agreement = (pred == full_pred).mean(axis=1)
+    cost = tree_ms + (1 - exit_rate) * cnn_ms
+    return [
+        {'margin': float(m), 'early_exit_rate': float(e), 'accuracy': float(a),
+         'balanced_accuracy': float(b), 'agreement_with_full': float(g),
+         'expected_ms': float(c), 'relative_cost': float(c / (tree_ms + cnn_ms))}
+        for m, e, a, b, g, c in zip(margins, exit_rate, accuracy, balanced, agreement, cost)
+    ]
+
+
+# ----------------------------------------------------------------------- cache
+
+def cache_member_probabilities(model, store, rows, out_path):
+    """Run every member once over ``rows`` and save probabilities + labels to an .npz"""
+    keys = store.update(model, [(p, t) for p, t, _ in rows], spectrograms=True)
+    members = store.member_probabilities(model, keys)
+    np.savez_compressed(
+        out_path, keys=np.asarray(keys), labels=np.array([label for _, _, label in rows]),
+        **{m: members[m] for m in MEMBERS}
+    )
+    print(f"✅ Cached {len(keys)} x {len(MEMBERS)} member probabilities in {out_path}")
+
+
+def load_cache(path) -> Tuple[np.ndarray, np.ndarray]:
+    """(probs (M, N, K) in MEMBERS order, labels (N,))"""
+    data = np.load(path)
+    return np.stack([data[m] for m in MEMBERS]), data['labels'].astype(np.int64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cache = sub.add_parser("cache", help="run members once over a labeled CSV")
+    cache.add_argument("--csv", required=True)
+    cache.add_argument("--audio-dir", default=None)
+    cache.add_argument("--store", default=None, help="feature store root")
+    cache.add_argument("--out", default="member_probs.npz")
+
+    search = sub.add_parser("search", help="tune weights and thresholds from a cache")
+    search.add_argument("--cache", default="member_probs.npz")
+    search.add_argument("--step", type=float, default=0.02, help="weight grid resolution")
+    search.add_argument("--threshold-step", type=float, default=0.01)
+    search.add_argument("--metric", choices=("balanced_accuracy", "accuracy", "log_loss"),
+                        default="balanced_accuracy")
+    search.add_argument("--holdout", type=float, default=0.2)
+    search.add_argument("--seed", type=int, default=0)
+    search.add_argument("--out", default=None, help="write an ensemble_weights.pkl here")
+
+    cascade = sub.add_parser("cascade", help="accuracy vs compute of CASCADE_MARGIN values")
+    cascade.add_argument("--cache", default="member_probs.npz")
+    cascade.add_argument("--weights", default=None,
+                         help="ensemble_weights.pkl to use (default: ENSEMBLE_WEIGHTS_PATH)")
+    cascade.add_argument("--exit-classes", default=None, help="e.g. HC or HC,AD (default: any)")
+    cascade.add_argument("--tree-ms", type=float, default=10.0, help="tree members latency")
+    cascade.add_argument("--cnn-ms", type=float, default=60.0, help="spectrogram + CNN latency")
+    cascade.add_argument("--max-drop", type=float, default=0.01,
+                         help="largest balanced-accuracy loss accepted for the recommendation")
+    args = parser.parse_args()
+
+    if args.command == "cache":
+        from .feature_store import FeatureStore, read_metadata
+        from .model import ClaritasModel
+        model = ClaritasModel()
+        cache_member_probabilities(model, FeatureStore(args.store, model.config),
+                                   read_metadata(args.csv, args.audio_dir, label_column='label'),
+                                   args.out)
+        return
+
+    probs, labels = load_cache(args.cache)
+
+    if args.command == "cascade":
+        from .config import ModelConfig
+        path = args.weights or ModelConfig.ENSEMBLE_WEIGHTS_PATH
+        weights = load_ensemble_config(path)[0] if Path(path).exists() else ModelConfig.ENSEMBLE_WEIGHTS
+        exit_classes = None
+        if args.exit_classes:
+            exit_classes = [ModelConfig.CLASS_NAMES.index(c.strip()) for c in args.exit_classes.split(',')]
+        rows = cascade_tradeoff(probs, labels, weights, np.round(np.arange(0.0, 1.0001, 0.05), 2),
+                                exit_classes, args.tree_ms, args.cnn_ms)
+        full = rows[-1] if rows[-1]['early_exit_rate'] == 0 else None
+        print(f"{'margin':>6} {'exit':>6} {'bal.acc':>8} {'acc':>6} {'agree':>6} {'ms/req':>7}")
+        for r in rows:
+            print(f"{r['margin']:>6.2f} {r['early_exit_rate']:>6.1%} {r['balanced_accuracy']:>8.3f} "
+                  f"{r['accuracy']:>6.3f} {r['agreement_with_full']:>6.1%} {r['expected_ms']:>7.1f}")
+        baseline = full['balanced_accuracy'] if full else max(r['balanced_accuracy'] for r in rows)
+        ok = [r for r in rows if baseline - r['balanced_accuracy'] <= args.max_drop]
+        if ok:
+            best = min(ok, key=lambda r: r['expected_ms'])
+            print(f"\n✅ CASCADE_MARGIN = {best['margin']:.2f}: {best['early_exit_rate']:.1%} early exits, "
+                  f"{1 - best['relative_cost']:.1%} less compute, balanced accuracy "
+                  f"{best['balanced_accuracy']:.3f} (full {baseline:.3f})")
+        return
+
+    report = tune(probs, labels, args.step, args.threshold_step, args.metric,
+                  args.holdout, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.out:
+        save_ensemble_config(
+            args.out, report['weights']['weights'], report['thresholds']['thresholds'],
+            metric=args.metric, score=report['weights']['score']
+        )
+        print(f"✅ Ensemble config written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
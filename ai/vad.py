@@ -0,0 +1,213 @@
+"""
+Voice activity detection engines for the pause features
+
+Every engine returns one decision (1 = speech) per ``frame_duration_ms``
+frame, on the same grid, so pause statistics, alignment and the timeline
+are engine-agnostic:
+
+- ``webrtc``: Google's WebRTC GMM detector, one C call per frame. This is
+  the most accurate option and the one the bundled models were trained with.
+- ``energy``: fully vectorised frame energy + zero-crossing-rate detector
+  with an adaptive threshold (noise floor percentile + margin). It is
+  several times faster and needs no int16 conversion.
+
+Both can be post-processed with hangover smoothing. Pauses shorter than
+``hangover_ms`` between speech are merged into speech, and speech bursts
+shorter than ``min_speech_ms`` (clicks, breaths) are dropped.
+
+``stream()`` accepts the audio block by block (see ``ai.streaming``) and
+produces the same mask as a single call on the whole recording.
+
+Compare engines with ``python -m ai.benchmarks.bench_vad``.
+"""
+
+import abc
+from typing import List
+
+import numpy as np
+import webrtcvad
+
+from .preprocessing import to_int16
+
+
+def smooth_mask(mask: np.ndarray, min_pause_frames: int = 0,
+                min_speech_frames: int = 0) -> np.ndarray:
+    """
+    Fill pauses shorter than ``min_pause_frames`` that sit between speech,
+    then drop speech runs shorter than ``min_speech_frames``
+    """
+    mask = np.asarray(mask, dtype=np.int8)
+    if len(mask) == 0 or (min_pause_frames <= 1 and min_speech_frames <= 1):
+        return mask
+
+    def runs(m):
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(m)) + 1))
+        return starts, np.diff(np.append(starts, len(m))), m[starts]
+
+    starts, lengths, values = runs(mask)
+    inner = (starts > 0) & (starts + lengths < len(mask))
+    values = np.where((values == 0) & inner & (lengths < min_pause_frames), 1, values)
+    mask = np.repeat(values, lengths).astype(np.int8)
+
+    starts, lengths, values = runs(mask)
+    values = np.where((values == 1) & (lengths < min_speech_frames), 0, values)
+    return np.repeat(values, lengths).astype(np.int8)
+
+
+class VoiceActivityDetector(abc.ABC):
+    """
+    Per-frame speech decisions on a fixed ``frame_duration_ms`` grid, with
+    smoothing. Engines implement ``_measure`` (and optionally ``_new_state``
+    and ``_classify``).
+    """
+
+    def __init__(self, sr: int = 16000, frame_duration_ms: int = 30,
+                 hangover_ms: float = 0, min_speech_ms: float = 0):
+        self.sr = sr
+        self.frame_duration_ms = frame_duration_ms
+        self.frame_length = int(sr * frame_duration_ms / 1000)
+        self.min_pause_frames = int(round(hangover_ms / frame_duration_ms))
+        self.min_speech_frames = int(round(min_speech_ms / frame_duration_ms))
+
+    @staticmethod
+    def from_config(config) -> 'VoiceActivityDetector':
+        engines = {'webrtc': WebRtcVAD, 'energy': EnergyVAD}
+        engine = engines.get(config.VAD_ENGINE)
+        if engine is None:
+            raise ValueError(f"Unknown VAD_ENGINE: {config.VAD_ENGINE!r} "
+                             f"(expected one of {sorted(engines)})")
+        common = dict(
+            sr=config.SAMPLE_RATE,
+            frame_duration_ms=config.FRAME_DURATION_MS,
+            hangover_ms=config.VAD_HANGOVER_MS,
+            min_speech_ms=config.VAD_MIN_SPEECH_MS
+        )
+        if engine is WebRtcVAD:
+            return WebRtcVAD(aggressiveness=config.VAD_AGGRESSIVENESS, **common)
+        return EnergyVAD(margin_db=config.VAD_ENERGY_MARGIN_DB,
+                         floor_dbfs=config.VAD_ENERGY_FLOOR_DBFS, **common)
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """int8 mask with one entry per whole frame of ``audio``"""
+        return self._decide([self._measure(self._frames(audio), self._new_state())])
+
+    def stream(self) -> 'VADStream':
+        """Incremental detector for audio that arrives in blocks"""
+        return VADStream(self)
+
+    def _new_state(self):
+        """Per-recording detector state carried across blocks"""
+        return None
+
+    @abc.abstractmethod
+    def _measure(self, frames: np.ndarray, state) -> np.ndarray:
+        """Per-frame measurements of a (frames, frame_length) block"""
+
+    def _classify(self, measurements: np.ndarray) -> np.ndarray:
+        """Speech decisions from the whole recording's measurements"""
+        return measurements
+
+    def _decide(self, measurements: List[np.ndarray]) -> np.ndarray:
+        mask = self._classify(np.concatenate(measurements))
+        return smooth_mask(mask, self.min_pause_frames, self.min_speech_frames)
+
+    def _frames(self, audio: np.ndarray) -> np.ndarray:
+        count = len(audio) // self.frame_length
+        return audio[:count * self.frame_length].reshape(count, self.frame_length)
+
+
+class VADStream:
+    """
+    Feeds blocks of any size to a detector. Samples left over after the last
+    whole frame are carried into the next block, and detector state is kept,
+    so ``finish()`` equals one call on the concatenated audio.
+    """
+
+    def __init__(self, vad: VoiceActivityDetector):
+        self.vad = vad
+        self.state = vad._new_state()
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.measurements = []
+
+    def push(self, block: np.ndarray):
+        if len(self.pending):
+            block = np.concatenate((self.pending, block))
+        whole = len(block) // self.vad.frame_length * self.vad.frame_length
+        if whole:
+            self.measurements.append(self.vad._measure(self.vad._frames(block[:whole]), self.state))
+        self.pending = block[whole:].copy()
+
+    def finish(self) -> np.ndarray:
+        """int8 mask over all whole frames pushed so far"""
+        if not self.measurements:
+            return np.zeros(0, dtype=np.int8)
+        return self.vad._decide(self.measurements)
+
+
+class WebRtcVAD(VoiceActivityDetector):
+    """WebRTC GMM detector (``aggressiveness`` 0-3, higher = fewer speech frames)"""
+
+    def __init__(self, sr: int = 16000, frame_duration_ms: int = 30, aggressiveness: int = 1,
+                 hangover_ms: float = 0, min_speech_ms: float = 0):
+        super().__init__(sr, frame_duration_ms, hangover_ms, min_speech_ms)
+        # Rejected up front, so per-frame calls cannot fail and shift the mask
+        if not webrtcvad.valid_rate_and_frame_length(sr, self.frame_length):
+            raise ValueError(f"webrtcvad cannot process {frame_duration_ms} ms frames "
+                             f"at {sr} Hz (10/20/30 ms at 8/16/32/48 kHz)")
+        self.aggressiveness = aggressiveness
+
+    def _new_state(self):
+        # The GMM adapts its noise model frame by frame
+        return webrtcvad.Vad(self.aggressiveness)
+
+    def _measure(self, frames: np.ndarray, state) -> np.ndarray:
+        pcm = memoryview(to_int16(frames).ravel()).cast('B')
+        step = self.frame_length * 2
+        count = len(frames)
+        return np.fromiter(
+            (state.is_speech(pcm[i * step:(i + 1) * step], self.sr) for i in range(count)),
+            dtype=np.int8, count=count
+        )
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """
+    Vectorised energy + zero-crossing-rate detector.
+
+    A frame is speech when its energy clears an adaptive threshold:
+    ``margin_db`` above the 10th-percentile frame energy (the noise floor).
+    The threshold is capped at the midpoint between that floor and the
+    90th percentile, so recordings with few pauses or little dynamic range
+    are not over-segmented, and it never drops below ``floor_dbfs``. Frames
+    within half the margin are also accepted when their ZCR marks them as
+    unvoiced fricatives, provided they are clearly above the noise floor.
+    """
+
+    def __init__(self, sr: int = 16000, frame_duration_ms: int = 30,
+                 margin_db: float = 6.0, floor_dbfs: float = -65.0,
+                 fricative_zcr: float = 0.3, hangover_ms: float = 0, min_speech_ms: float = 0):
+        super().__init__(sr, frame_duration_ms, hangover_ms, min_speech_ms)
+        self.margin_db = margin_db
+        self.floor_dbfs = floor_dbfs
+        self.fricative_zcr = fricative_zcr
+
+    def _measure(self, frames: np.ndarray, state) -> np.ndarray:
+        frames = frames.astype(np.float32, copy=False)
+        power = np.einsum('ij,ij->i', frames, frames) / self.frame_length
+        energy_db = 10 * np.log10(power + 1e-12)
+        zcr = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / self.frame_length
+        return np.stack((energy_db, zcr), axis=1)
+
+    def _classify(self, measurements: np.ndarray) -> np.ndarray:
+        if len(measurements) == 0:
+            return np.zeros(0, dtype=np.int8)
+        energy_db, zcr = measurements[:, 0], measurements[:, 1]
+        # Thresholds come from the whole recording, so blocks are only measured
+        noise_floor, loud = np.percentile(energy_db, [10, 90])
+        threshold = max(min(noise_floor + self.margin_db, (noise_floor + loud) / 2),
+                        self.floor_dbfs)
+        speech = energy_db > threshold
+        # Noise frames also have a high ZCR: fricatives must clear the floor too
+        fricative_threshold = max(threshold, noise_floor + self.margin_db) - self.margin_db / 2
+        fricative = (energy_db > fricative_threshold) & (zcr > self.fricative_zcr)
+        return (speech | fricative).astype(np.int8)
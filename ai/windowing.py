@@ -0,0 +1,112 @@
+"""
+Variable-length spectrogram inference helpers for the CNN-LSTM
+
+Long recordings are cut into overlapping fixed-size windows whose logits
+are averaged (weighted by the frames each window covers), so scoring cost
+grows with duration instead of stopping at the first window. Clips shorter
+than one window are kept at their natural length. Windows from one or many
+recordings are batched only with windows of the same width, because the
+model has no padding mask.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+def split_windows(mel: np.ndarray, window: int = 500, hop: int = 250,
+                  min_frames: int = 8) -> List[np.ndarray]:
+    """
+    Overlapping (n_mels, <=window) views of a (n_mels, T) spectrogram.
+
+    The last window is aligned to the end of the recording so every frame
+    is covered without padding. Clips shorter than ``window`` come back as
+    a single window, zero-padded only up to ``min_frames`` (the conv stack
+    needs at least 8 frames).
+    """
+    total = mel.shape[1]
+    if total <= window:
+        if total < min_frames:
+            mel = np.pad(mel, ((0, 0), (0, min_frames - total)), mode='constant')
+        return [mel]
+    return [mel[:, start:start + window] for start in window_starts(total, window, hop)]
+
+
+def window_starts(total: int, window: int = 500, hop: int = 250) -> List[int]:
+    """First frame of each window ``split_windows`` cuts from a ``total``-frame spectrogram"""
+    if total <= window:
+        return [0]
+    starts = list(range(0, total - window + 1, hop))
+    if starts[-1] != total - window:
+        starts.append(total - window)
+    return starts
+
+
+def bucket_batches(lengths: List[int], max_batch: int = 16) -> List[List[int]]:
+    """
+    Group item indices into batches of equal length, longest first.
+
+    The CNN-LSTM has no padding mask: zero columns would pass through the
+    BiLSTM and the attention softmax and change a window's logits. Only
+    windows of the same width are batched, so a window scores the same
+    alone or in any batch. Long recordings are all full-size windows; only
+    short clips form extra buckets.
+    """
+    buckets = {}
+    for i in sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True):
+        buckets.setdefault(lengths[i], []).append(i)
+    return [bucket[i:i + max_batch] for bucket in buckets.values()
+            for i in range(0, len(bucket), max_batch)]
+
+
+def pad_batch(windows: List[np.ndarray]) -> np.ndarray:
+    """
+    Stack (n_mels, t_i) windows into a (B, 1, n_mels, max t_i) float32 batch.
+    Narrower windows are zero-padded, which changes their logits: pass
+    windows of one width (``bucket_batches``) when scoring.
+    """
+    n_mels = windows[0].shape[0]
+    width = max(w.shape[1] for w in windows)
+    batch = np.zeros((len(windows), 1, n_mels, width), dtype=np.float32)
+    for i, w in enumerate(windows):
+        batch[i, 0, :, :w.shape[1]] = w
+    return batch
+
+
+def aggregate_logits(logits: np.ndarray, owners: np.ndarray, weights: np.ndarray,
+                     num_items: int) -> np.ndarray:
+    """Weighted mean of window logits per owning recording -> (num_items, num_classes)"""
+    totals = np.zeros((num_items, logits.shape[1]), dtype=np.float64)
+    norms = np.zeros(num_items, dtype=np.float64)
+    np.add.at(totals, owners, logits * weights[:, None])
+    np.add.at(norms, owners, weights)
+    return totals / np.maximum(norms, 1e-12)[:, None]
+
+
+def plan_windows(mels: List[np.ndarray], window: int = 500, hop: int = 250
+                 ) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """Windows for a list of recordings plus each window's owner index and frame weight"""
+    windows, owners, weights = [], [], []
+    for owner, mel in enumerate(mels):
+        for w in split_windows(mel, window, hop):
+            windows.append(w)
+            owners.append(owner)
+            weights.append(min(w.shape[1], mel.shape[1]))
+    return windows, np.asarray(owners, dtype=np.int64), np.asarray(weights, dtype=np.float64)
+
+
+def timeline_spans(num_samples: int, sr: int, window_seconds: float, hop_seconds: float,
+                   min_seconds: float = 0.0) -> List[Tuple[int, int]]:
+    """
+    (start, end) sample ranges of timeline windows over a recording.
+
+    Windows start every ``hop_seconds``. A trailing window shorter than
+    ``min_seconds`` is not started; its audio extends the previous window.
+    """
+    window, hop = int(round(window_seconds * sr)), max(1, int(round(hop_seconds * sr)))
+    min_length = int(round(min_seconds * sr))
+    starts = [0] + [s for s in range(hop, num_samples, hop) if num_samples - s >= min_length]
+    spans = [(start, min(start + window, num_samples)) for start in starts]
+    if spans[-1][1] < num_samples:
+        spans[-1] = (spans[-1][0], num_samples)
+    return spans
@@ -0,0 +1,182 @@
+"""
+Non-blocking structured logging for the backend
+
+Request handlers log through a bounded in-memory queue; a background
+listener thread formats records as JSON lines and writes them to a
+size-rotated file. When the queue is full (disk slower than the request
+rate) new records are dropped and counted instead of blocking the request.
+Secrets are redacted in the writer thread before anything reaches disk.
+
+Settings come from the environment:
+    CLARITAS_LOG_PATH       log file (default: debug_gemini.log)
+    CLARITAS_LOG_MAX_BYTES  rotate after this many bytes (default: 5 MB)
+    CLARITAS_LOG_BACKUPS    rotated files to keep (default: 3)
+    CLARITAS_LOG_QUEUE      max queued records (default: 10000)
+    CLARITAS_LOG_LEVEL      minimum level (default: INFO)
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Iterable, Optional
+
+from ai.telemetry import telemetry
+
+# Environment variables whose values must never be written out
+SECRET_ENV_VARS = ("GEMINI_API_KEY", "GOOGLE_API_KEY", "ADMIN_TOKEN")
+
+# Google API keys, bearer tokens and key=value style credentials
+SECRET_PATTERNS = (
+    re.compile(r"AIza[0-9A-Za-z_\-]{35}"),
+    re.compile(r"(?i)(bearer\s+)[0-9A-Za-z._\-]+"),
+    re.compile(r"(?i)((?:api[_-]?key|token|secret|password)\s*[=:]\s*)[^\s,;&\"']+"),
+)
+
+REDACTED = "[REDACTED]"
+
+_setup_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secret values and credential-looking substrings in a record"""
+
+    def __init__(self, secret_env_vars: Iterable[str] = SECRET_ENV_VARS,
+                 secrets: Iterable[str] = ()):
+        super().__init__()
+        # Env vars are read at filter time: .env files may load after setup
+        self.secret_env_vars = tuple(secret_env_vars)
+        self.secrets = tuple(secrets)
+
+    def redact(self, text: str) -> str:
+        secrets = self.secrets + tuple(os.getenv(v) or "" for v in self.secret_env_vars)
+        for secret in secrets:
+            # Very short values would mask unrelated text
+            if len(secret) >= 8:
+                text = text.replace(secret, REDACTED)
+        for pattern in SECRET_PATTERNS:
+            text = pattern.sub(
+                lambda m: (m.group(1) if m.groups() else "") + REDACTED, text
+            )
+        return text
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = self.redact(str(record.msg))
+        if record.exc_text:
+            record.exc_text = self.redact(record.exc_text)
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = {
+                k: self.redact(v) if isinstance(v, str) else v
+                for k, v in fields.items()
+            }
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped once the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            telemetry.increment("log_records_dropped")
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve args and tracebacks on the caller's thread (they may not be
+        # picklable or stable later) but leave the formatting to the writer
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, extra fields, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(log_path: Optional[str] = None, max_bytes: Optional[int] = None,
+                  backup_count: Optional[int] = None, queue_size: Optional[int] = None,
+                  level: Optional[str] = None) -> DroppingQueueHandler:
+    """
+    Route the ``claritas`` logger through the background writer (idempotent).
+    Arguments override the CLARITAS_LOG_* environment settings.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        log_path = log_path or os.getenv("CLARITAS_LOG_PATH", "debug_gemini.log")
+        max_bytes = max_bytes or int(os.getenv("CLARITAS_LOG_MAX_BYTES", 5 * 1024 * 1024))
+        backup_count = backup_count if backup_count is not None \
+            else int(os.getenv("CLARITAS_LOG_BACKUPS", 3))
+        queue_size = queue_size or int(os.getenv("CLARITAS_LOG_QUEUE", 10000))
+        level = (level or os.getenv("CLARITAS_LOG_LEVEL", "INFO")).upper()
+
+        file_handler = RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding="utf-8", delay=True
+        )
+        file_handler.setFormatter(JsonFormatter())
+        file_handler.addFilter(RedactingFilter())
+
+        log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        logger = logging.getLogger("claritas")
+        logger.setLevel(level)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+        return _queue_handler
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        if _queue_handler is not None:
+            logging.getLogger("claritas").removeHandler(_queue_handler)
+        _listener = _queue_handler = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Child of the ``claritas`` logger, set up on first use"""
+    setup_logging()
+    return logging.getLogger(f"claritas.{name}")
@@ -8,20 +8,26 @@ import os
 import shutil
 from pathlib import Path
 
-# Add parent directory to path to import from ../ai if needed
+# Add the repository root (the directory holding ai/) to the path to import from ../ai
 ROOT = Path(__file__).resolve()
-while ROOT.name != "claritasweb" and ROOT.parent != ROOT:
+while not (ROOT / "ai").is_dir() and ROOT.parent != ROOT:
     ROOT = ROOT.parent
 sys.path.insert(0, str(ROOT))
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import time
 import traceback
 
-from .utils import save_upload_to_temp, convert_audio_to_wav, detect_audio_format
+from ai.telemetry import telemetry
+
+from .utils import MultipartFileSink, UploadRejected, UploadSpool, convert_audio_to_wav
 from .services.gemini_service import GeminiService
+from .services.fake_gemini_service import FakeGeminiService
+from .profiling import RequestProfiler, admin_token_valid, profiling_enabled
 
 app = FastAPI(
     title="Claritas Backend API",
@@ -37,8 +43,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Gemini Service
-gemini_service = GeminiService()
+# Stage latency metrics, exported on /metrics (set CLARITAS_METRICS=0 to disable)
+if os.getenv("CLARITAS_METRICS", "1").lower() not in ("0", "false", "no"):
+    telemetry.enable()
+
+# Upload limits for /analyze-audio (0 disables a limit). Duration is checked
+# from WAV/FLAC headers as soon as the first bytes arrive.
+MAX_UPLOAD_BYTES = int(float(os.getenv("CLARITAS_MAX_UPLOAD_MB", 100)) * 1024 * 1024)
+MAX_AUDIO_SECONDS = float(os.getenv("CLARITAS_MAX_AUDIO_SECONDS", 3600))
+MULTIPART_OVERHEAD = 64 * 1024   # boundaries and part headers around the file
+
+# Initialize Gemini Service (CLARITAS_FAKE_GEMINI=1 swaps in the local stand-in)
+if os.getenv("CLARITAS_FAKE_GEMINI", "0").lower() in ("1", "true", "yes"):
+    gemini_service = FakeGeminiService.from_env()
+else:
+    gemini_service = GeminiService()
+
+# Opt-in request profiler; when disabled no middleware is installed at all
+profiler = RequestProfiler.from_env() if profiling_enabled() else None
+
+if profiler is not None:
+    @app.middleware("http")
+    async def profile_analysis_requests(request: Request, call_next):
+        """Sample stacks for a fraction of /analyze-audio calls (or when forced by an admin)"""
+        if request.url.path != "/analyze-audio":
+            return await call_next(request)
+        forced = request.headers.get("x-claritas-profile") == "1" and \
+            admin_token_valid(request.headers.get("x-admin-token"))
+        if not profiler.should_profile(forced):
+            return await call_next(request)
+        with profiler.profile(f"{request.method} {request.url.path}"):
+            return await call_next(request)
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    Refuse uploads whose Content-Length is already over the limit without
+    reading the body. Chunked bodies are counted in _spool_upload instead.
+    """
+    if request.url.path == "/analyze-audio" and MAX_UPLOAD_BYTES:
+        length = request.headers.get("content-length", "")
+        if length.isdigit() and int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+            telemetry.increment("uploads_rejected")
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large (limit {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB)"}
+            )
+    return await call_next(request)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin routes need the X-Admin-Token header to match ADMIN_TOKEN"""
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+def _require_profiler() -> RequestProfiler:
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling disabled (set CLARITAS_PROFILING=1)")
+    return profiler
+
 
 class AnalysisResult(BaseModel):
     """Response model returned by the audio analysis endpoint."""
@@ -65,63 +130,136 @@ async def root():
     }
 
 
-@app.post("/analyze-audio", response_model=AnalysisResult)
-async def analyze_audio(file: UploadFile = File(...)) -> AnalysisResult:
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(
+        telemetry.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Summaries of the stored request profiles, newest first"""
+    return _require_profiler().list()
+
+
+@app.get("/admin/profiles/collapsed", response_class=PlainTextResponse,
+         dependencies=[Depends(require_admin)])
+async def merged_profile():
+    """All stored profiles merged, as collapsed stacks for flamegraph tools"""
+    return PlainTextResponse(_require_profiler().collapsed())
+
+
+@app.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse,
+         dependencies=[Depends(require_admin)])
+async def get_profile(profile_id: int):
+    """One profile as collapsed stacks (``thread;file:func;... count``)"""
+    stacks = _require_profiler().collapsed(profile_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(stacks)
+
+
+# The body is parsed by hand (see _spool_upload), so describe the form for the docs
+AUDIO_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
+
+
+@app.post("/analyze-audio", response_model=AnalysisResult, openapi_extra=AUDIO_UPLOAD_BODY)
+async def analyze_audio(request: Request) -> AnalysisResult:
     """
-    Accept an audio recording and return cognitive health analysis.
+    Accept an audio recording (multipart field ``file``) and return cognitive health analysis.
     Uses Google Gemini API for multimodal analysis.
     """
     
-    # === Validation ===
-    if not file:
-        raise HTTPException(status_code=400, detail="No file uploaded")
+    started = time.perf_counter()
     
-    # === Read uploaded file ===
-    try:
-        content = await file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
-    
-    if not content or len(content) < 100:
-        raise HTTPException(status_code=400, detail="File too small")
-    
-    # === Save to temp file ===
-    detected_format = detect_audio_format(content)
-    print(f"📁 Processing file: {file.filename} ({len(content)} bytes, {detected_format})")
-    
-    temp_input_path = None
+    # === Parse the body as it arrives: hash, sniff and enforce limits chunk by chunk ===
+    spool = UploadSpool(max_bytes=MAX_UPLOAD_BYTES, max_seconds=MAX_AUDIO_SECONDS)
     
     try:
-        # Save original file
-        temp_input_path = save_upload_to_temp(content, suffix=detected_format)
+        filename, temp_input_path = await _spool_upload(request, spool)
+        print(f"📁 Processing file: {filename} ({spool.size} bytes, {spool.format})")
         
         # === Call Gemini API ===
         print("🚀 Sending to Gemini Service...")
         ai_result = gemini_service.analyze_audio(temp_input_path)
         
         # === Format Response ===
-        result = _format_gemini_response(ai_result, len(content))
+        result = _format_gemini_response(ai_result, spool.size, spool.sha256.hexdigest())
         
+        telemetry.observe("analyze_total", time.perf_counter() - started)
         print(f"✅ Analysis complete: {result.risk_band}")
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error: {e}")
         traceback.print_exc()
+        telemetry.increment("analysis_errors")
         raise HTTPException(
             status_code=500,
             detail=f"Analysis failed: {str(e)}"
         )
     finally:
         # === Cleanup ===
-        if temp_input_path and os.path.exists(temp_input_path):
-            try:
-                os.unlink(temp_input_path)
-            except:
-                pass
+        spool.discard()
+
+
+async def _spool_upload(request: Request, spool: UploadSpool) -> Tuple[str, str]:
+    """
+    Parse the multipart body from the ASGI stream into ``spool`` and return
+    (filename, temp file path). Nothing is buffered ahead of the parser, so
+    reading stops at the first chunk past a limit, with or without a
+    Content-Length header (400/413/422 on rejection).
+    """
+    try:
+        sink = MultipartFileSink(request.headers.get("content-type"), "file", spool)
+        received = 0
+        with telemetry.span("upload_read"):
+            async for chunk in request.stream():
+                received += len(chunk)
+                if MAX_UPLOAD_BYTES and received > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD:
+                    raise UploadRejected(413, f"File too large (limit {MAX_UPLOAD_BYTES / (1024 * 1024):g} MB)")
+                sink.write(chunk)
+            sink.finalize()
+    except UploadRejected as e:
+        telemetry.increment("uploads_rejected")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
+    
+    if not sink.found:
+        raise HTTPException(status_code=422, detail="No file uploaded (expected multipart field 'file')")
+    if spool.size == 0:
+        raise HTTPException(status_code=400, detail="File is empty")
+    if spool.size < 100:
+        raise HTTPException(status_code=400, detail="File too small")
+    
+    try:
+        return sink.filename, spool.close()
+    except UploadRejected as e:
+        telemetry.increment("uploads_rejected")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
 
-def _format_gemini_response(ai_result: Dict, file_size: int) -> AnalysisResult:
+def _format_gemini_response(ai_result: Dict, file_size: int,
+                            sha256: Optional[str] = None) -> AnalysisResult:
     """Map Gemini JSON to frontend API schema"""
     
     technical = ai_result.get("technical_details", {})
@@ -134,6 +272,7 @@ def _format_gemini_response(ai_result: Dict, file_size: int) -> AnalysisResult:
         
     # Add metadata
     technical["uploaded_bytes"] = file_size
+    technical["upload_sha256"] = sha256
     technical["model_provider"] = "Google Gemini 1.5 Flash"
     
     return AnalysisResult(
@@ -0,0 +1,177 @@
+"""
+Opt-in statistical profiler for /analyze-audio requests
+
+While a request is profiled, a sampler thread snapshots every thread's
+Python stack (``sys._current_frames``) every ``interval_ms`` and counts
+identical stacks. Idle threads (blocked in wait/select/queue get) are
+skipped. Stacks come from every thread of the process, not just the one
+serving the profiled request: work done for concurrent requests in the
+same window (other event-loop tasks, the threadpool) is mixed in, told
+apart only by the thread name at the root of each stack. Stacks are
+stored in the collapsed format (``thread;file:func;file:func count``)
+understood by flamegraph.pl, speedscope and inferno, and served from the
+admin routes in main.py.
+
+Nothing is installed unless CLARITAS_PROFILING=1, so requests pay nothing
+when the feature is off. When it is on, overhead is bounded in three ways:
+- only one request is profiled at a time
+- samples per profile are capped
+- only a fraction of requests is sampled
+
+Requests are picked by CLARITAS_PROFILE_SAMPLE_RATE, or forced with the
+``X-Claritas-Profile: 1`` header plus a valid ``X-Admin-Token``.
+
+Settings:
+    CLARITAS_PROFILING              1 to enable (default: off)
+    CLARITAS_PROFILE_SAMPLE_RATE    fraction of requests profiled (default: 0.0)
+    CLARITAS_PROFILE_INTERVAL_MS    sampling interval (default: 5)
+    CLARITAS_PROFILE_MAX_SAMPLES    samples per profile (default: 20000)
+    CLARITAS_PROFILE_KEEP           profiles kept in memory (default: 20)
+    ADMIN_TOKEN                     token for the admin routes and forced profiles
+"""
+
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# (file basename, function) of leaf frames that mean "this thread is idle"
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("socket.py", "accept"),
+}
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """Constant-time check against ADMIN_TOKEN; always False when it is unset"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+class _Sampler(threading.Thread):
+    """Counts collapsed stacks of all other non-idle threads, whatever request they serve"""
+
+    def __init__(self, interval: float, max_samples: int):
+        super().__init__(name="claritas-profiler", daemon=True)
+        self.interval = interval
+        self.max_samples = max_samples
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval) and self.samples < self.max_samples:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                self.stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _collapse(thread_name: str, frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    parts.append(thread_name.replace(";", "_"))
+    return ";".join(reversed(parts))
+
+
+class RequestProfiler:
+    """Samples stacks for selected requests and keeps the most recent profiles"""
+
+    def __init__(self, sample_rate: float = 0.0, interval_ms: float = 5.0,
+                 max_samples: int = 20000, keep: int = 20):
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000.0
+        self.max_samples = max_samples
+        self._profiles = deque(maxlen=keep)
+        self._busy = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_env(cls) -> "RequestProfiler":
+        return cls(
+            sample_rate=float(os.getenv("CLARITAS_PROFILE_SAMPLE_RATE", 0.0)),
+            interval_ms=float(os.getenv("CLARITAS_PROFILE_INTERVAL_MS", 5)),
+            max_samples=int(os.getenv("CLARITAS_PROFILE_MAX_SAMPLES", 20000)),
+            keep=int(os.getenv("CLARITAS_PROFILE_KEEP", 20))
+        )
+
+    def should_profile(self, forced: bool) -> bool:
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    @contextmanager
+    def profile(self, label: str):
+        """
+        Sample stacks for the duration of the block (skipped if another
+        profile is running). Every thread is sampled, so concurrent
+        requests show up in this profile too.
+        """
+        if not self._busy.acquire(blocking=False):
+            yield None
+            return
+        sampler = _Sampler(self.interval, self.max_samples)
+        started = time.time()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            yield sampler
+        finally:
+            sampler.stop()
+            self._busy.release()
+            self._profiles.append({
+                "id": next(self._ids),
+                "label": label,
+                "started": started,
+                "duration_s": time.perf_counter() - start,
+                "samples": sampler.samples,
+                "interval_ms": self.interval * 1000,
+                "stacks": dict(sampler.stacks)
+            })
+
+    def list(self) -> List[Dict]:
+        """Summaries of stored profiles, newest first"""
+        return [
+            {**{k: v for k, v in p.items() if k != "stacks"}, "unique_stacks": len(p["stacks"])}
+            for p in reversed(self._profiles)
+        ]
+
+    def collapsed(self, profile_id: Optional[int] = None) -> Optional[str]:
+        """Collapsed stacks of one profile, or all stored profiles merged"""
+        profiles = list(self._profiles)
+        if profile_id is not None:
+            profiles = [p for p in profiles if p["id"] == profile_id]
+            if not profiles:
+                return None
+        merged: Counter = Counter()
+        for p in profiles:
+            merged.update(p["stacks"])
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("CLARITAS_PROFILING", "0").lower() in ("1", "true", "yes")
@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Gemini API, for load tests and offline development
+
+FakeGeminiService replaces only the two network calls of GeminiService
+(file upload and generate_content). Logging, response parsing, telemetry
+and the fallback path all run unchanged. Latency is simulated with a
+blocking sleep, as the real SDK calls block. Errors and quota exhaustion
+(HTTP 429 ``ResourceExhausted``) are injected at configurable rates.
+
+Enable it in the app with CLARITAS_FAKE_GEMINI=1. Tune it with:
+    CLARITAS_FAKE_GEMINI_UPLOAD_MS     mean upload latency (default: 300)
+    CLARITAS_FAKE_GEMINI_INFERENCE_MS  mean inference latency (default: 2500)
+    CLARITAS_FAKE_GEMINI_JITTER        relative std-dev of latencies (default: 0.2)
+    CLARITAS_FAKE_GEMINI_ERROR_RATE    probability of a generic API error (default: 0)
+    CLARITAS_FAKE_GEMINI_QUOTA_RATE    probability of a 429 quota error (default: 0)
+    CLARITAS_FAKE_GEMINI_SEED          RNG seed for reproducible runs
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from google.api_core import exceptions
+
+from .gemini_service import GeminiService
+
+
+@dataclass
+class _FakeFile:
+    uri: str
+
+
+@dataclass
+class _FakeResponse:
+    text: str
+
+
+class FakeGeminiService(GeminiService):
+    """GeminiService with simulated upload/inference latency and injected failures"""
+
+    def __init__(self, upload_ms: float = 300.0, inference_ms: float = 2500.0,
+                 jitter: float = 0.2, error_rate: float = 0.0, quota_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        super().__init__()
+        self.model_name = "fake-gemini"
+        self.upload_ms = upload_ms
+        self.inference_ms = inference_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        print(f"🧪 Using FakeGeminiService (upload {upload_ms:.0f} ms, inference "
+              f"{inference_ms:.0f} ms, error {error_rate:.0%}, quota {quota_rate:.0%})")
+
+    @classmethod
+    def from_env(cls) -> "FakeGeminiService":
+        seed = os.getenv("CLARITAS_FAKE_GEMINI_SEED")
+        return cls(
+            upload_ms=float(os.getenv("CLARITAS_FAKE_GEMINI_UPLOAD_MS", 300)),
+            inference_ms=float(os.getenv("CLARITAS_FAKE_GEMINI_INFERENCE_MS", 2500)),
+            jitter=float(os.getenv("CLARITAS_FAKE_GEMINI_JITTER", 0.2)),
+            error_rate=float(os.getenv("CLARITAS_FAKE_GEMINI_ERROR_RATE", 0)),
+            quota_rate=float(os.getenv("CLARITAS_FAKE_GEMINI_QUOTA_RATE", 0)),
+            seed=int(seed) if seed is not None else None
+        )
+
+    def _has_api_key(self) -> bool:
+        return True
+
+    def _upload_file(self, audio_path: str):
+        self._sleep(self.upload_ms)
+        return _FakeFile(uri=f"fake://files/{os.path.basename(audio_path)}")
+
+    def _generate(self, prompt: str, audio_file):
+        self._sleep(self.inference_ms)
+        with self._rng_lock:
+            roll = self._rng.random()
+            scores = [self._rng.uniform(20, 95) for _ in range(3)]
+            ratios = [self._rng.random() for _ in range(5)]
+            counts = [self._rng.randint(0, 12) for _ in range(3)]
+
+        if roll < self.quota_rate:
+            raise exceptions.ResourceExhausted("429 Quota exceeded (injected by FakeGeminiService)")
+        if roll < self.quota_rate + self.error_rate:
+            raise exceptions.InternalServerError("500 Internal error (injected by FakeGeminiService)")
+
+        fluency, lexical, coherence = scores
+        mean = (fluency + lexical + coherence) / 3
+        result = {
+            "speech_fluency_score": round(fluency, 1),
+            "lexical_coherence_score": round(lexical, 1),
+            "risk_band": "Baik" if mean >= 70 else "Sedang" if mean >= 45 else "Buruk",
+            "summary": "Ringkasan sintetis dari FakeGeminiService untuk pengujian beban.",
+            "technical_details": {
+                "acoustic_features": {
+                    "pause_ratio": round(ratios[0] * 0.5, 3),
+                    "mean_pause_duration": round(0.3 + ratios[1] * 1.5, 2),
+                    "speech_rate": round(90 + ratios[2] * 90, 1),
+                    "voice_ratio": round(1 - ratios[0] * 0.5, 3),
+                    "short_pauses_count": counts[0],
+                    "long_pauses_count": counts[1]
+                },
+                "lexical_features": {
+                    "ttr": round(0.3 + ratios[3] * 0.5, 3),
+                    "lexical_density": round(0.3 + ratios[4] * 0.4, 3),
+                    "deictic_ratio": round(ratios[4] * 0.2, 3),
+                    "total_repetitions": counts[2],
+                    "speech_rate": round(90 + ratios[2] * 90, 1)
+                },
+                "coherence_score": round(coherence, 1)
+            }
+        }
+        # Same markdown fence the real model sometimes adds
+        return _FakeResponse(text="```json\n" + json.dumps(result) + "\n```")
+
+    def _sleep(self, mean_ms: float):
+        if mean_ms <= 0:
+            return
+        with self._rng_lock:
+            delay = self._rng.gauss(mean_ms, mean_ms * self.jitter)
+        time.sleep(max(0.0, delay) / 1000.0)
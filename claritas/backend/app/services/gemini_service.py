@@ -5,6 +5,12 @@ import google.generativeai as genai
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
+from ai.telemetry import telemetry
+
+from ..logging_utils import get_logger
+
+logger = get_logger("gemini")
+
 # Load environment variables
 load_dotenv()
 
@@ -25,17 +31,15 @@ class GeminiService:
         Uploads audio to Gemini and requests cognitive health analysis.
         Returns a structured dictionary with scores and details.
         """
-        # Logging to file for debugging
-        with open("debug_gemini.log", "a", encoding="utf-8") as f:
-            f.write(f"\n--- New Request ---\n")
-            f.write(f"Model: {self.model_name}\n")
-            f.write(f"API Key present: {bool(api_key)}\n")
-            if api_key:
-                f.write(f"API Key start: {api_key[:5]}...\n")
-            f.write(f"Audio Path: {audio_path}\n")
-
-        if not api_key:
-            with open("debug_gemini.log", "a") as f: f.write("❌ ERROR: API Key missing\n")
+        # Debug log (queued; written by a background thread)
+        logger.info("New request", extra={"fields": {
+            "model": self.model_name,
+            "api_key_present": self._has_api_key(),
+            "audio_path": audio_path
+        }})
+
+        if not self._has_api_key():
+            logger.error("API key missing")
             raise ValueError("GEMINI_API_KEY not found in .env")
 
         try:
@@ -45,14 +49,16 @@ class GeminiService:
             print(f"⏱️  [{time.strftime('%H:%M:%S')}] Starting Gemini Analysis ({self.model_name})...")
             print(f"📤 Uploading file to Gemini: {audio_path}")
             
-            upload_start = time.time()
-            audio_file = genai.upload_file(path=audio_path)
-            upload_duration = time.time() - upload_start
+            upload_start = time.perf_counter()
+            with telemetry.span("gemini_upload"):
+                audio_file = self._upload_file(audio_path)
+            upload_duration = time.perf_counter() - upload_start
             print(f"✅ Upload Complete ({upload_duration:.2f}s)")
             
-            with open("debug_gemini.log", "a") as f: 
-                f.write(f"Upload success in {upload_duration:.2f}s\n")
-                f.write(f"File URI: {audio_file.uri}\n")
+            logger.info("Upload success", extra={"fields": {
+                "upload_s": round(upload_duration, 3),
+                "file_uri": audio_file.uri
+            }})
             
             print("🤖 Sending prompt to Gemini (Inference)...")
             inference_start = time.time()
@@ -94,7 +100,8 @@ class GeminiService:
             IMPORTANT: Provide REALISTIC estimates for the technical metrics based on the audio evidence.
             """
 
-            response = self.model.generate_content([prompt, audio_file])
+            with telemetry.span("gemini_inference"):
+                response = self._generate(prompt, audio_file)
             
             # Clean response text (sometimes Gemini adds ```json block)
             text = response.text.strip()
@@ -106,20 +113,29 @@ class GeminiService:
             result = json.loads(text.strip())
             print("✅ Gemini Analysis Complete")
             
-            with open("debug_gemini.log", "a") as f: f.write("✅ Analysis Success\n")
+            logger.info("Analysis success")
             return result
             
         except Exception as e:
             error_msg = str(e)
             print(f"❌ Gemini Error: {error_msg}")
-            with open("debug_gemini.log", "a", encoding="utf-8") as f: 
-                f.write(f"❌ EXCEPTION: {error_msg}\n")
-                import traceback
-                traceback.print_exc(file=f)
-                
+            logger.exception("Gemini analysis failed", extra={"fields": {"error": error_msg}})
+            
+            telemetry.increment("gemini_fallbacks")
             # Fallback mock data if API fails (prevent crash)
             return self._get_fallback_data(error_msg)
 
+    def _has_api_key(self) -> bool:
+        return bool(api_key)
+
+    def _upload_file(self, audio_path: str):
+        """Upload to the Gemini Files API; returns the file handle"""
+        return genai.upload_file(path=audio_path)
+
+    def _generate(self, prompt: str, audio_file):
+        """Run the multimodal prompt; returns a response with ``.text``"""
+        return self.model.generate_content([prompt, audio_file])
+
     def _get_fallback_data(self, error_msg=""):
         """Returns mock data structure in case of API failure"""
         return {
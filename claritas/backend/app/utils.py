@@ -2,13 +2,17 @@
 Utility functions for audio file handling and conversion
 """
 
+import hashlib
 import os
 import subprocess
 import tempfile
 import imageio_ffmpeg
 from pathlib import Path
+from python_multipart.multipart import MultipartParser, parse_options_header
 from typing import Optional
 
+from ai.telemetry import telemetry
+
 
 def save_upload_to_temp(file_bytes: bytes, suffix: str = ".wav") -> str:
     """
@@ -57,13 +61,14 @@ def convert_audio_to_wav(input_path: str, output_path: Optional[str] = None) ->
         output_path
     ]
 
-    proc = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        timeout=30
-    )
+    with telemetry.span("transcode"):
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=30
+        )
 
     if proc.returncode != 0:
         raise RuntimeError(f"ffmpeg conversion failed: {proc.stderr[:800]}")
@@ -112,3 +117,177 @@ def detect_audio_format(file_bytes: bytes) -> str:
         return ".flac"
     
     return ".unknown"
+
+
+def header_duration(header: bytes, audio_format: str) -> Optional[float]:
+    """
+    Duration in seconds declared in a WAV (fmt + data chunks) or FLAC
+    (STREAMINFO) header, or None when the format does not declare it or the
+    header is incomplete (e.g. streamed WAVs with a placeholder data size).
+    """
+    if audio_format == ".wav":
+        byte_rate = None
+        offset = 12
+        while offset + 8 <= len(header):
+            chunk_id = header[offset:offset + 4]
+            size = int.from_bytes(header[offset + 4:offset + 8], "little")
+            if chunk_id == b"fmt " and offset + 20 <= len(header):
+                byte_rate = int.from_bytes(header[offset + 16:offset + 20], "little")
+            elif chunk_id == b"data":
+                if not byte_rate or size in (0, 0xFFFFFFFF):
+                    return None
+                return size / byte_rate
+            offset += 8 + size + (size & 1)
+        return None
+    
+    if audio_format == ".flac" and len(header) >= 26:
+        # STREAMINFO: 20-bit sample rate ... 36-bit total samples, from byte 18
+        bits = int.from_bytes(header[18:26], "big")
+        sample_rate = bits >> 44
+        total_samples = bits & ((1 << 36) - 1)
+        if sample_rate and total_samples:
+            return total_samples / sample_rate
+    return None
+
+
+class UploadRejected(Exception):
+    """An upload refused while it was being read, with the HTTP status to return"""
+    
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class UploadSpool:
+    """
+    Incremental sink for an upload read in chunks.
+    
+    Every chunk is hashed (SHA-256) and counted against ``max_bytes``. The
+    first HEADER_BYTES are held in memory: once they are in, the format is
+    sniffed with detect_audio_format and the declared duration is checked
+    against ``max_seconds``. Only then is a temp file opened, so rejected,
+    empty and undersized uploads never touch the disk. A limit of 0
+    disables the check.
+    """
+    
+    HEADER_BYTES = 4096
+    
+    def __init__(self, max_bytes: int = 0, max_seconds: float = 0):
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.format = None
+        self.duration = None
+        self.path = None
+        self._header = bytearray()
+        self._file = None
+    
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise UploadRejected(
+                413, f"File too large (limit {self.max_bytes / (1024 * 1024):g} MB)"
+            )
+        self.sha256.update(chunk)
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        self._header += chunk
+        if len(self._header) >= self.HEADER_BYTES:
+            self._spool()
+    
+    def close(self) -> str:
+        """Flush everything to the temp file and return its path (see discard)"""
+        if self._file is None:
+            self._spool()
+        self._file.close()
+        return self.path
+    
+    def discard(self):
+        """Close and delete the temp file, if one was opened"""
+        if self._file is not None:
+            self._file.close()
+        if self.path and os.path.exists(self.path):
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+    
+    def _spool(self):
+        header = bytes(self._header)
+        self.format = detect_audio_format(header)
+        self.duration = header_duration(header, self.format)
+        if self.max_seconds and self.duration is not None and self.duration > self.max_seconds:
+            raise UploadRejected(
+                413, f"Recording too long ({self.duration:.0f} s, limit {self.max_seconds:g} s)"
+            )
+        self._file = tempfile.NamedTemporaryFile(delete=False, suffix=self.format)
+        self.path = self._file.name
+        self._file.write(header)
+        self._header = None
+
+
+class MultipartFileSink:
+    """
+    Incremental multipart/form-data parser that feeds the bytes of one file
+    field into an UploadSpool as the request body arrives. Other fields are
+    skipped, and only the first part named ``field`` is kept.
+    """
+    
+    def __init__(self, content_type: str, field: str, spool: UploadSpool):
+        kind, params = parse_options_header(content_type or "")
+        boundary = params.get(b"boundary")
+        if kind != b"multipart/form-data" or not boundary:
+            raise UploadRejected(422, f"Expected a multipart/form-data body with a '{field}' file")
+        self.field = field.encode()
+        self.spool = spool
+        self.found = False
+        self.filename = None
+        self._in_file = False
+        self._header_field = b""
+        self._header_value = b""
+        self._headers = {}
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+    
+    def write(self, chunk: bytes):
+        self._parser.write(chunk)
+    
+    def finalize(self):
+        self._parser.finalize()
+    
+    def _on_part_begin(self):
+        self._headers = {}
+    
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+    
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+    
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = self._header_value = b""
+    
+    def _on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if params.get(b"name") == self.field and b"filename" in params and not self.found:
+            self.found = True
+            self._in_file = True
+            self.filename = params[b"filename"].decode("utf-8", "replace")
+    
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self.spool.write(data[start:end])
+    
+    def _on_part_end(self):
+        self._in_file = False
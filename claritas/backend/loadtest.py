@@ -0,0 +1,186 @@
+"""
+Load generator for the /analyze-audio endpoint
+
+Drives concurrent multipart uploads of generated WAV and/or WebM clips and
+reports throughput, latency percentiles, status codes and Gemini fallbacks.
+Pair it with the local Gemini stand-in to size workers offline:
+
+    CLARITAS_FAKE_GEMINI=1 uvicorn app.main:app --workers 2
+    python loadtest.py --concurrency 16 --requests 200 --format mixed
+
+Options are listed with ``python loadtest.py --help``.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+SAMPLE_RATE = 16000
+
+
+def make_wav(seconds: float, seed: int = 0) -> bytes:
+    """16 kHz mono PCM16 clip: voiced tone bursts separated by silence"""
+    rng = random.Random(seed)
+    samples = []
+    t = 0.0
+    while t < seconds:
+        burst = rng.uniform(0.3, 1.5)
+        f0 = rng.uniform(100, 220)
+        for i in range(int(burst * SAMPLE_RATE)):
+            x = i / SAMPLE_RATE
+            envelope = math.sin(math.pi * x / burst)
+            samples.append(0.3 * envelope * sum(math.sin(2 * math.pi * k * f0 * x) / k for k in (1, 2, 3)))
+        pause = rng.uniform(0.2, 1.0)
+        samples.extend([0.0] * int(pause * SAMPLE_RATE))
+        t += burst + pause
+
+    pcm = struct.pack(f"<{len(samples)}h", *(int(max(-1.0, min(1.0, s)) * 32767) for s in samples))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def make_webm(wav_bytes: bytes) -> bytes:
+    """Opus/WebM encoding of a WAV clip (what browsers' MediaRecorder uploads)"""
+    import imageio_ffmpeg
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "in.wav"), os.path.join(tmp, "out.webm")
+        with open(src, "wb") as f:
+            f.write(wav_bytes)
+        proc = subprocess.run(
+            [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-i", src, "-c:a", "libopus", dst],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg WebM encode failed: {proc.stderr[-400:]!r}")
+        with open(dst, "rb") as f:
+            return f.read()
+
+
+def build_payloads(fmt: str, seconds: float) -> List[Tuple[str, bytes, str]]:
+    """(filename, bytes, content type) uploads for the requested format mix"""
+    wav = make_wav(seconds)
+    payloads = []
+    if fmt in ("wav", "mixed"):
+        payloads.append(("loadtest.wav", wav, "audio/wav"))
+    if fmt in ("webm", "mixed"):
+        payloads.append(("loadtest.webm", make_webm(wav), "audio/webm"))
+    return payloads
+
+
+async def run(url: str, payloads: List[Tuple[str, bytes, str]], concurrency: int,
+              total: Optional[int], duration: Optional[float], timeout: float) -> Dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    fallbacks = 0
+    issued = 0
+    stop_at = time.perf_counter() + duration if duration else None
+
+    def next_request() -> Optional[int]:
+        nonlocal issued
+        if total is not None and issued >= total:
+            return None
+        if stop_at is not None and time.perf_counter() >= stop_at:
+            return None
+        issued += 1
+        return issued
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal fallbacks
+        while (n := next_request()) is not None:
+            name, body, content_type = payloads[n % len(payloads)]
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, files={"file": (name, body, content_type)})
+                statuses[response.status_code] += 1
+                if response.status_code == 200 and \
+                        response.json().get("summary", "").startswith("Gagal"):
+                    fallbacks += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    completed = len(ordered)
+    failures = sum(errors.values()) + sum(c for s, c in statuses.items() if s >= 400)
+
+    def percentile(p: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return ordered[min(completed - 1, int(math.ceil(p / 100 * completed)) - 1)] * 1000
+
+    return {
+        "requests": completed,
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "rps": completed / wall if wall else 0.0,
+        "latency_ms": {p: percentile(float(p)) for p in ("50", "90", "95", "99")},
+        "latency_max_ms": ordered[-1] * 1000 if ordered else None,
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+        "transport_errors": dict(errors),
+        "error_rate": failures / completed if completed else 0.0,
+        "gemini_fallbacks": fallbacks
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000/analyze-audio")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=None, help="total requests (default 100)")
+    parser.add_argument("--duration", type=float, default=None, help="run for N seconds instead")
+    parser.add_argument("--format", choices=("wav", "webm", "mixed"), default="wav")
+    parser.add_argument("--audio-seconds", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", dest="json_out", default=None, help="also write results here")
+    args = parser.parse_args()
+
+    total = args.requests if args.requests or args.duration else 100
+    print(f"🎙️  Preparing {args.format} payloads ({args.audio_seconds:g}s audio)...")
+    payloads = build_payloads(args.format, args.audio_seconds)
+    print(f"🚀 {args.concurrency} concurrent clients -> {args.url}")
+
+    result = asyncio.run(run(args.url, payloads, args.concurrency, total, args.duration, args.timeout))
+
+    lat = result["latency_ms"]
+    fmt = lambda v: f"{v:.0f}" if v is not None else "n/a"
+    print(f"\nRequests:   {result['requests']} in {result['wall_s']:.1f}s ({result['rps']:.2f} req/s)")
+    print(f"Latency ms: p50 {fmt(lat['50'])}  p90 {fmt(lat['90'])}  p95 {fmt(lat['95'])}  "
+          f"p99 {fmt(lat['99'])}  max {fmt(result['latency_max_ms'])}")
+    print(f"Status:     {result['status_codes']}  transport errors: {result['transport_errors'] or 0}")
+    print(f"Error rate: {result['error_rate']:.1%}  Gemini fallbacks: {result['gemini_fallbacks']}")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["error_rate"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,18 @@
 """Test configuration and fixtures for backend tests."""
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
+
+# Tests never call the real Gemini API: use the local stand-in, no latency
+os.environ.setdefault("CLARITAS_FAKE_GEMINI", "1")
+os.environ.setdefault("CLARITAS_FAKE_GEMINI_UPLOAD_MS", "0")
+os.environ.setdefault("CLARITAS_FAKE_GEMINI_INFERENCE_MS", "0")
+# Keep test runs out of the tracked debug_gemini.log
+os.environ.setdefault("CLARITAS_LOG_PATH", os.path.join(tempfile.mkdtemp(prefix="claritas-tests-"), "gemini.log"))
+
+from app.main import app  # noqa: E402
 
 
 @pytest.fixture
@@ -0,0 +1,36 @@
+"""Tests for the queue-backed backend logger."""
+import logging
+import queue
+
+from app.logging_utils import DroppingQueueHandler, RedactingFilter
+
+
+def test_redacting_filter_masks_secrets(monkeypatch):
+    """Secret env values and credential patterns never reach the record."""
+    monkeypatch.setenv("GEMINI_API_KEY", "not-a-real-key-123")
+    record = logging.makeLogRecord({
+        "msg": "key=not-a-real-key-123 google=AIza" + "x" * 35,
+        "fields": {"auth": "Bearer abc.def"},
+    })
+
+    RedactingFilter().filter(record)
+
+    assert "not-a-real-key-123" not in record.msg
+    assert "AIza" not in record.msg
+    assert record.fields["auth"] == "Bearer [REDACTED]"
+
+
+def test_queue_handler_drops_when_full():
+    """A full queue drops records instead of blocking the caller."""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("claritas.test_drop")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        for i in range(3):
+            logger.warning("record %d", i)
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 2
@@ -47,3 +47,126 @@ def test_analyze_audio_empty_file(client):
     # Should return 400 Bad Request for empty file
     assert response.status_code == 400
     assert "empty" in response.json()["detail"].lower()
+
+
+def test_metrics_endpoint(client):
+    """Test that /metrics exposes stage histograms in Prometheus text format."""
+    from ai.telemetry import telemetry
+
+    with telemetry.span("test_stage"):
+        pass
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE claritas_stage_duration_seconds histogram" in body
+    assert 'claritas_stage_duration_seconds_count{stage="test_stage"} 1' in body
+    assert 'le="+Inf"' in body
+
+
+def _wav_header(seconds, sample_rate=16000, data_bytes=4096):
+    """PCM16 mono WAV header declaring ``seconds`` of audio, followed by ``data_bytes`` of silence."""
+    byte_rate = sample_rate * 2
+    declared = int(seconds * byte_rate)
+    fmt = (b"fmt " + (16).to_bytes(4, "little") + (1).to_bytes(2, "little")
+           + (1).to_bytes(2, "little") + sample_rate.to_bytes(4, "little")
+           + byte_rate.to_bytes(4, "little") + (2).to_bytes(2, "little")
+           + (16).to_bytes(2, "little"))
+    return (b"RIFF" + (36 + declared).to_bytes(4, "little") + b"WAVE" + fmt
+            + b"data" + declared.to_bytes(4, "little") + b"\x00" * data_bytes)
+
+
+def test_analyze_audio_reports_upload_hash(client):
+    """The upload is hashed while it streams in."""
+    import hashlib
+
+    audio = _wav_header(2.0)
+    files = {"file": ("clip.wav", io.BytesIO(audio), "audio/wav")}
+
+    response = client.post("/analyze-audio", files=files)
+
+    assert response.status_code == 200
+    technical = response.json()["technical"]
+    assert technical["uploaded_bytes"] == len(audio)
+    assert technical["upload_sha256"] == hashlib.sha256(audio).hexdigest()
+
+
+def test_analyze_audio_rejects_large_file(client, monkeypatch):
+    """Uploads over CLARITAS_MAX_UPLOAD_MB are refused with 413."""
+    import app.main as main
+
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 1024)
+    files = {"file": ("big.wav", io.BytesIO(b"RIFF" + b"\x00" * 4096), "audio/wav")}
+
+    response = client.post("/analyze-audio", files=files)
+
+    assert response.status_code == 413
+    assert "too large" in response.json()["detail"].lower()
+
+
+def test_analyze_audio_rejects_large_content_length(client, monkeypatch):
+    """An oversized Content-Length is refused before the body is parsed."""
+    import app.main as main
+
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 1024)
+    files = {"file": ("big.wav", io.BytesIO(b"\x00" * (main.MULTIPART_OVERHEAD + 4096)), "audio/wav")}
+
+    response = client.post("/analyze-audio", files=files)
+
+    assert response.status_code == 413
+
+
+def test_analyze_audio_rejects_long_recording(client, monkeypatch):
+    """A WAV header declaring more than CLARITAS_MAX_AUDIO_SECONDS is refused."""
+    import app.main as main
+
+    monkeypatch.setattr(main, "MAX_AUDIO_SECONDS", 60)
+    files = {"file": ("long.wav", io.BytesIO(_wav_header(120.0)), "audio/wav")}
+
+    response = client.post("/analyze-audio", files=files)
+
+    assert response.status_code == 413
+    assert "too long" in response.json()["detail"].lower()
+
+
+def test_analyze_audio_stops_reading_chunked_upload_at_limit(monkeypatch):
+    """A chunked upload without Content-Length stops being read once it passes the limit."""
+    import asyncio
+    import app.main as main
+
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 4096)
+    boundary = "claritas-test-boundary"
+    chunks = [(f"--{boundary}\r\n"
+               'Content-Disposition: form-data; name="file"; filename="big.wav"\r\n'
+               "Content-Type: audio/wav\r\n\r\nRIFF").encode()]
+    chunks += [b"\x00" * 1024] * 64 + [f"\r\n--{boundary}--\r\n".encode()]
+    received, sent = [], []
+
+    async def receive():
+        # Like a server reading a socket: yield to other tasks, and stop
+        # reading the body once the response is complete
+        await asyncio.sleep(0)
+        response_complete = any(m["type"] == "http.response.body" and not m.get("more_body")
+                                for m in sent)
+        if len(received) < len(chunks) and not response_complete:
+            received.append(chunks[len(received)])
+            return {"type": "http.request", "body": received[-1],
+                    "more_body": len(received) < len(chunks)}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/analyze-audio", "raw_path": b"/analyze-audio",
+        "query_string": b"", "root_path": "", "client": ("test", 1), "server": ("test", 80),
+        "headers": [(b"host", b"test"), (b"transfer-encoding", b"chunked"),
+                    (b"content-type", f"multipart/form-data; boundary={boundary}".encode())],
+    }
+    asyncio.run(main.app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert len(received) < len(chunks) // 2
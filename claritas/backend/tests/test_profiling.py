@@ -0,0 +1,103 @@
+"""Tests for the opt-in request profiler and its admin routes."""
+import importlib
+import io
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.profiling import RequestProfiler
+
+
+@pytest.fixture
+def profiled(monkeypatch):
+    """app.main rebuilt with CLARITAS_PROFILING=1; rebuilt again without it afterwards."""
+    import app.main as main
+
+    monkeypatch.setenv("CLARITAS_PROFILING", "1")
+    monkeypatch.setenv("CLARITAS_PROFILE_INTERVAL_MS", "1")
+    monkeypatch.setenv("ADMIN_TOKEN", "test-admin-token")
+    importlib.reload(main)
+    yield main
+    monkeypatch.undo()
+    importlib.reload(main)
+
+
+def _busy_work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+def test_profiler_collects_collapsed_stacks():
+    """Profiled blocks produce flamegraph-style collapsed stacks."""
+    profiler = RequestProfiler(interval_ms=1)
+
+    with profiler.profile("test") as sampler:
+        assert sampler is not None
+        _busy_work(0.2)
+
+    summary = profiler.list()[0]
+    assert summary["label"] == "test"
+    assert summary["samples"] > 0
+
+    stacks = profiler.collapsed(summary["id"])
+    assert "test_profiling.py:_busy_work" in stacks
+    stack, count = stacks.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def _profiling_middleware(app):
+    return [m for m in app.user_middleware
+            if getattr(m.kwargs.get("dispatch"), "__name__", "") == "profile_analysis_requests"]
+
+
+def test_profiling_disabled_installs_no_middleware():
+    """With CLARITAS_PROFILING unset, requests do not go through the profiler at all."""
+    import app.main as main
+
+    assert main.profiler is None
+    assert _profiling_middleware(main.app) == []
+
+
+def test_admin_profiles_require_token(profiled):
+    """Admin routes reject requests without the admin token."""
+    client = TestClient(profiled.app)
+
+    assert len(_profiling_middleware(profiled.app)) == 1
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = client.get("/admin/profiles", headers={"X-Admin-Token": "test-admin-token"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_forced_profile_records_analysis_request(profiled, monkeypatch):
+    """X-Claritas-Profile: 1 with the admin token profiles an /analyze-audio call."""
+    client = TestClient(profiled.app)
+    monkeypatch.setattr(profiled.gemini_service, "inference_ms", 100)
+    monkeypatch.setattr(profiled.gemini_service, "jitter", 0)
+    admin = {"X-Admin-Token": "test-admin-token"}
+    files = {"file": ("test_audio.wav", io.BytesIO(b"RIFF" + b"\x00" * 100), "audio/wav")}
+
+    response = client.post("/analyze-audio", files=files, headers={**admin, "X-Claritas-Profile": "1"})
+    assert response.status_code == 200
+
+    profiles = client.get("/admin/profiles", headers=admin).json()
+    assert len(profiles) == 1
+    assert profiles[0]["label"] == "POST /analyze-audio"
+    assert profiles[0]["samples"] > 0
+
+    stacks = client.get(f"/admin/profiles/{profiles[0]['id']}", headers=admin)
+    assert stacks.status_code == 200
+    assert "main.py:analyze_audio" in stacks.text
+    assert "fake_gemini_service.py:_sleep" in stacks.text
+
+
+def test_unforced_request_is_not_profiled(profiled):
+    """Without the header (and a zero sample rate) nothing is recorded."""
+    client = TestClient(profiled.app)
+    files = {"file": ("test_audio.wav", io.BytesIO(b"RIFF" + b"\x00" * 100), "audio/wav")}
+
+    assert client.post("/analyze-audio", files=files).status_code == 200
+    assert profiled.profiler.list() == []
@@ -0,0 +1,75 @@
+"""Tests for upload spooling and audio header helpers."""
+import hashlib
+import os
+
+import pytest
+
+from app.utils import MultipartFileSink, UploadRejected, UploadSpool, header_duration
+
+
+def _flac_header(sample_rate, total_samples):
+    """fLaC marker plus a STREAMINFO block with the given rate and length."""
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = b"\x00" * 10 + packed.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + b"\x80" + len(streaminfo).to_bytes(3, "big") + streaminfo
+
+
+def test_header_duration_reads_flac_streaminfo():
+    """FLAC duration comes from STREAMINFO total samples / sample rate."""
+    assert header_duration(_flac_header(44100, 441000), ".flac") == pytest.approx(10.0)
+    assert header_duration(_flac_header(44100, 0), ".flac") is None
+    assert header_duration(b"ID3" + b"\x00" * 100, ".mp3") is None
+
+
+def test_upload_spool_writes_only_after_header():
+    """Small chunks stay in memory until the header is checked, then go to disk intact."""
+    data = b"RIFF" + b"\x00" * 4 + b"WAVE" + os.urandom(10000)
+    spool = UploadSpool(max_bytes=len(data))
+    try:
+        for start in range(0, len(data), 1000):
+            spool.write(data[start:start + 1000])
+            assert (spool.path is None) == (spool.size < UploadSpool.HEADER_BYTES)
+
+        path = spool.close()
+        assert spool.format == ".wav" and path.endswith(".wav")
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert spool.sha256.hexdigest() == hashlib.sha256(data).hexdigest()
+    finally:
+        spool.discard()
+    assert not os.path.exists(path)
+
+
+def test_upload_spool_enforces_size_limit():
+    """Crossing max_bytes raises 413 without creating a temp file."""
+    spool = UploadSpool(max_bytes=100)
+    with pytest.raises(UploadRejected) as excinfo:
+        spool.write(b"\x00" * 101)
+    assert excinfo.value.status_code == 413
+    assert spool.path is None
+
+
+def test_multipart_sink_spools_only_the_file_field():
+    """The file part is spooled across arbitrary chunk boundaries; other fields are skipped."""
+    audio = b"RIFF" + os.urandom(5000)
+    body = (b"--xyz\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhello\r\n"
+            b"--xyz\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.wav\"\r\n"
+            b"Content-Type: audio/wav\r\n\r\n" + audio + b"\r\n--xyz--\r\n")
+    spool = UploadSpool()
+    sink = MultipartFileSink("multipart/form-data; boundary=xyz", "file", spool)
+    for i in range(0, len(body), 7):
+        sink.write(body[i:i + 7])
+    sink.finalize()
+    path = spool.close()
+
+    assert sink.found and sink.filename == "a.wav"
+    with open(path, "rb") as f:
+        assert f.read() == audio
+    spool.discard()
+
+
+def test_multipart_sink_rejects_non_multipart_body():
+    """A body that is not multipart/form-data is refused with 422."""
+    with pytest.raises(UploadRejected) as excinfo:
+        MultipartFileSink("application/json", "file", UploadSpool())
+    assert excinfo.value.status_code == 422
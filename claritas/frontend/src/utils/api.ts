@@ -8,6 +8,7 @@ export interface AnalysisResult {
     summary: string;
     technical: {
         uploaded_bytes: number;
+        upload_sha256: string;
         ai_classification: 'HC' | 'MCI' | 'AD';
         confidence: number;
         probabilities: Record<string, number>;